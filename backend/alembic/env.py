@@ -23,6 +23,14 @@ if config.config_file_name is not None:
 from app import models
 target_metadata = models.Base.metadata
 
+# Full-text search objects are managed by raw DDL (see app.search), not the
+# models, so autogenerate must not try to drop them.
+SEARCH_OBJECTS = {"events_fts", "search_vector", "ix_events_search_vector"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (reflected and (name in SEARCH_OBJECTS or name.startswith("events_fts_")))
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -45,6 +53,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -68,7 +77,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,24 @@
+"""add ticket event and event organizer indexes
+
+Revision ID: 5d0b6f3e8c21
+Revises: c41e7d2a9f10
+Create Date: 2026-10-18 00:00:00
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "5d0b6f3e8c21"
+down_revision: Union[str, Sequence[str], None] = "c41e7d2a9f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_tickets_event_id"), "tickets", ["event_id"], unique=False)
+    op.create_index("ix_events_organizer_id", "events", ["organizer_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_organizer_id", table_name="events")
+    op.drop_index(op.f("ix_tickets_event_id"), table_name="tickets")
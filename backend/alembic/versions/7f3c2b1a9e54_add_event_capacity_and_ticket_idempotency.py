@@ -0,0 +1,42 @@
+"""add event capacity and ticket idempotency key
+
+Revision ID: 7f3c2b1a9e54
+Revises: e2a91c7b4d38
+Create Date: 2026-10-18 00:00:00
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "7f3c2b1a9e54"
+down_revision: Union[str, Sequence[str], None] = "e2a91c7b4d38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("capacity", sa.Integer(), nullable=True))
+    op.add_column(
+        "events",
+        sa.Column("sold", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # Existing tickets count towards the new counter.
+    op.execute(
+        "UPDATE events SET sold = "
+        "(SELECT COUNT(*) FROM tickets WHERE tickets.event_id = events.id)"
+    )
+    op.add_column("tickets", sa.Column("idempotency_key", sa.String(), nullable=True))
+    op.create_index(
+        "ix_tickets_user_id_idempotency_key",
+        "tickets",
+        ["user_id", "idempotency_key"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tickets_user_id_idempotency_key", table_name="tickets")
+    op.drop_column("tickets", "idempotency_key")
+    op.drop_column("events", "sold")
+    op.drop_column("events", "capacity")
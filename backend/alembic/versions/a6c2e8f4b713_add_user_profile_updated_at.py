@@ -0,0 +1,31 @@
+"""add user profile updated_at
+
+Revision ID: a6c2e8f4b713
+Revises: f3b9a1c6d250
+Create Date: 2026-10-18 00:00:00
+
+Lets the matching workers sync only changed profiles into their local
+embedding store.
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "a6c2e8f4b713"
+down_revision: Union[str, Sequence[str], None] = "f3b9a1c6d250"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_profiles",
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_user_profiles_updated_at", "user_profiles", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_profiles_updated_at", table_name="user_profiles")
+    op.drop_column("user_profiles", "updated_at")
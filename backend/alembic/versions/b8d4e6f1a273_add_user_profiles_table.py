@@ -0,0 +1,32 @@
+"""add user profiles table
+
+Revision ID: b8d4e6f1a273
+Revises: 7f3c2b1a9e54
+Create Date: 2026-10-18 00:00:00
+
+Existing ticket history is loaded with ``python -m app.profiles``.
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "b8d4e6f1a273"
+down_revision: Union[str, Sequence[str], None] = "7f3c2b1a9e54"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_profiles",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("ticket_count", sa.Integer(), nullable=False),
+        sa.Column("vector", sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_profiles")
@@ -0,0 +1,29 @@
+"""add event feed indexes
+
+Revision ID: c41e7d2a9f10
+Revises: 3ab8f77a4ad5
+Create Date: 2026-10-18 00:00:00
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "c41e7d2a9f10"
+down_revision: Union[str, Sequence[str], None] = "3ab8f77a4ad5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_events_date_id", "events", ["date", "id"], unique=False)
+    op.create_index(
+        "ix_events_location_date_id",
+        "events",
+        ["location", "date", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_location_date_id", table_name="events")
+    op.drop_index("ix_events_date_id", table_name="events")
@@ -0,0 +1,38 @@
+"""add ticket purchase times and the hourly sales rollup
+
+Revision ID: c7d3f5a9e182
+Revises: a6c2e8f4b713
+Create Date: 2026-10-18 00:00:00
+
+Existing tickets get the migration time as their purchase time; fill the
+rollup from them with ``python -m app.sales``.
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "c7d3f5a9e182"
+down_revision: Union[str, Sequence[str], None] = "a6c2e8f4b713"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tickets",
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_table(
+        "event_sales_hourly",
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("hour", sa.DateTime(), nullable=False),
+        sa.Column("tickets", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"]),
+        sa.PrimaryKeyConstraint("event_id", "hour"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("event_sales_hourly")
+    op.drop_column("tickets", "created_at")
@@ -0,0 +1,67 @@
+"""add event full-text search index
+
+Revision ID: d5a7c3e9f014
+Revises: b8d4e6f1a273
+Create Date: 2026-10-18 00:00:00
+
+SQLite gets an FTS5 table kept in sync by triggers, PostgreSQL a generated
+tsvector column with a GIN index (mirrors ``app.search``).
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "d5a7c3e9f014"
+down_revision: Union[str, Sequence[str], None] = "b8d4e6f1a273"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE events_fts USING fts5("
+            "title, description, location, content='events', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER events_fts_insert AFTER INSERT ON events BEGIN "
+            "INSERT INTO events_fts(rowid, title, description, location) "
+            "VALUES (new.id, new.title, new.description, new.location); END"
+        )
+        op.execute(
+            "CREATE TRIGGER events_fts_delete AFTER DELETE ON events BEGIN "
+            "INSERT INTO events_fts(events_fts, rowid, title, description, location) "
+            "VALUES ('delete', old.id, old.title, old.description, old.location); END"
+        )
+        op.execute(
+            "CREATE TRIGGER events_fts_update "
+            "AFTER UPDATE OF title, description, location ON events BEGIN "
+            "INSERT INTO events_fts(events_fts, rowid, title, description, location) "
+            "VALUES ('delete', old.id, old.title, old.description, old.location); "
+            "INSERT INTO events_fts(rowid, title, description, location) "
+            "VALUES (new.id, new.title, new.description, new.location); END"
+        )
+        # Index the events that already exist.
+        op.execute("INSERT INTO events_fts(events_fts) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        op.execute(
+            "ALTER TABLE events ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'C')) STORED"
+        )
+        op.execute("CREATE INDEX ix_events_search_vector ON events USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("events_fts_update", "events_fts_delete", "events_fts_insert"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS events_fts")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_events_search_vector")
+        op.execute("ALTER TABLE events DROP COLUMN IF EXISTS search_vector")
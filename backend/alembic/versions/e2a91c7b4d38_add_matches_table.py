@@ -0,0 +1,39 @@
+"""add matches table
+
+Revision ID: e2a91c7b4d38
+Revises: 5d0b6f3e8c21
+Create Date: 2026-10-18 00:00:00
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "e2a91c7b4d38"
+down_revision: Union[str, Sequence[str], None] = "5d0b6f3e8c21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "matches",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_matches_id"), "matches", ["id"], unique=False)
+    op.create_index("ix_matches_event_id_score", "matches", ["event_id", "score"], unique=False)
+    op.create_index("ix_matches_user_id_score", "matches", ["user_id", "score"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_matches_user_id_score", table_name="matches")
+    op.drop_index("ix_matches_event_id_score", table_name="matches")
+    op.drop_index(op.f("ix_matches_id"), table_name="matches")
+    op.drop_table("matches")
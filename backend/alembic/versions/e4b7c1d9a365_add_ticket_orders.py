@@ -0,0 +1,51 @@
+"""add ticket orders for idempotent batch purchases
+
+Revision ID: e4b7c1d9a365
+Revises: c7d3f5a9e182
+Create Date: 2026-10-18 00:00:00
+
+Batches used to store ``<key>#<n>`` on each ticket, a namespace shared
+with single purchases. Those tickets are left as they are.
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "e4b7c1d9a365"
+down_revision: Union[str, Sequence[str], None] = "c7d3f5a9e182"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ticket_orders",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("idempotency_key", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_ticket_orders_user_id_idempotency_key",
+        "ticket_orders",
+        ["user_id", "idempotency_key"],
+        unique=True,
+    )
+    with op.batch_alter_table("tickets") as batch:
+        batch.add_column(sa.Column("order_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key("fk_tickets_order_id", "ticket_orders", ["order_id"], ["id"])
+        batch.create_index("ix_tickets_order_id", ["order_id"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("tickets") as batch:
+        batch.drop_index("ix_tickets_order_id")
+        batch.drop_constraint("fk_tickets_order_id", type_="foreignkey")
+        batch.drop_column("order_id")
+    op.drop_index("ix_ticket_orders_user_id_idempotency_key", table_name="ticket_orders")
+    op.drop_table("ticket_orders")
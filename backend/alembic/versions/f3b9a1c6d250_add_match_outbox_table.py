@@ -0,0 +1,33 @@
+"""add match outbox table
+
+Revision ID: f3b9a1c6d250
+Revises: d5a7c3e9f014
+Create Date: 2026-10-18 00:00:00
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "f3b9a1c6d250"
+down_revision: Union[str, Sequence[str], None] = "d5a7c3e9f014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "match_outbox",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_match_outbox_job_id", "match_outbox", ["job_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_match_outbox_job_id", table_name="match_outbox")
+    op.drop_table("match_outbox")
@@ -0,0 +1,208 @@
+"""Approximate nearest-neighbour search over event embeddings (IVF)."""
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Below this many vectors a single list (i.e. exact search) is used.
+MIN_TRAIN_SIZE = 1024
+
+
+def _kmeans(vectors: np.ndarray, n_lists: int, iterations: int, seed: int) -> np.ndarray:
+    """Spherical k-means on (a sample of) ``vectors``; returns unit centroids."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), n_lists * 256)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # Re-seed empty lists with random sample points.
+        sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+        norms[empty] = np.linalg.norm(sums[empty], axis=1, keepdims=True)
+        centroids = sums / np.maximum(norms, 1e-12)
+    return centroids.astype(np.float32)
+
+
+class _InvertedList:
+    """Growable arrays of ids, vectors and dates for one IVF cell."""
+
+    def __init__(self, dim: int, capacity: int = 16):
+        self.size = 0
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.vectors = np.empty((capacity, dim), dtype=np.float32)
+        self.dates = np.empty(capacity, dtype="datetime64[us]")
+
+    def extend(self, ids: np.ndarray, vectors: np.ndarray, dates: np.ndarray) -> int:
+        needed = self.size + len(ids)
+        if needed > len(self.ids):
+            capacity = max(needed, 2 * len(self.ids))
+            for name in ("ids", "vectors", "dates"):
+                old = getattr(self, name)
+                grown = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+                grown[: self.size] = old[: self.size]
+                setattr(self, name, grown)
+        start = self.size
+        self.ids[start:needed] = ids
+        self.vectors[start:needed] = vectors
+        self.dates[start:needed] = dates
+        self.size = needed
+        return start
+
+    def remove(self, pos: int) -> Optional[int]:
+        """Swap-remove the entry at ``pos``; return the id moved into it."""
+        last = self.size - 1
+        moved = None
+        if pos != last:
+            self.ids[pos] = self.ids[last]
+            self.vectors[pos] = self.vectors[last]
+            self.dates[pos] = self.dates[last]
+            moved = int(self.ids[pos])
+        self.size = last
+        return moved
+
+
+class IVFIndex:
+    """Inverted-file index over L2-normalised vectors, scored by dot product.
+
+    Vectors are partitioned into ``n_lists`` cells by spherical k-means;
+    a query scores only the ``n_probe`` cells whose centroids are closest,
+    trading a little recall for a large cut in work. Every vector carries
+    a date so searches can skip events that already happened. Vectors can
+    be added (or replaced) one at a time after the index is built.
+    """
+
+    def __init__(self, dim: int, n_probe: int = 16, seed: int = 0):
+        self.dim = dim
+        self.n_probe = n_probe
+        self.seed = seed
+        self.centroids = np.zeros((1, dim), dtype=np.float32)
+        self._lists: List[_InvertedList] = [_InvertedList(dim)]
+        self._where: Dict[int, Tuple[int, int]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._where)
+
+    @property
+    def n_lists(self) -> int:
+        return len(self._lists)
+
+    def build(
+        self,
+        ids: Sequence[int],
+        vectors: np.ndarray,
+        dates: Sequence[datetime],
+        n_lists: Optional[int] = None,
+        iterations: int = 10,
+    ):
+        """Replace the index contents, training centroids on ``vectors``."""
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        dates = np.asarray(dates, dtype="datetime64[us]")
+        if n_lists is None:
+            n_lists = int(np.sqrt(len(ids))) if len(ids) >= MIN_TRAIN_SIZE else 1
+        n_lists = max(1, min(n_lists, len(ids)))
+        if n_lists > 1:
+            centroids = _kmeans(vectors, n_lists, iterations, self.seed)
+        else:
+            centroids = np.zeros((1, self.dim), dtype=np.float32)
+        assignment = self._assign(centroids, vectors)
+
+        lists = [_InvertedList(self.dim) for _ in range(n_lists)]
+        where: Dict[int, Tuple[int, int]] = {}
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+        for cell in range(n_lists):
+            members = order[bounds[cell]: bounds[cell + 1]]
+            lists[cell].extend(ids[members], vectors[members], dates[members])
+            for pos, vector_id in enumerate(ids[members].tolist()):
+                where[vector_id] = (cell, pos)
+        with self._lock:
+            self.centroids, self._lists, self._where = centroids, lists, where
+
+    @staticmethod
+    def _assign(centroids: np.ndarray, vectors: np.ndarray, block: int = 65536) -> np.ndarray:
+        assignment = np.zeros(len(vectors), dtype=np.int64)
+        if len(centroids) > 1:
+            for start in range(0, len(vectors), block):
+                chunk = vectors[start: start + block]
+                assignment[start: start + block] = np.argmax(chunk @ centroids.T, axis=1)
+        return assignment
+
+    def add(self, vector_id: int, vector: np.ndarray, date: datetime):
+        """Insert or replace a single vector in its nearest cell."""
+        self.add_many([vector_id], np.asarray(vector)[None, :], [date])
+
+    def add_many(self, ids: Sequence[int], vectors: np.ndarray, dates: Sequence[datetime]):
+        """Insert or replace vectors in their nearest cells, without retraining."""
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        dates = np.asarray(dates, dtype="datetime64[us]")
+        with self._lock:
+            for vector_id in ids.tolist():
+                self.remove(vector_id)
+            assignment = self._assign(self.centroids, vectors)
+            for cell in np.unique(assignment).tolist():
+                members = np.flatnonzero(assignment == cell)
+                start = self._lists[cell].extend(ids[members], vectors[members], dates[members])
+                for pos, vector_id in enumerate(ids[members].tolist(), start):
+                    self._where[vector_id] = (cell, pos)
+
+    def remove(self, vector_id: int):
+        """Drop a vector if present."""
+        with self._lock:
+            location = self._where.pop(vector_id, None)
+            if location is None:
+                return
+            cell, pos = location
+            moved = self._lists[cell].remove(pos)
+            if moved is not None:
+                self._where[moved] = (cell, pos)
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int,
+        after: Optional[datetime] = None,
+        n_probe: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(ids, scores)`` of the best ``k`` vectors, best first.
+
+        Only vectors dated at or after ``after`` are considered.
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        with self._lock:
+            if n_probe < self.n_lists:
+                centroid_scores = self.centroids @ vector
+                cells = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+            else:
+                cells = range(self.n_lists)
+            ids, scores = [], []
+            for cell in cells:
+                inverted = self._lists[cell]
+                if inverted.size == 0:
+                    continue
+                cell_scores = inverted.vectors[: inverted.size] @ vector
+                cell_ids = inverted.ids[: inverted.size]
+                if after is not None:
+                    cutoff = np.datetime64(after, "us")
+                    upcoming = inverted.dates[: inverted.size] >= cutoff
+                    cell_scores, cell_ids = cell_scores[upcoming], cell_ids[upcoming]
+                ids.append(cell_ids)
+                scores.append(cell_scores)
+            # Copy out of the cells before releasing the lock.
+            ids = np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+            scores = np.concatenate(scores) if scores else np.empty(0, dtype=np.float32)
+        k = min(k, len(ids))
+        if k == 0:
+            return ids[:0], scores[:0]
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return ids[best], scores[best]
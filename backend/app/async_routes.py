@@ -0,0 +1,160 @@
+"""Async implementations of the hot read endpoints.
+
+Used instead of the sync handlers in ``main`` when ``DATABASE_URL`` names
+an async driver, so these requests no longer hold a threadpool worker
+while waiting on the database.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import (
+    auth,
+    database,
+    event_cache,
+    models,
+    pagination,
+    principals,
+    queries,
+    schemas,
+    serialization,
+)
+
+router = APIRouter()
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    """Return the authenticated principal for the provided JWT token."""
+
+    principal = principals.cached(token)
+    if principal is not None:
+        return principal
+    payload = auth.decode_access_token(token)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+        )
+    user_id = int(payload.get("sub"))
+    loaded_generation = principals.generation(user_id)
+    result = await db.execute(principals.statement(user_id))
+    principal = principals.from_row(result.first())
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    principals.remember(token, payload, principal, loaded_generation)
+    return principal
+
+
+@router.get("/me", response_model=schemas.UserRead)
+async def read_users_me(current_user: principals.Principal = Depends(get_current_user)):
+    """Return information about the current authenticated user."""
+    return current_user
+
+
+@router.get("/me/tickets", response_model=schemas.TicketPage)
+async def get_my_tickets(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(
+        pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE
+    ),
+    current_user: principals.Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    """List the user's tickets with their events, ordered by event date."""
+    try:
+        stmt = queries.user_tickets(current_user.id, cursor, limit)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    key = await run_in_threadpool(
+        event_cache.tickets_key, current_user.id, cursor=cursor, limit=limit
+    )
+    body = await run_in_threadpool(event_cache.lookup, key)
+    if body is None:
+        page = queries.ticket_page((await db.execute(stmt)).scalars().all(), limit)
+        body = event_cache.encode(schemas.TicketPage, page)
+        await run_in_threadpool(event_cache.store, key, body)
+    return event_cache.respond(request, body)
+
+
+@router.get("/events", response_model=schemas.EventPage)
+async def get_events(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(
+        pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE
+    ),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    location: Optional[str] = None,
+    current_user: principals.Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    """List events ordered by date, one keyset-paginated page at a time."""
+    try:
+        stmt = queries.event_feed(cursor, limit, start, end, location)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    key = await run_in_threadpool(
+        event_cache.list_key,
+        cursor=cursor, limit=limit, start=start, end=end, location=location,
+    )
+    body = await run_in_threadpool(event_cache.lookup, key)
+    if body is None:
+        page = queries.event_page((await db.execute(stmt)).all(), limit)
+        body = serialization.dumps(page)
+        await run_in_threadpool(event_cache.store, key, body)
+    return event_cache.respond(request, body)
+
+
+@router.get("/events/{event_id}", response_model=schemas.Event)
+async def get_event(
+    event_id: int,
+    request: Request,
+    current_user: principals.Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    """Retrieve details for a single event, through the event cache."""
+    key = event_cache.detail_key(event_id)
+    body = await run_in_threadpool(event_cache.lookup, key)
+    if body is None:
+        event = await db.get(models.Event, event_id)
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Event not found"
+            )
+        body = event_cache.encode(schemas.Event, event)
+        await run_in_threadpool(event_cache.store, key, body)
+    return event_cache.respond(request, body)
+
+
+def install(app: FastAPI):
+    """Replace the app's sync handlers for these endpoints with the async ones."""
+    replaced = {
+        (route.path, method) for route in router.routes for method in route.methods
+    }
+    app.router.routes = [
+        route
+        for route in app.router.routes
+        if not (
+            isinstance(route, APIRoute)
+            and any((route.path, method) in replaced for method in route.methods)
+        )
+    ]
+    app.include_router(router)
@@ -1,25 +1,94 @@
 """Authentication helpers for password hashing and JWT handling."""
 
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+import multiprocessing
 import os
+import threading
 
 SECRET_KEY = os.getenv("JWT_SECRET", "secret")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost factor; hashes below it are transparently upgraded on login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Processes dedicated to bcrypt (0 hashes inline in the calling thread) and
+# the number of hashing jobs allowed in flight before requests are refused.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", str(max(1, HASH_WORKERS) * 8)))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
+
+
+class HashingBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(HASH_QUEUE_LIMIT)
 
 def verify_password(plain_password, hashed_password):
     """Validate a plaintext password against a stored hash."""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password, hashed_password):
+    """Validate a password and return ``(valid, new_hash_or_None)``.
+
+    A new hash is returned when the stored one uses outdated settings.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password):
     """Hash a plaintext password for storage."""
     return pwd_context.hash(password)
 
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: never fork a process that may be running server threads
+            _pool = ProcessPoolExecutor(
+                max_workers=HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+async def run_hashing(fn, *args):
+    """Run a hashing helper on the bcrypt process pool and await it.
+
+    The caller waits on the event loop rather than in a worker thread, so
+    hashing never takes threads away from sync endpoints. Raises
+    ``HashingBusy`` instead of queueing when ``HASH_QUEUE_LIMIT`` jobs are
+    already in flight, so bursts get fast rejections rather than
+    unbounded latency.
+    """
+    if not _slots.acquire(blocking=False):
+        raise HashingBusy()
+    try:
+        if HASH_WORKERS <= 0:
+            return await asyncio.to_thread(fn, *args)
+        return await asyncio.wrap_future(_get_pool().submit(fn, *args))
+    finally:
+        _slots.release()
+
+def shutdown_hashing():
+    """Stop the hashing processes, if started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a signed JWT access token."""
     to_encode = data.copy()
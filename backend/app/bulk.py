@@ -0,0 +1,81 @@
+"""Streaming parsers and bulk inserts for event imports."""
+
+import csv
+import json
+from typing import AsyncIterator, List, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Rows validated and inserted per round trip during an import.
+BATCH_SIZE = 1000
+
+CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "text/csv")
+
+
+async def _lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Yield decoded lines from a byte stream without buffering the body."""
+    pending = b""
+    async for chunk in stream:
+        pending += chunk
+        *complete, pending = pending.split(b"\n")
+        for line in complete:
+            yield line.decode("utf-8")
+    if pending:
+        yield pending.decode("utf-8")
+
+
+async def iter_records(
+    stream: AsyncIterator[bytes], content_type: str
+) -> AsyncIterator[Tuple[int, dict]]:
+    """Yield ``(line_number, record)`` pairs from an NDJSON or CSV stream.
+
+    CSV input needs a header row; quoted fields may span lines and empty
+    cells count as missing. Raises ``ValueError`` naming the offending
+    line for malformed input.
+    """
+    if content_type == "text/csv":
+        header = None
+        record, start = "", 0
+        line_no = 0
+        async for line in _lines(stream):
+            line_no += 1
+            record = f"{record}\n{line}" if record else line
+            start = start or line_no
+            if record.count('"') % 2:
+                continue  # inside a quoted field that continues on the next line
+            if record.strip():
+                values = next(csv.reader([record]))
+                if header is None:
+                    header = values
+                else:
+                    if len(values) != len(header):
+                        raise ValueError(f"line {start}: expected {len(header)} fields")
+                    yield start, {
+                        name: value for name, value in zip(header, values) if value != ""
+                    }
+            record, start = "", 0
+        if record:
+            raise ValueError(f"line {start}: unterminated quoted field")
+        return
+
+    line_no = 0
+    async for line in _lines(stream):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"line {line_no}: {exc.msg}") from exc
+        if not isinstance(record, dict):
+            raise ValueError(f"line {line_no}: expected a JSON object")
+        yield line_no, record
+
+
+def insert_events(db: Session, rows: List[dict]) -> List[int]:
+    """Insert event rows in one statement and return their ids."""
+    result = db.execute(insert(models.Event).returning(models.Event.id), rows)
+    return [event_id for (event_id,) in result]
@@ -1,16 +1,64 @@
-"""Database configuration and session helpers for the FastAPI backend."""
+"""Database configuration and session helpers for the FastAPI backend.
+
+``DATABASE_URL`` selects the mode: a URL naming an async driver (e.g.
+``sqlite+aiosqlite://`` or ``postgresql+asyncpg://``) enables the async
+engine used by the hot read endpoints, while a plain sync engine on the
+equivalent driver is always available for everything else.
+"""
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
 
-engine = create_engine(DATABASE_URL)
+_url = make_url(DATABASE_URL)
+ASYNC_MODE = _url.get_dialect().is_async
+
+
+def _engine_options() -> dict:
+    """Pool settings shared by the sync and async engines.
+
+    The default pool (10 + 30 overflow) covers AnyIO's 40 worker threads:
+    sync endpoints release their session from a worker thread, so a pool
+    smaller than the threadpool can deadlock under load.
+    """
+    options = {
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    if _url.database not in (None, "", ":memory:"):
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "30")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        )
+    return options
+
+
+# The sync engine uses the backend's default driver when the URL is async.
+SYNC_DATABASE_URL = (
+    _url.set(drivername=_url.get_backend_name()) if ASYNC_MODE else _url
+)
+
+engine = create_engine(SYNC_DATABASE_URL, **_engine_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+if ASYNC_MODE:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(DATABASE_URL, **_engine_options())
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+
+
 def get_db():
     """Yield a SQLAlchemy session and close it when finished."""
     db = SessionLocal()
@@ -18,3 +66,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Yield an async SQLAlchemy session and close it when finished."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,242 @@
+"""Memory-mapped, append-only columnar store of fixed-size embeddings.
+
+A store is a directory holding two column files per generation: ``ids``
+(int64) and ``vectors`` (float32 rows, or int8 rows plus a float32
+``scales`` column when quantized), with the live generation named in
+``manifest.json``. Writes only ever append; a later row for an id
+supersedes earlier ones. ``compact`` rewrites the live rows sorted by id
+into a new generation and swaps the manifest atomically, so readers never
+see a half-written store.
+
+Reading a compacted store maps the files and returns views over them:
+nothing is parsed or copied, so opening a million vectors takes
+milliseconds and forked workers share the pages. Rows appended since the
+last compaction are merged into a copy instead, which is why writers
+compact once that tail grows past ``COMPACT_RATIO`` of the store.
+
+One process writes at a time (an exclusive ``flock``); any number read.
+"""
+
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+MANIFEST = "manifest.json"
+DTYPES = ("float32", "int8")
+
+# Compact when rows appended since the last compaction exceed this share of it.
+COMPACT_RATIO = float(os.getenv("EMBEDDING_STORE_COMPACT_RATIO", "0.2"))
+
+
+def quantize(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize rows to int8 with one symmetric float32 scale per row."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    scales = np.abs(matrix).max(axis=1) / 127 if len(matrix) else np.zeros(0, np.float32)
+    safe = np.where(scales > 0, scales, 1)[:, None]
+    codes = np.rint(matrix / safe).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class QuantizedRows:
+    """Int8 rows with per-row scales, dequantized one slice at a time.
+
+    Supports ``len`` and indexing like the float32 matrix it stands in for,
+    so the blocked matcher only ever materialises one block as float32.
+    """
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray):
+        self.codes = codes
+        self.scales = scales
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.codes.shape
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index) -> np.ndarray:
+        return self.codes[index].astype(np.float32) * np.asarray(self.scales[index])[..., None]
+
+
+Matrix = Union[np.ndarray, QuantizedRows]
+
+
+class EmbeddingStore:
+    """Append-only ``id -> vector`` store backed by memory-mapped files."""
+
+    def __init__(self, path: str, dim: int, dtype: str = "float32"):
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}, not {dtype!r}")
+        self.path = path
+        self.dim = dim
+        self.dtype = dtype
+        os.makedirs(path, exist_ok=True)
+        with self._locked():
+            manifest = self._read_manifest()
+            if manifest is None:
+                self._write_manifest({"generation": 0, "dim": dim, "dtype": dtype, "sorted_rows": 0})
+            elif (manifest["dim"], manifest["dtype"]) != (dim, dtype):
+                raise ValueError(
+                    f"{path} holds {manifest['dtype']} vectors of dim {manifest['dim']}, "
+                    f"not {dtype} of dim {dim}"
+                )
+
+    def _file(self, column: str, generation: int) -> str:
+        return os.path.join(self.path, f"{column}.{generation}")
+
+    def _read_manifest(self) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.path, MANIFEST)) as source:
+                return json.load(source)
+        except FileNotFoundError:
+            return None
+
+    def _write_manifest(self, manifest: dict):
+        target = os.path.join(self.path, MANIFEST)
+        with open(target + ".tmp", "w") as out:
+            json.dump(manifest, out)
+        os.replace(target + ".tmp", target)
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.path, "lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @property
+    def meta(self) -> dict:
+        """Writer-owned values kept in the manifest (e.g. a sync watermark)."""
+        return self._read_manifest().get("meta", {})
+
+    def append(self, ids, matrix: np.ndarray, meta: Optional[dict] = None):
+        """Append one row per id, superseding earlier rows for the same ids.
+
+        ``meta`` is merged into the manifest's ``meta`` once the rows are
+        written.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        matrix = np.asarray(matrix, dtype=np.float32).reshape(len(ids), self.dim)
+        with self._locked():
+            manifest = self._read_manifest()
+            generation = manifest["generation"]
+            if self.dtype == "int8":
+                codes, scales = quantize(matrix)
+                self._extend(self._file("vectors", generation), codes)
+                self._extend(self._file("scales", generation), scales)
+            else:
+                self._extend(self._file("vectors", generation), matrix)
+            # Ids go last: a row only becomes visible once its id is written.
+            self._extend(self._file("ids", generation), ids)
+            if meta:
+                manifest["meta"] = {**manifest.get("meta", {}), **meta}
+                self._write_manifest(manifest)
+
+    @staticmethod
+    def _extend(path: str, array: np.ndarray):
+        with open(path, "ab") as out:
+            out.write(np.ascontiguousarray(array).tobytes())
+
+    def _map(self, column: str, generation: int, dtype, rows: int, width: int = 0):
+        shape = (rows, width) if width else (rows,)
+        if rows == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self._file(column, generation), dtype=dtype, mode="r", shape=shape)
+
+    def _open(self) -> Tuple[dict, np.ndarray, Matrix]:
+        while True:
+            manifest = self._read_manifest()
+            generation = manifest["generation"]
+            try:
+                rows = os.path.getsize(self._file("ids", generation)) // 8
+            except FileNotFoundError:
+                if self._read_manifest()["generation"] != generation:
+                    continue
+                rows = 0
+            try:
+                ids = self._map("ids", generation, np.int64, rows)
+                vectors = self._map("vectors", generation, self.dtype, rows, self.dim)
+                if self.dtype == "int8":
+                    scales = self._map("scales", generation, np.float32, rows)
+                    return manifest, ids, QuantizedRows(vectors, scales)
+                return manifest, ids, vectors
+            except FileNotFoundError:
+                # Compacted away between reading the manifest and mapping.
+                continue
+
+    def tail_rows(self) -> int:
+        """Rows appended since the last compaction."""
+        manifest, ids, _ = self._open()
+        return len(ids) - manifest["sorted_rows"]
+
+    def snapshot(self) -> Tuple[np.ndarray, Matrix]:
+        """Return ``(ids, matrix)`` with the latest row of every id.
+
+        After a compaction both are read-only views of the mapped files,
+        sorted by id; otherwise the rows appended since are merged into a
+        copy.
+        """
+        manifest, ids, matrix = self._open()
+        head = manifest["sorted_rows"]
+        if len(ids) == head:
+            return ids, matrix
+        return self._merge(ids, matrix, head)
+
+    @staticmethod
+    def _merge(ids: np.ndarray, matrix: Matrix, head: int) -> Tuple[np.ndarray, Matrix]:
+        # Latest row per id in the tail, then drop head rows it supersedes.
+        tail_ids, last = np.unique(ids[head:][::-1], return_index=True)
+        tail_rows = len(ids) - 1 - last
+        head_ids = ids[:head]
+        positions = np.searchsorted(head_ids, tail_ids)
+        found = positions < head
+        found[found] = head_ids[positions[found]] == tail_ids[found]
+        keep = np.ones(head, dtype=bool)
+        keep[positions[found]] = False
+        rows = np.concatenate([np.flatnonzero(keep), tail_rows])
+        if isinstance(matrix, QuantizedRows):
+            return ids[rows], QuantizedRows(matrix.codes[rows], matrix.scales[rows])
+        return ids[rows], matrix[rows]
+
+    def compact(self):
+        """Rewrite the live rows, sorted by id, as a new generation."""
+        with self._locked():
+            manifest, ids, matrix = self._open()
+            if len(ids) == manifest["sorted_rows"]:
+                return
+            ids, matrix = self._merge(ids, matrix, manifest["sorted_rows"])
+            order = np.argsort(ids, kind="stable")
+            old, generation = manifest["generation"], manifest["generation"] + 1
+            self._remove(generation)  # leftovers of an interrupted compaction
+            if isinstance(matrix, QuantizedRows):
+                self._extend(self._file("vectors", generation), matrix.codes[order])
+                self._extend(self._file("scales", generation), matrix.scales[order])
+            else:
+                self._extend(self._file("vectors", generation), matrix[order])
+            self._extend(self._file("ids", generation), ids[order])
+            self._write_manifest({**manifest, "generation": generation, "sorted_rows": len(ids)})
+            # Readers still mapping the old files keep them until they unmap.
+            self._remove(old)
+
+    def _remove(self, generation: int):
+        for column in ("ids", "vectors", "scales"):
+            try:
+                os.remove(self._file(column, generation))
+            except FileNotFoundError:
+                pass
+
+    def maybe_compact(self, ratio: float = COMPACT_RATIO) -> bool:
+        """Compact if the appended tail exceeds ``ratio`` of the compacted rows."""
+        manifest, ids, _ = self._open()
+        tail = len(ids) - manifest["sorted_rows"]
+        if tail and tail > ratio * manifest["sorted_rows"]:
+            self.compact()
+            return True
+        return False
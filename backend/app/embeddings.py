@@ -0,0 +1,133 @@
+"""Offline text embedding engine based on signed feature hashing."""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+EMBEDDING_DIM = 128
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Relative weight of each event field; the location is hashed in its own
+# namespace so "Paris" in a description does not look like a Paris venue.
+FIELD_WEIGHTS = (("title", 2.0), ("description", 1.0), ("location", 1.5))
+
+
+def _tokens(text: str) -> List[str]:
+    words = _TOKEN_RE.findall(text.lower())
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+def content_key(*fields: str) -> str:
+    """Return a stable hash identifying the embedded content."""
+    digest = hashlib.blake2b(digest_size=16)
+    for field in fields:
+        digest.update(field.encode())
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class HashingEmbedder:
+    """Embed short documents into fixed-size float32 vectors.
+
+    Tokens (unigrams and bigrams) are hashed into ``dim`` buckets with a
+    hash-derived sign, term counts are log-scaled and each row is L2
+    normalised, so cosine similarity is a plain dot product. Embeddings of
+    unchanged content are served from a bounded LRU cache keyed by a hash
+    of the content.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, cache_size: int = 100_000):
+        self.dim = dim
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # Requests share the embedder from worker threads; vectorising
+        # happens outside the lock, only the LRU bookkeeping is guarded.
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[int, float]] = {}
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        bucket = self._buckets.get(feature)
+        if bucket is None:
+            h = int.from_bytes(
+                hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little"
+            )
+            bucket = (h % self.dim, 1.0 if (h >> 63) & 1 else -1.0)
+            if len(self._buckets) < 1_000_000:
+                self._buckets[feature] = bucket
+        return bucket
+
+    def _vectorize(self, docs: Sequence[Sequence[str]]) -> np.ndarray:
+        rows: List[int] = []
+        cols: List[int] = []
+        vals: List[float] = []
+        for row, fields in enumerate(docs):
+            for (name, weight), text in zip(FIELD_WEIGHTS, fields):
+                prefix = "loc:" if name == "location" else ""
+                for token in _tokens(text or ""):
+                    col, sign = self._bucket(prefix + token)
+                    rows.append(row)
+                    cols.append(col)
+                    vals.append(sign * weight)
+
+        matrix = np.zeros((len(docs), self.dim), dtype=np.float32)
+        np.add.at(
+            matrix,
+            (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)),
+            np.asarray(vals, dtype=np.float32),
+        )
+        np.copysign(np.log1p(np.abs(matrix)), matrix, out=matrix)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def embed_many(self, docs: Iterable[Sequence[str]]) -> np.ndarray:
+        """Embed ``(title, description, location)`` tuples in one batch.
+
+        Returns a ``(len(docs), dim)`` float32 matrix. Only documents whose
+        content hash is not cached are vectorised.
+        """
+        docs = [tuple(doc) for doc in docs]
+        keys = [content_key(*doc) for doc in docs]
+        out = np.empty((len(docs), self.dim), dtype=np.float32)
+
+        missing: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    out[i] = cached
+
+        if missing:
+            first = [positions[0] for positions in missing.values()]
+            fresh = self._vectorize([docs[i] for i in first])
+            with self._lock:
+                for (key, positions), vector in zip(missing.items(), fresh):
+                    out[positions] = vector
+                    self._remember(key, vector.copy())
+        return out
+
+    def embed(self, title: str, description: str, location: str) -> np.ndarray:
+        """Embed a single document."""
+        return self.embed_many([(title, description, location)])[0]
+
+    def _remember(self, key: str, vector: np.ndarray):
+        # Called with ``_lock`` held.
+        self._cache[key] = vector
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def cache_info(self) -> dict:
+        """Return the number of cached embeddings and the cache bound."""
+        with self._lock:
+            return {"size": len(self._cache), "max_size": self.cache_size}
+
+
+embedder = HashingEmbedder()
@@ -0,0 +1,160 @@
+"""Read-through Redis cache for event list and detail responses.
+
+Bodies are stored as the exact JSON sent to clients, so a hit costs one
+Redis round trip and no serialization, and each response carries an ETag
+derived from its bytes so clients can revalidate with ``If-None-Match``.
+
+List pages are keyed by a version number that creating events bumps:
+pages cached under an older version are simply never read again and age
+out with their TTL. Each user's ticket list pages work the same way, with
+a per-user version bumped by their purchases. Detail entries are deleted when their event changes
+(including its ``sold`` count); list pages may show a ``sold`` count up to
+``EVENT_CACHE_TTL`` seconds old.
+
+The cache has its own Redis client with timeouts of ``EVENT_CACHE_TIMEOUT``
+seconds, far below the job queue's. Redis errors (timeouts included) are
+logged and treated as cache misses, and the cache then stays off for
+``EVENT_CACHE_COOLDOWN`` seconds, so a hung Redis costs one short timeout
+per cooldown rather than three per request. Invalidations skipped while
+it is off can leave pages up to ``EVENT_CACHE_TTL`` seconds stale.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Iterable, Optional
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+from . import metrics, tasks
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = int(os.getenv("EVENT_CACHE_TTL", "30"))
+CACHE_TIMEOUT = float(os.getenv("EVENT_CACHE_TIMEOUT", "0.05"))
+CACHE_COOLDOWN = float(os.getenv("EVENT_CACHE_COOLDOWN", "5"))
+
+LIST_VERSION_KEY = "events:list:version"
+
+# Created on first use; tests swap in a fakeredis instance.
+client = None
+_client_lock = threading.Lock()
+
+# ``time.monotonic()`` before which the cache is skipped after an error.
+_skip_until = 0.0
+
+
+def get_client():
+    """Return the cache's Redis client, creating it on first use."""
+    global client
+    with _client_lock:
+        if client is None:
+            from redis import Redis
+
+            client = Redis.from_url(
+                tasks.redis_url,
+                socket_timeout=CACHE_TIMEOUT,
+                socket_connect_timeout=CACHE_TIMEOUT,
+            )
+        return client
+
+
+def _call(method: str, *args, **kwargs):
+    from redis import RedisError
+
+    global _skip_until
+    if time.monotonic() < _skip_until:
+        return None
+    try:
+        with metrics.external("redis"):
+            return getattr(get_client(), method)(*args, **kwargs)
+    except RedisError:
+        logger.warning("Event cache %s failed", method, exc_info=True)
+        _skip_until = time.monotonic() + CACHE_COOLDOWN
+        return None
+
+
+def detail_key(event_id: int) -> str:
+    """Return the cache key for an event's detail response."""
+    return f"events:detail:{event_id}"
+
+
+def _versioned_key(prefix: str, version_key: str, params: dict) -> str:
+    version = int(_call("get", version_key) or 0)
+    digest = hashlib.blake2b(
+        json.dumps(params, sort_keys=True, default=str).encode(), digest_size=16
+    ).hexdigest()
+    return f"{prefix}:{version}:{digest}"
+
+
+def list_key(**params) -> str:
+    """Return the cache key for a list page under the current list version."""
+    return _versioned_key("events:list", LIST_VERSION_KEY, params)
+
+
+def _tickets_version_key(user_id: int) -> str:
+    return f"tickets:{user_id}:version"
+
+
+def tickets_key(user_id: int, **params) -> str:
+    """Return the cache key for a page of a user's tickets."""
+    return _versioned_key(f"tickets:{user_id}", _tickets_version_key(user_id), params)
+
+
+def lookup(key: str) -> Optional[bytes]:
+    """Return the cached body for ``key``, or ``None`` on a miss."""
+    if CACHE_TTL <= 0:
+        return None
+    return _call("get", key)
+
+
+def store(key: str, body: bytes):
+    """Cache ``body`` under ``key`` for ``EVENT_CACHE_TTL`` seconds."""
+    if CACHE_TTL > 0:
+        _call("set", key, body, ex=CACHE_TTL)
+
+
+def encode(schema: type[BaseModel], value) -> bytes:
+    """Serialize ``value`` (ORM objects allowed) as ``schema`` JSON."""
+    return schema.model_validate(value, from_attributes=True).model_dump_json().encode()
+
+
+def invalidate_event(event_ids: Iterable[int]):
+    """Drop the cached detail responses of the given events."""
+    keys = [detail_key(event_id) for event_id in event_ids]
+    if keys:
+        _call("delete", *keys)
+
+
+def invalidate_lists():
+    """Retire every cached list page by bumping the list version."""
+    _call("incr", LIST_VERSION_KEY)
+
+
+def invalidate_tickets(user_id: int):
+    """Retire every cached page of a user's tickets."""
+    # A fresh timestamp rather than INCR: the key expires once the user has
+    # been idle, and a restarted counter would revive pages cached under
+    # its earlier values. Pages cached under the default version 0 are
+    # gone by then, since the key outlives the page TTL.
+    _call("set", _tickets_version_key(user_id), time.time_ns(), ex=2 * max(CACHE_TTL, 1))
+
+
+def etag(body: bytes) -> str:
+    """Return a strong ETag for a response body."""
+    return '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def respond(request: Request, body: bytes) -> Response:
+    """Return ``body`` as JSON, or 304 if the client already has it."""
+    tag = etag(body)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+        if tag in candidates or "*" in candidates:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": tag})
+    return Response(body, media_type="application/json", headers={"ETag": tag})
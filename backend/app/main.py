@@ -1,16 +1,81 @@
 """Main FastAPI application with API endpoints."""
 
-from fastapi import FastAPI, Depends, HTTPException, status
+import gc
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional
+
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 
-from . import models, schemas, auth, database, tasks, matching
+from . import (
+    bulk,
+    models,
+    schemas,
+    auth,
+    database,
+    event_cache,
+    exports,
+    tasks,
+    matching,
+    metrics,
+    outbox,
+    pagination,
+    principals,
+    queries,
+    recommendations,
+    sales,
+    search,
+    serialization,
+    ticketing,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _shutdown():
+    """Flush buffered work and release every client this process opened."""
+    steps = (
+        outbox.relay.stop,
+        matching.close_writer,
+        tasks.close_redis,
+        auth.shutdown_hashing,
+        database.engine.dispose,
+    )
+    for step in steps:
+        try:
+            step()
+        except Exception:
+            logger.exception("Shutdown step %s failed", step.__qualname__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the outbox relay and release the process's clients on shutdown.
+
+    The schema is managed by Alembic and Redis, Pinecone and the hashing
+    pool are created on first use, so startup only imports code. The
+    objects created by those imports live as long as the process, so they
+    are frozen out of the collector's reach and the first collections
+    while serving do not walk them.
+    """
+    gc.freeze()
+    outbox.relay.start()
+    yield
+    await run_in_threadpool(_shutdown)
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
 
-models.Base.metadata.create_all(bind=database.engine)
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -20,132 +85,299 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)
-):
-    """Return the authenticated user based on the provided JWT token."""
+def get_current_user(token: str = Depends(oauth2_scheme)):
+    """Return the authenticated principal for the provided JWT token.
+
+    Verified tokens are served from ``principals.cache`` without decoding
+    the JWT or touching the database.
+    """
 
+    principal = principals.cached(token)
+    if principal is not None:
+        return principal
     payload = auth.decode_access_token(token)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
     user_id = int(payload.get("sub"))
-    user = db.query(models.User).get(user_id)
-    if user is None:
+    loaded_generation = principals.generation(user_id)
+    principal = principals.load(user_id)
+    if principal is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
-    return user
+    principals.remember(token, payload, principal, loaded_generation)
+    return principal
 
 
 def get_current_organizer(
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(database.get_db),
+    current_user: principals.Principal = Depends(get_current_user),
 ):
     """Ensure the current user is an organizer and return the organizer record."""
 
-    organizer = (
-        db.query(models.Organizer)
-        .filter(models.Organizer.user_id == current_user.id)
-        .first()
-    )
-    if not organizer:
+    if current_user.organizer_id is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Organizer access required"
         )
-    return organizer
+    return schemas.Organizer(id=current_user.organizer_id, user_id=current_user.id)
 
 
-@app.post("/auth/signup", response_model=schemas.AuthResponse)
-def signup(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
-    """Register a new user and return an access token."""
-    existing = db.query(models.User).filter(models.User.email == user.email).first()
-    if existing:
+async def _hashing(fn, *args):
+    """Run a bcrypt helper off the request path, mapping overload to 429."""
+    try:
+        return await auth.run_hashing(fn, *args)
+    except auth.HashingBusy:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many authentication requests, retry shortly",
+            headers={"Retry-After": "1"},
         )
 
-    user_obj = models.User(
-        email=user.email,
-        username=user.username,
-        password_hash=auth.get_password_hash(user.password),
-    )
+
+def _user_by_email(db: Session, email: str) -> Optional[models.User]:
+    return db.query(models.User).filter(models.User.email == email).first()
+
+
+def _add_user(db: Session, email: str, password_hash: str) -> dict:
+    user_obj = models.User(email=email, password_hash=password_hash)
     db.add(user_obj)
     db.commit()
-    db.refresh(user_obj)
+    return {"id": user_obj.id, "email": user_obj.email}
 
-    access_token = auth.create_access_token({"sub": str(user_obj.id)})
+
+def _token_response(user: dict) -> dict:
     return {
-        "access_token": access_token,
+        "access_token": auth.create_access_token({"sub": str(user["id"])}),
         "token_type": "bearer",
-        "user": {
-            "id": str(user_obj.id),
-            "email": user_obj.email,
-            "username": user_obj.username,
-        },
+        "user": user,
     }
 
 
+@app.post("/auth/signup", response_model=schemas.AuthResponse)
+async def signup(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
+    """Register a new user and return an access token.
+
+    Async so that waiting for bcrypt holds no worker thread; the database
+    work runs in the threadpool.
+    """
+    if await run_in_threadpool(_user_by_email, db, user.email):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
+        )
+    password_hash = await _hashing(auth.get_password_hash, user.password)
+    return _token_response(await run_in_threadpool(_add_user, db, user.email, password_hash))
+
+
 @app.post("/auth/login", response_model=schemas.AuthResponse)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(database.get_db),
 ):
-    """Authenticate a user and return a JWT access token."""
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not auth.verify_password(form_data.password, user.password_hash):
+    """Authenticate a user and return a JWT access token.
+
+    Hashes made with an outdated bcrypt cost are upgraded transparently.
+    """
+    user = await run_in_threadpool(_user_by_email, db, form_data.username)
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await _hashing(
+            auth.verify_and_update_password, form_data.password, user.password_hash
+        )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
         )
-
-    access_token = auth.create_access_token({"sub": str(user.id)})
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": {"id": str(user.id), "email": user.email, "username": user.username},
-    }
+    # Read before a commit expires the loaded attributes.
+    found = {"id": user.id, "email": user.email}
+    if new_hash:
+        user.password_hash = new_hash
+        await run_in_threadpool(db.commit)
+    return _token_response(found)
+
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Expose request, database and external call metrics for Prometheus."""
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 @app.get("/me", response_model=schemas.UserRead)
-def read_users_me(current_user: models.User = Depends(get_current_user)):
+def read_users_me(current_user: principals.Principal = Depends(get_current_user)):
     """Return information about the current authenticated user."""
     return current_user
 
 
-@app.get("/events", response_model=list[schemas.Event])
+@app.get("/me/tickets", response_model=schemas.TicketPage)
+def get_my_tickets(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(
+        pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE
+    ),
+    current_user: principals.Principal = Depends(get_current_user),
+    db: Session = Depends(database.get_db),
+):
+    """List the user's tickets with their events, ordered by event date.
+
+    Tickets and events are read with one joined query per page, and pages
+    are cached per user until the user's next purchase.
+    """
+    try:
+        stmt = queries.user_tickets(current_user.id, cursor, limit)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    key = event_cache.tickets_key(current_user.id, cursor=cursor, limit=limit)
+    body = event_cache.lookup(key)
+    if body is None:
+        page = queries.ticket_page(db.execute(stmt).scalars().all(), limit)
+        body = event_cache.encode(schemas.TicketPage, page)
+        event_cache.store(key, body)
+    return event_cache.respond(request, body)
+
+
+@app.get("/events", response_model=schemas.EventPage)
 def get_events(
-    current_user: models.User = Depends(get_current_user),
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(
+        pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE
+    ),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    location: Optional[str] = None,
+    current_user: principals.Principal = Depends(get_current_user),
+    db: Session = Depends(database.get_db),
+):
+    """List events ordered by date, one keyset-paginated page at a time.
+
+    ``start``/``end`` bound the event date (inclusive/exclusive) and
+    ``location`` matches exactly, so every filter is served by the
+    ``(date, id)`` and ``(location, date, id)`` indexes. Pages are served
+    from the event cache when possible.
+    """
+    try:
+        stmt = queries.event_feed(cursor, limit, start, end, location)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    key = event_cache.list_key(
+        cursor=cursor, limit=limit, start=start, end=end, location=location
+    )
+    body = event_cache.lookup(key)
+    if body is None:
+        page = queries.event_page(db.execute(stmt).all(), limit)
+        body = serialization.dumps(page)
+        event_cache.store(key, body)
+    return event_cache.respond(request, body)
+
+
+@app.get("/recommendations", response_model=list[schemas.RecommendedEvent])
+def get_recommendations(
+    limit: int = Query(
+        pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE
+    ),
+    current_user: principals.Principal = Depends(get_current_user),
+    db: Session = Depends(database.get_db),
+):
+    """Recommend upcoming events similar to those the user has tickets for."""
+    return [
+        {
+            "id": event.id,
+            "title": event.title,
+            "description": event.description,
+            "date": event.date,
+            "location": event.location,
+            "organizer_id": event.organizer_id,
+            "capacity": event.capacity,
+            "sold": event.sold,
+            "score": score,
+        }
+        for event, score in recommendations.recommend(db, current_user, limit)
+    ]
+
+
+@app.get("/events/search", response_model=schemas.EventSearchPage)
+def search_events(
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(
+        pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE
+    ),
+    location: Optional[str] = None,
+    current_user: principals.Principal = Depends(get_current_user),
     db: Session = Depends(database.get_db),
 ):
-    """List all events."""
-    return db.query(models.Event).all()
+    """Rank events whose title, description or location match ``q``.
+
+    Every term must match; the last one also matches as a prefix.
+    ``location`` restricts results to one venue city.
+    """
+    try:
+        offset = pagination.decode_offset(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    stmt = search.search_statement(db.get_bind().dialect.name, q, limit, offset, location)
+    if stmt is None:
+        return {"items": [], "next_cursor": None}
+    rows, next_offset = search.search_page(db.execute(stmt).all(), limit, offset)
+    return {
+        "items": [
+            {
+                "id": event.id,
+                "title": event.title,
+                "description": event.description,
+                "date": event.date,
+                "location": event.location,
+                "organizer_id": event.organizer_id,
+                "capacity": event.capacity,
+                "sold": event.sold,
+                "score": score,
+            }
+            for event, score in rows
+        ],
+        "next_cursor": pagination.encode_offset(next_offset) if next_offset else None,
+    }
 
 
 @app.get("/events/{event_id}", response_model=schemas.Event)
 def get_event(
     event_id: int,
-    current_user: models.User = Depends(get_current_user),
+    request: Request,
+    current_user: principals.Principal = Depends(get_current_user),
     db: Session = Depends(database.get_db),
 ):
-    """Retrieve details for a single event."""
-    event = db.query(models.Event).get(event_id)
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Event not found"
-        )
-    return event
+    """Retrieve details for a single event, through the event cache."""
+    key = event_cache.detail_key(event_id)
+    body = event_cache.lookup(key)
+    if body is None:
+        event = db.get(models.Event, event_id)
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Event not found"
+            )
+        body = event_cache.encode(schemas.Event, event)
+        event_cache.store(key, body)
+    return event_cache.respond(request, body)
 
 
 @app.post("/events", response_model=schemas.Event)
 def create_event(
     event: schemas.EventCreate,
-    organizer: models.Organizer = Depends(get_current_organizer),
+    organizer: schemas.Organizer = Depends(get_current_organizer),
     db: Session = Depends(database.get_db),
 ):
     """Create a new event owned by the authenticated organizer."""
@@ -154,53 +386,129 @@ def create_event(
         description=event.description,
         date=event.date,
         location=event.location,
+        capacity=event.capacity,
         organizer_id=organizer.id,
     )
     db.add(event_obj)
+    db.flush()
+    # Matching is requested in the same transaction; the relay enqueues it.
+    outbox.add(db, [event_obj.id])
     db.commit()
     db.refresh(event_obj)
-    # Enqueue background matching task
-    tasks.enqueue_match_event(event_obj.id)
+    recommendations.add_event(event_obj)
+    event_cache.invalidate_lists()
     return event_obj
 
 
+@app.post("/events:bulk", response_model=schemas.BulkImportResult)
+async def bulk_create_events(
+    request: Request,
+    organizer: schemas.Organizer = Depends(get_current_organizer),
+    db: Session = Depends(database.get_db),
+):
+    """Import events streamed as NDJSON or CSV in a single transaction.
+
+    Rows are parsed as the body arrives and inserted in batches; nothing is
+    committed unless every row is valid. Matching for the imported events
+    is requested through the outbox in the same transaction.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in bulk.CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Expected one of {', '.join(bulk.CONTENT_TYPES)}",
+        )
+
+    event_ids: list[int] = []
+    batch: list[dict] = []
+    try:
+        async for line_no, record in bulk.iter_records(request.stream(), content_type):
+            try:
+                event = schemas.EventCreate(**record)
+            except ValidationError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail={
+                        "line": line_no,
+                        "errors": [
+                            {"loc": list(err["loc"]), "msg": err["msg"]}
+                            for err in exc.errors()
+                        ],
+                    },
+                )
+            batch.append({**event.model_dump(), "organizer_id": organizer.id})
+            if len(batch) >= bulk.BATCH_SIZE:
+                event_ids += await run_in_threadpool(bulk.insert_events, db, batch)
+                batch = []
+        if batch:
+            event_ids += await run_in_threadpool(bulk.insert_events, db, batch)
+        await run_in_threadpool(outbox.add, db, event_ids)
+        await run_in_threadpool(db.commit)
+    except ValueError as exc:
+        await run_in_threadpool(db.rollback)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+        )
+    except BaseException:
+        await run_in_threadpool(db.rollback)
+        raise
+
+    if event_ids:
+        await run_in_threadpool(recommendations.add_imported, db, event_ids)
+        event_cache.invalidate_lists()
+    return {"created": len(event_ids), "ids": event_ids}
+
+
 @app.get("/organizer/events", response_model=list[schemas.EventWithSales])
 def get_organizer_events(
-    organizer: models.Organizer = Depends(get_current_organizer),
+    organizer: schemas.Organizer = Depends(get_current_organizer),
     db: Session = Depends(database.get_db),
 ):
     """Return all events created by the current organizer with ticket sales."""
-    events = (
-        db.query(models.Event).filter(models.Event.organizer_id == organizer.id).all()
-    )
-    results = []
-    for event in events:
-        sales = (
-            db.query(func.count(models.Ticket.id))
-            .filter(models.Ticket.event_id == event.id)
-            .scalar()
-        )
-        results.append(
-            {
-                "id": event.id,
-                "title": event.title,
-                "description": event.description,
-                "date": event.date,
-                "location": event.location,
-                "organizer_id": event.organizer_id,
-                "ticket_sales": sales or 0,
-            }
-        )
-    return results
+    rows = db.execute(
+        select(*queries.EVENT_COLUMNS, func.count(models.Ticket.id).label("ticket_sales"))
+        .outerjoin(models.Ticket, models.Ticket.event_id == models.Event.id)
+        .where(models.Event.organizer_id == organizer.id)
+        .group_by(models.Event.id)
+    ).all()
+    return serialization.respond(serialization.records(rows))
+
+
+@app.get("/organizer/stats", response_model=schemas.SalesStats)
+def get_organizer_stats(
+    bucket: str = Query("day", pattern="^(hour|day)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    event_id: Optional[int] = None,
+    organizer: schemas.Organizer = Depends(get_current_organizer),
+    db: Session = Depends(database.get_db),
+):
+    """Return the organizer's ticket sales per hour or day (UTC).
+
+    Read from the hourly sales rollup only, so the cost grows with the
+    number of hours with sales rather than the number of tickets. ``event_id``
+    narrows the series to one event; ``start``/``end`` bound it.
+    """
+    points = sales.series(db, organizer.id, bucket, start, end, event_id)
+    return {
+        "bucket": bucket,
+        "total": sum(point["tickets"] for point in points),
+        "points": points,
+    }
 
 
 @app.get("/organizer/events/{event_id}/tickets", response_model=list[schemas.Ticket])
 def get_event_tickets(
     event_id: int,
-    organizer: models.Organizer = Depends(get_current_organizer),
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    organizer: schemas.Organizer = Depends(get_current_organizer),
     db: Session = Depends(database.get_db),
 ):
-    """List tickets sold for a specific event."""
+    """List tickets sold for a specific event.
+
+    With ``format=ndjson`` or ``format=csv`` the list is streamed in
+    constant memory instead of being returned as one JSON array.
+    """
     event = (
         db.query(models.Event)
         .filter(models.Event.id == event_id, models.Event.organizer_id == organizer.id)
@@ -210,28 +518,145 @@ def get_event_tickets(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Event not found"
         )
-    return db.query(models.Ticket).filter(models.Ticket.event_id == event_id).all()
+    if format is not None:
+        return StreamingResponse(
+            exports.iter_tickets(event_id, format),
+            media_type=exports.MEDIA_TYPES[format],
+            headers={
+                "Content-Disposition": f'attachment; filename="event-{event_id}-tickets.{format}"'
+            },
+        )
+    rows = db.execute(
+        select(*queries.TICKET_COLUMNS)
+        .where(models.Ticket.event_id == event_id)
+        .order_by(models.Ticket.id)
+    ).all()
+    return serialization.respond(serialization.records(rows))
 
 
 @app.post("/events/{event_id}/tickets", response_model=schemas.Ticket)
 def purchase_ticket(
     event_id: int,
-    current_user: models.User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=ticketing.MAX_KEY_LENGTH),
+    current_user: principals.Principal = Depends(get_current_user),
     db: Session = Depends(database.get_db),
 ):
-    """Purchase a ticket for an event."""
-    event = db.query(models.Event).get(event_id)
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Event not found"
-        )
-    ticket = models.Ticket(event_id=event_id, user_id=current_user.id)
+    """Purchase a ticket for an event.
+
+    Seats are reserved atomically against the event's capacity. Retrying
+    with the same ``Idempotency-Key`` header returns the original ticket
+    instead of buying another one.
+    """
+    if idempotency_key is not None:
+        existing = ticketing.find_by_idempotency_key(db, current_user.id, idempotency_key)
+        if existing is not None:
+            return _replayed_ticket(existing, event_id)
+
+    if not ticketing.reserve_seats(db, event_id):
+        db.rollback()
+        if db.get(models.Event, event_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Event not found"
+            )
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Sold out")
+    ticket = models.Ticket(
+        event_id=event_id, user_id=current_user.id, idempotency_key=idempotency_key
+    )
     db.add(ticket)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request with the same key won; undo our seat and replay it.
+        db.rollback()
+        existing = ticketing.find_by_idempotency_key(db, current_user.id, idempotency_key)
+        if existing is None:
+            raise
+        return _replayed_ticket(existing, event_id)
     db.refresh(ticket)
+    event_cache.invalidate_event([event_id])
+    event_cache.invalidate_tickets(current_user.id)
     return ticket
 
 
+def _replayed_ticket(ticket: models.Ticket, event_id: int) -> models.Ticket:
+    """Return a previously bought ticket if the retry targets the same event."""
+    if ticket.event_id != event_id:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Idempotency key already used for another event",
+        )
+    return ticket
+
+
+def _replayed_order(db: Session, ticket_order: models.TicketOrder, event_id: int):
+    """Return the tickets of a previous batch if the retry targets the same event."""
+    if ticket_order.event_id != event_id:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Idempotency key already used for another event",
+        )
+    return ticketing.order_tickets(db, ticket_order)
+
+
+@app.post("/events/{event_id}/tickets:batch", response_model=list[schemas.Ticket])
+def purchase_tickets_batch(
+    event_id: int,
+    order: schemas.TicketBatchCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=ticketing.MAX_KEY_LENGTH),
+    current_user: principals.Principal = Depends(get_current_user),
+    db: Session = Depends(database.get_db),
+):
+    """Purchase several tickets for an event in one transaction.
+
+    All seats are reserved with a single conditional update, so either the
+    whole order fits in the remaining capacity or nothing is sold. With an
+    ``Idempotency-Key`` header, retries return the original tickets.
+    """
+    if idempotency_key is not None:
+        existing = ticketing.find_order(db, current_user.id, idempotency_key)
+        if existing is not None:
+            return _replayed_order(db, existing, event_id)
+
+    if not ticketing.reserve_seats(db, event_id, order.quantity):
+        db.rollback()
+        if db.get(models.Event, event_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Event not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Not enough tickets left"
+        )
+    # The key is stored once, on the order, so it never collides with the
+    # keys of single purchases.
+    ticket_order = None
+    if idempotency_key is not None:
+        ticket_order = models.TicketOrder(
+            user_id=current_user.id, event_id=event_id, idempotency_key=idempotency_key
+        )
+        db.add(ticket_order)
+    tickets = [
+        models.Ticket(event_id=event_id, user_id=current_user.id, order=ticket_order)
+        for _ in range(order.quantity)
+    ]
+    db.add_all(tickets)
+    try:
+        db.flush()
+    except IntegrityError:
+        # A concurrent request with the same key won; undo our seats and replay it.
+        db.rollback()
+        existing = ticketing.find_order(db, current_user.id, idempotency_key)
+        if existing is None:
+            raise
+        return _replayed_order(db, existing, event_id)
+    result = [
+        {"id": t.id, "event_id": t.event_id, "user_id": t.user_id} for t in tickets
+    ]
+    db.commit()
+    event_cache.invalidate_event([event_id])
+    event_cache.invalidate_tickets(current_user.id)
+    return result
+
+
 @app.post("/signup", response_model=schemas.SignupRead)
 def create_signup(info: schemas.SignupCreate, db: Session = Depends(database.get_db)):
     """Store a simple signup record."""
@@ -247,7 +672,7 @@ def create_signup(info: schemas.SignupCreate, db: Session = Depends(database.get
 @app.post("/match/{event_id}")
 def match_event(
     event_id: int,
-    current_user: models.User = Depends(get_current_user),
+    current_user: principals.Principal = Depends(get_current_user),
     db: Session = Depends(database.get_db),
 ):
     """Generate embeddings for a user and event and store them in Pinecone."""
@@ -257,10 +682,16 @@ def match_event(
             status_code=status.HTTP_404_NOT_FOUND, detail="Event not found"
         )
 
-    user_emb = matching.generate_user_embedding(current_user)
+    user_emb = matching.generate_user_embedding(current_user, db)
     event_emb = matching.generate_event_embedding(event)
 
     matching.store_user_embedding(current_user.id, user_emb)
     matching.store_event_embedding(event.id, event_emb)
 
     return {"detail": "Embeddings stored"}
+
+
+if database.ASYNC_MODE:
+    from . import async_routes
+
+    async_routes.install(app)
@@ -1,32 +1,167 @@
 """Utilities for generating and storing recommendation embeddings."""
 
-from typing import List
+import os
+import threading
+from typing import List, Optional, Sequence, Tuple
 
-from . import models
-from .pinecone_client import index
+import numpy as np
+from sqlalchemy.orm import Session, object_session
 
+from . import models, pinecone_client, profiles
+from .embedding_store import EmbeddingStore, Matrix
+from .embeddings import embedder
+from .vector_index import BulkUpserter
 
-def generate_user_embedding(user: models.User) -> List[float]:
-    """Return a placeholder embedding for a user."""
-    # TODO: Replace with real model call
-    return [0.0] * 128
+# Users scored per block; bounds matcher memory to ~chunk * (dim + events) floats.
+MATCH_CHUNK_SIZE = int(os.getenv("MATCH_CHUNK_SIZE", "65536"))
 
+# Directory of a local store mirroring the user profiles (unset reads the
+# database on every job) and its row type, float32 or int8.
+USER_EMBEDDING_STORE = os.getenv("USER_EMBEDDING_STORE")
+USER_EMBEDDING_DTYPE = os.getenv("USER_EMBEDDING_DTYPE", "float32")
 
-def generate_event_embedding(event: models.Event) -> List[float]:
-    """Return a placeholder embedding for an event."""
-    # TODO: Replace with real model call
-    return [0.0] * 128
+_writer: Optional[BulkUpserter] = None
+_writer_lock = threading.Lock()
+_user_store: Optional[EmbeddingStore] = None
+_user_store_lock = threading.Lock()
 
 
-def store_user_embedding(user_id: int, embedding: List[float]):
-    """Store a user embedding in Pinecone."""
-    if index is None:
-        return
-    index.upsert([(f"user-{user_id}", embedding)])
+def get_writer() -> BulkUpserter:
+    """Return the shared writer, so concurrent callers' vectors are coalesced."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BulkUpserter(pinecone_client.get_index())
+        return _writer
 
 
-def store_event_embedding(event_id: int, embedding: List[float]):
-    """Store an event embedding in Pinecone."""
-    if index is None:
-        return
-    index.upsert([(f"event-{event_id}", embedding)])
+def close_writer():
+    """Upsert any buffered vectors, if the writer was ever used."""
+    with _writer_lock:
+        writer = _writer
+    if writer is not None:
+        writer.close()
+
+
+def get_user_store() -> Optional[EmbeddingStore]:
+    """Return the user embedding store, or ``None`` when not configured."""
+    global _user_store
+    with _user_store_lock:
+        if USER_EMBEDDING_STORE and _user_store is None:
+            _user_store = EmbeddingStore(USER_EMBEDDING_STORE, embedder.dim, USER_EMBEDDING_DTYPE)
+        return _user_store
+
+
+def generate_user_embedding(user, db: Optional[Session] = None) -> np.ndarray:
+    """Return a user's normalised interest profile.
+
+    ``user`` only needs an ``id``; ``db`` defaults to the user's own session.
+    Users without any ticket history get the zero vector.
+    """
+    db = db or object_session(user)
+    if db is None:
+        return np.zeros(embedder.dim, dtype=np.float32)
+    return profiles.load(db, user.id)
+
+
+def generate_event_embedding(event: models.Event) -> np.ndarray:
+    """Return the embedding for a single event."""
+    return embedder.embed(event.title, event.description, event.location)
+
+
+def generate_event_embeddings(events: Sequence[models.Event]) -> np.ndarray:
+    """Embed many events in one vectorised call, one row per event."""
+    return embedder.embed_many(
+        (event.title, event.description, event.location) for event in events
+    )
+
+
+def store_user_embedding(user_id: int, embedding: np.ndarray):
+    """Queue a user embedding for upsert into the vector index."""
+    get_writer().add(f"user-{user_id}", embedding, {"kind": "user"})
+
+
+def store_event_embedding(event_id: int, embedding: np.ndarray):
+    """Queue an event embedding for upsert into the vector index."""
+    get_writer().add(f"event-{event_id}", embedding, {"kind": "event"})
+
+
+def store_event_embeddings(event_ids: Sequence[int], embeddings: np.ndarray):
+    """Queue many event embeddings, one row of ``embeddings`` per id."""
+    get_writer().add_many(
+        [f"event-{event_id}" for event_id in event_ids],
+        embeddings,
+        [{"kind": "event"}] * len(event_ids),
+    )
+
+
+def load_user_embeddings(db: Session) -> Tuple[np.ndarray, Matrix]:
+    """Return ``(user_ids, matrix)`` for every user with ticket history.
+
+    Rows are the users' stored profiles, normalised. With
+    ``USER_EMBEDDING_STORE`` set, profiles changed since the previous job
+    are synced into the store and the matrix is mapped from it; otherwise
+    every profile is read in one query.
+    """
+    store = get_user_store()
+    if store is None:
+        return profiles.load_all(db)
+    profiles.sync_store(db, store)
+    return store.snapshot()
+
+
+def top_k_users(
+    event_matrix: np.ndarray,
+    user_matrix: Matrix,
+    k: int,
+    chunk_size: int = MATCH_CHUNK_SIZE,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the ``k`` best-scoring user rows for each event row.
+
+    Users are scored in blocks of ``chunk_size`` rows with one matrix
+    multiplication per block; each block's top-``k`` candidates are merged
+    into a running top-``k`` with ``argpartition``, so memory stays bounded
+    regardless of the number of users (an int8 ``QuantizedRows`` matrix is
+    dequantized one block at a time). Returns ``(rows, scores)``, both of
+    shape ``(n_events, k')`` with ``k' = min(k, n_users)``, best first.
+    """
+    event_matrix = np.atleast_2d(event_matrix).astype(np.float32, copy=False)
+    n_events, n_users = len(event_matrix), len(user_matrix)
+    k = min(k, n_users)
+    best_rows = np.empty((n_events, 0), dtype=np.int64)
+    best_scores = np.empty((n_events, 0), dtype=np.float32)
+    if k == 0:
+        return best_rows, best_scores
+
+    for start in range(0, n_users, chunk_size):
+        block = user_matrix[start: start + chunk_size]
+        scores = event_matrix @ block.T
+        if scores.shape[1] > k:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            scores = np.take_along_axis(scores, top, axis=1)
+        else:
+            top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        rows = np.concatenate([best_rows, top + start], axis=1)
+        scores = np.concatenate([best_scores, scores], axis=1)
+        if scores.shape[1] > k:
+            keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            rows = np.take_along_axis(rows, keep, axis=1)
+            scores = np.take_along_axis(scores, keep, axis=1)
+        best_rows, best_scores = rows, scores
+
+    order = np.argsort(-best_scores, axis=1)
+    return (
+        np.take_along_axis(best_rows, order, axis=1),
+        np.take_along_axis(best_scores, order, axis=1),
+    )
+
+
+def match_rows(
+    event_ids: Sequence[int], user_ids: np.ndarray, rows: np.ndarray, scores: np.ndarray
+) -> List[dict]:
+    """Turn ``top_k_users`` output into ``matches`` table rows."""
+    return [
+        {"event_id": event_id, "user_id": int(user_id), "score": float(score)}
+        for event_id, event_rows, event_scores in zip(event_ids, rows, scores)
+        for user_id, score in zip(user_ids[event_rows], event_scores)
+    ]
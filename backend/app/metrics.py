@@ -0,0 +1,334 @@
+"""Request metrics in Prometheus text format and an opt-in slow-request profiler.
+
+``MetricsMiddleware`` times every HTTP request and, through a context
+variable, attributes the SQL statements (via engine cursor events) and
+Redis/Pinecone calls (via ``external``) made while serving it. Histograms
+are labelled by route template rather than raw path so cardinality stays
+bounded, and ``render`` produces the exposition served on ``/metrics``.
+
+Setting ``PROFILE_SLOW_REQUESTS_MS`` enables a sampling profiler: while
+requests are in flight a background thread samples every thread's stack
+every ``PROFILE_INTERVAL_MS``, and requests slower than the threshold
+dump the samples taken during them to ``PROFILE_DIR`` as collapsed
+stacks (``flamegraph.pl`` / speedscope input). Under concurrency a
+profile also contains other requests' work.
+"""
+
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SLOW_REQUESTS_MS = float(os.getenv("PROFILE_SLOW_REQUESTS_MS", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv(
+    "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "kinlia-profiles")
+)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """Thread-safe Prometheus histogram with optional labels."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        """Record ``value`` for the series identified by ``labels``."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def totals(self) -> Tuple[float, int]:
+        """Return the sum and count of observations across all series."""
+        with self._lock:
+            return (
+                sum(total for _, total, _ in self._series.values()),
+                sum(count for _, _, count in self._series.values()),
+            )
+
+    def clear(self):
+        """Drop every recorded series."""
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        """Return the exposition lines for this histogram."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted((labels, (list(b), s, c)) for labels, (b, s, c) in self._series.items())
+        for labels, (counts, total, count) in series:
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = ",".join(pairs + [f'le="{_format_value(bound)}"'])
+                lines.append(f"{self.name}_bucket{{{le}}} {cumulative}")
+            le = ",".join(pairs + ['le="+Inf"'])
+            lines.append(f"{self.name}_bucket{{{le}}} {count}")
+            label_str = "{" + ",".join(pairs) + "}" if pairs else ""
+            lines.append(f"{self.name}_sum{label_str} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_str} {count}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ("method", "route", "status"),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request.",
+    ("method", "route"),
+    COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per HTTP request.",
+    ("method", "route"),
+)
+REQUEST_EXTERNAL_SECONDS = Histogram(
+    "http_request_external_seconds",
+    "Time spent calling an external service per HTTP request.",
+    ("method", "route", "service"),
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "Latency of individual SQL statements."
+)
+EXTERNAL_CALL_SECONDS = Histogram(
+    "external_call_duration_seconds",
+    "Latency of individual Redis and Pinecone calls.",
+    ("service",),
+)
+
+REGISTRY = (
+    REQUEST_SECONDS,
+    REQUEST_DB_QUERIES,
+    REQUEST_DB_SECONDS,
+    REQUEST_EXTERNAL_SECONDS,
+    DB_QUERY_SECONDS,
+    EXTERNAL_CALL_SECONDS,
+)
+
+
+def render() -> str:
+    """Return every metric in Prometheus text exposition format."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+def reset():
+    """Clear every metric."""
+    for metric in REGISTRY:
+        metric.clear()
+
+
+@dataclass
+class RequestStats:
+    """Work attributed to the request being served."""
+
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    external: Dict[str, float] = field(default_factory=dict)
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def external(service: str):
+    """Time a call to an external service such as ``"redis"``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        EXTERNAL_CALL_SECONDS.observe(elapsed, service)
+        stats = _current.get()
+        if stats is not None:
+            stats.external[service] = stats.external.get(service, 0.0) + elapsed
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    DB_QUERY_SECONDS.observe(elapsed)
+    stats = _current.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+
+
+# Leaf functions of threads that are parked rather than doing work.
+_IDLE_LEAVES = {"wait", "select", "poll", "_recv", "accept", "_worker"}
+
+
+class SamplingProfiler:
+    """Sample all thread stacks while at least one request is in flight."""
+
+    def __init__(self, interval: float, max_samples: int = 200_000):
+        self.interval = interval
+        self._samples: deque = deque(maxlen=max_samples)
+        self._active = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def begin(self) -> float:
+        """Register a request; returns its start time on the sample clock."""
+        with self._lock:
+            self._active += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="request-profiler", daemon=True
+                )
+                self._thread.start()
+        return time.monotonic()
+
+    def end(self, started: float) -> Counter:
+        """Unregister a request and return its folded stacks with counts."""
+        finished = time.monotonic()
+        with self._lock:
+            self._active -= 1
+            samples = [stack for at, stack in self._samples if started <= at <= finished]
+        return Counter(samples)
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                if self._active == 0:
+                    self._thread = None
+                    self._samples.clear()
+                    return
+            now = time.monotonic()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or frame.f_code.co_name in _IDLE_LEAVES:
+                    continue
+                self._samples.append((now, _fold(frame)))
+            time.sleep(self.interval)
+
+
+def _fold(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+profiler = (
+    SamplingProfiler(PROFILE_INTERVAL_MS / 1000) if PROFILE_SLOW_REQUESTS_MS > 0 else None
+)
+
+
+def _dump_profile(method: str, route: str, seconds: float, stacks: Counter) -> Optional[str]:
+    if not stacks:
+        return None
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    path = os.path.join(
+        PROFILE_DIR, f"{time.strftime('%Y%m%dT%H%M%S')}-{method}-{slug}-{seconds * 1000:.0f}ms.folded"
+    )
+    with open(path, "w") as out:
+        for stack, count in stacks.most_common():
+            out.write(f"{stack} {count}\n")
+    return path
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency, DB and external call time."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+        profile_started = profiler.begin() if profiler is not None else None
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            REQUEST_SECONDS.observe(elapsed, method, route, str(status))
+            REQUEST_DB_QUERIES.observe(stats.db_queries, method, route)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, method, route)
+            for service, seconds in stats.external.items():
+                REQUEST_EXTERNAL_SECONDS.observe(seconds, method, route, service)
+            if profile_started is not None:
+                stacks = profiler.end(profile_started)
+                if elapsed * 1000 >= PROFILE_SLOW_REQUESTS_MS:
+                    path = _dump_profile(method, route, elapsed, stacks)
+                    logger.warning(
+                        "Slow request %s %s took %.0f ms; profile: %s",
+                        method, route, elapsed * 1000, path,
+                    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, Index, LargeBinary
 from sqlalchemy.orm import relationship
 """SQLAlchemy models for the application."""
 
@@ -39,9 +39,18 @@ class Event(Base):
     date = Column(DateTime, nullable=False, default=datetime.utcnow)
     location = Column(String, nullable=False)
     organizer_id = Column(Integer, ForeignKey("organizers.id"), nullable=False)
+    # Maximum tickets for sale (NULL means unlimited) and tickets sold so far.
+    capacity = Column(Integer, nullable=True)
+    sold = Column(Integer, nullable=False, default=0, server_default="0")
 
     organizer = relationship("Organizer")
 
+    __table_args__ = (
+        Index("ix_events_date_id", "date", "id"),
+        Index("ix_events_location_date_id", "location", "date", "id"),
+        Index("ix_events_organizer_id", "organizer_id"),
+    )
+
 
 class Ticket(Base):
     __tablename__ = "tickets"
@@ -49,11 +58,97 @@ class Ticket(Base):
     """Ticket purchase linking a user and an event."""
 
     id = Column(Integer, primary_key=True, index=True)
-    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    idempotency_key = Column(String, nullable=True)
+    # Set on every ticket of a batch bought under an Idempotency-Key.
+    order_id = Column(Integer, ForeignKey("ticket_orders.id"), nullable=True, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
     event = relationship("Event")
     user = relationship("User")
+    order = relationship("TicketOrder")
+
+    __table_args__ = (
+        Index(
+            "ix_tickets_user_id_idempotency_key",
+            "user_id",
+            "idempotency_key",
+            unique=True,
+        ),
+    )
+
+
+class TicketOrder(Base):
+    __tablename__ = "ticket_orders"
+
+    """Batch purchase made under an Idempotency-Key, stored once per batch."""
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    idempotency_key = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index(
+            "ix_ticket_orders_user_id_idempotency_key",
+            "user_id",
+            "idempotency_key",
+            unique=True,
+        ),
+    )
+
+
+class Match(Base):
+    __tablename__ = "matches"
+
+    """Recommendation of an event to a user produced by the matching job."""
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    score = Column(Float, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_matches_event_id_score", "event_id", "score"),
+        Index("ix_matches_user_id_score", "user_id", "score"),
+    )
+
+
+class EventSalesHourly(Base):
+    __tablename__ = "event_sales_hourly"
+
+    """Tickets sold for an event during one UTC hour, kept up to date by purchases."""
+
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
+    hour = Column(DateTime, primary_key=True)
+    tickets = Column(Integer, nullable=False, default=0)
+
+
+class MatchOutbox(Base):
+    __tablename__ = "match_outbox"
+
+    """Event awaiting a matching job, written in the transaction that created it."""
+
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    # Set when a relay claims the row; the RQ job id it is handed off under.
+    job_id = Column(String, nullable=True, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class UserProfile(Base):
+    __tablename__ = "user_profiles"
+
+    """Running mean of the embeddings of the events a user has tickets for."""
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    ticket_count = Column(Integer, nullable=False, default=0)
+    # Unnormalised mean as raw float32 bytes, EMBEDDING_DIM values.
+    vector = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
 
 
 class Signup(Base):
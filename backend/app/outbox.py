@@ -0,0 +1,149 @@
+"""Transactional outbox for matching jobs.
+
+Endpoints that create events call ``add`` in the same transaction, so an
+event is committed together with its request for matching and nothing
+talks to Redis on the request path. A relay thread drains the table to
+RQ, ``MATCH_JOB_SIZE`` events per job.
+
+Each batch is first claimed by stamping its rows with a job id and
+committing, then enqueued under that id and deleted. A relay that dies
+after claiming retries the same rows under the same id, and the enqueue
+is skipped when Redis already has that job, so every outbox row is
+handed off exactly once. Rows are claimed with ``SKIP LOCKED`` where the
+database supports it, so every API process can run a relay.
+"""
+
+import logging
+import os
+import threading
+import uuid
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from . import database, models, tasks
+
+logger = logging.getLogger(__name__)
+
+# Seconds between polls of the outbox (0 disables the relay in this process)
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1"))
+
+
+def add(db: Session, event_ids: Iterable[int]):
+    """Request matching for ``event_ids`` when ``db``'s transaction commits."""
+    rows = [{"event_id": event_id} for event_id in event_ids]
+    if rows:
+        db.execute(insert(models.MatchOutbox), rows)
+
+
+def _claimed_jobs(db: Session) -> List[str]:
+    return list(
+        db.scalars(
+            select(models.MatchOutbox.job_id)
+            .where(models.MatchOutbox.job_id.is_not(None))
+            .distinct()
+        )
+    )
+
+
+def _claim(db: Session, batch_size: int) -> Optional[str]:
+    ids = db.scalars(
+        select(models.MatchOutbox.id)
+        .where(models.MatchOutbox.job_id.is_(None))
+        .order_by(models.MatchOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not ids:
+        db.rollback()
+        return None
+    # Row ids are reused once handed-off rows are deleted, so they cannot
+    # name the job: Redis may still hold a finished job under an old id.
+    job_id = f"match-outbox-{uuid.uuid4().hex}"
+    db.execute(
+        update(models.MatchOutbox)
+        .where(models.MatchOutbox.id.in_(ids))
+        .values(job_id=job_id)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return job_id
+
+
+def _hand_off(db: Session, job_id: str) -> int:
+    event_ids = db.scalars(
+        select(models.MatchOutbox.event_id)
+        .where(models.MatchOutbox.job_id == job_id)
+        .order_by(models.MatchOutbox.id)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if event_ids:
+        tasks.enqueue_match_job(job_id, list(dict.fromkeys(event_ids)))
+        db.execute(delete(models.MatchOutbox).where(models.MatchOutbox.job_id == job_id))
+    db.commit()
+    return len(event_ids)
+
+
+def relay_once(batch_size: int = tasks.MATCH_JOB_SIZE) -> int:
+    """Hand pending outbox rows to RQ; returns the number of rows sent.
+
+    Batches left claimed by an earlier failed run go first, then new rows
+    are claimed until the outbox is empty.
+    """
+    db = database.SessionLocal()
+    try:
+        sent = 0
+        for job_id in _claimed_jobs(db):
+            sent += _hand_off(db, job_id)
+        while True:
+            job_id = _claim(db, batch_size)
+            if job_id is None:
+                return sent
+            sent += _hand_off(db, job_id)
+    finally:
+        db.close()
+
+
+class Relay:
+    """Background thread running ``relay_once`` every ``interval`` seconds."""
+
+    def __init__(self, interval: float = OUTBOX_POLL_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start polling, unless disabled or already running."""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling after a final drain."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def run(self):
+        """Poll until ``stop`` is called, draining once more on the way out."""
+        while True:
+            stopping = self._stop.wait(self.interval)
+            try:
+                relay_once()
+            except Exception:
+                logger.exception("Outbox relay failed; retrying in %.1fs", self.interval)
+            if stopping:
+                return
+
+
+relay = Relay()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    Relay(OUTBOX_POLL_INTERVAL or 1).run()
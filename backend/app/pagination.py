@@ -0,0 +1,48 @@
+"""Helpers for keyset (cursor) pagination of list endpoints."""
+
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(date: datetime, row_id: int) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    raw = json.dumps([date.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by ``encode_cursor``.
+
+    Raises ``ValueError`` if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_str, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(date_str), int(row_id)
+    except (TypeError, ValueError, json.JSONDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_offset(offset: int) -> str:
+    """Encode a result offset as an opaque cursor, for ranked results."""
+    return base64.urlsafe_b64encode(json.dumps(["o", offset]).encode()).decode().rstrip("=")
+
+
+def decode_offset(cursor: str) -> int:
+    """Decode a cursor produced by ``encode_offset``.
+
+    Raises ``ValueError`` if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        tag, offset = json.loads(base64.urlsafe_b64decode(padded))
+        if tag != "o" or int(offset) < 0:
+            raise ValueError
+        return int(offset)
+    except (TypeError, ValueError, json.JSONDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
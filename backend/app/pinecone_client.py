@@ -1,15 +1,36 @@
-"""Small helper for accessing the Pinecone vector index."""
+"""Small helper for accessing the Pinecone vector index.
+
+Without ``PINECONE_API_KEY`` the app falls back to an in-process
+``LocalVectorIndex`` exposing the same upsert/query interface. The index
+is created on first use rather than at import, so importing the app does
+not import the Pinecone SDK or call its API.
+"""
 
 import os
-import pinecone
+import threading
+
+from .embeddings import EMBEDDING_DIM
+from .vector_index import LocalVectorIndex
 
 api_key = os.getenv("PINECONE_API_KEY")
-# Pinecone environment and index can optionally be specified via env vars
-environment = os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
+# The Pinecone index can optionally be specified via env vars
 index_name = os.getenv("PINECONE_INDEX", "kinlia")
 
-if api_key:
-    pinecone.init(api_key=api_key, environment=environment)
-    index = pinecone.Index(index_name)
-else:
-    index = None
+is_local = not api_key
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Return the shared vector index, connecting on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            if is_local:
+                _index = LocalVectorIndex(dim=EMBEDDING_DIM)
+            else:
+                from pinecone import Pinecone
+
+                _index = Pinecone(api_key=api_key).Index(index_name)
+        return _index
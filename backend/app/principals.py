@@ -0,0 +1,110 @@
+"""Cached resolution of bearer tokens to the authenticated principal.
+
+Verified tokens map to a small immutable ``Principal`` holding the user
+and, if any, the organizer id, so the common authenticated request needs
+no JWT decode and no database round trip. ORM changes to a user or
+organizer row invalidate that user's entries in this process; other
+processes (and Core-level bulk updates) only see changes once the entry's
+TTL, ``AUTH_CACHE_TTL`` seconds, has passed.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from sqlalchemy import Select, event, select
+
+from . import database, models
+from .cache import TTLCache
+
+CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user as seen by request handlers."""
+
+    id: int
+    email: str
+    organizer_id: Optional[int] = None
+
+
+cache = TTLCache(CACHE_SIZE, CACHE_TTL)
+
+# Bumped on every change to a user's rows; entries remember the generation
+# they were loaded at, so a load racing an invalidation is never reused.
+_generations: Dict[int, int] = {}
+_generations_lock = threading.Lock()
+
+
+def generation(user_id: int) -> int:
+    """Return the current invalidation generation for ``user_id``."""
+    # A read must not add a key, or every user seen would stay in the dict.
+    return _generations.get(user_id, 0)
+
+
+def invalidate(user_id: int):
+    """Drop every cached principal for ``user_id``."""
+    with _generations_lock:
+        _generations[user_id] = _generations.get(user_id, 0) + 1
+
+
+def cached(token: str) -> Optional[Principal]:
+    """Return the principal cached for ``token`` if it is still valid."""
+    entry = cache.get(token)
+    if entry is None:
+        return None
+    principal, loaded_generation = entry
+    if loaded_generation != generation(principal.id):
+        cache.pop(token)
+        return None
+    return principal
+
+
+def remember(token: str, payload: dict, principal: Principal, loaded_generation: int):
+    """Cache ``principal`` for ``token`` until the TTL or token expiry."""
+    ttl = None
+    if "exp" in payload:
+        ttl = float(payload["exp"]) - time.time()
+    cache.set(token, (principal, loaded_generation), ttl)
+
+
+def statement(user_id: int) -> Select:
+    """Select the user and organizer id for ``user_id`` in one query."""
+    return (
+        select(models.User.id, models.User.email, models.Organizer.id)
+        .outerjoin(models.Organizer, models.Organizer.user_id == models.User.id)
+        .where(models.User.id == user_id)
+    )
+
+
+def from_row(row) -> Optional[Principal]:
+    """Build a principal from a ``statement`` result row."""
+    return Principal(*row) if row is not None else None
+
+
+def load(user_id: int) -> Optional[Principal]:
+    """Load the principal for ``user_id`` on a short-lived connection.
+
+    Using its own connection rather than the request session means the
+    auth dependency never holds a pooled connection while the request
+    waits for a worker thread to run the endpoint.
+    """
+    with database.engine.connect() as conn:
+        return from_row(conn.execute(statement(user_id)).first())
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _user_changed(mapper, connection, target):
+    invalidate(target.id)
+
+
+@event.listens_for(models.Organizer, "after_insert")
+@event.listens_for(models.Organizer, "after_update")
+@event.listens_for(models.Organizer, "after_delete")
+def _organizer_changed(mapper, connection, target):
+    invalidate(target.user_id)
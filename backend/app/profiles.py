@@ -0,0 +1,206 @@
+"""Incrementally maintained user interest profiles.
+
+A profile is the running mean of the embeddings of the events a user holds
+tickets for, counted once per ticket. Every flush that inserts tickets
+folds them into their owners' profiles with one read and one write per
+``(user, event)`` pair, so a purchase costs the same however long the
+buyer's history is. Vectors are stored as raw float32 bytes so matching
+jobs load every profile with a single query and ``np.frombuffer``.
+
+Tickets written with Core statements bypass the ORM and are not folded
+in; ``python -m app.profiles`` rebuilds every profile from the tickets.
+
+``sync_store`` mirrors the profiles into a memory-mapped
+``EmbeddingStore`` for the matching workers, appending only the rows
+changed since its previous run.
+"""
+
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from . import database, models
+from .embedding_store import EmbeddingStore
+from .embeddings import embedder
+
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# Profiles updated this many seconds before the previous sync are read
+# again, so a transaction that commits after a later one is not missed.
+STORE_SYNC_OVERLAP = float(os.getenv("EMBEDDING_STORE_SYNC_OVERLAP", "60"))
+
+
+def encode(vector: np.ndarray) -> bytes:
+    """Serialise a profile vector for the ``vector`` column."""
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def decode(blob: bytes) -> np.ndarray:
+    """Inverse of ``encode``; the result is read-only."""
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _locked_row(conn: Connection, user_id: int):
+    return conn.execute(
+        select(models.UserProfile.ticket_count, models.UserProfile.vector)
+        .where(models.UserProfile.user_id == user_id)
+        .with_for_update()
+    ).first()
+
+
+def add_tickets(conn: Connection, user_id: int, vector: np.ndarray, count: int = 1):
+    """Fold ``count`` tickets for an event embedded as ``vector`` into a profile.
+
+    The profile row is locked for the rest of the transaction, so
+    concurrent purchases by the same user cannot lose an update.
+    """
+    row = _locked_row(conn, user_id)
+    if row is None:
+        dialect_insert = _UPSERT_INSERTS.get(conn.dialect.name)
+        stmt = (dialect_insert or insert)(models.UserProfile).values(
+            user_id=user_id,
+            ticket_count=0,
+            vector=encode(np.zeros(embedder.dim, dtype=np.float32)),
+        )
+        if dialect_insert is not None:
+            stmt = stmt.on_conflict_do_nothing()
+        conn.execute(stmt)
+        row = _locked_row(conn, user_id)
+    total = row.ticket_count + count
+    mean = decode(row.vector)
+    mean = mean + (np.asarray(vector, dtype=np.float32) - mean) * (count / total)
+    conn.execute(
+        update(models.UserProfile)
+        .where(models.UserProfile.user_id == user_id)
+        .values(ticket_count=total, vector=encode(mean), updated_at=datetime.utcnow())
+    )
+
+
+def _event_vectors(conn: Connection, event_ids: Iterable[int]) -> Dict[int, np.ndarray]:
+    rows = conn.execute(
+        select(
+            models.Event.id,
+            models.Event.title,
+            models.Event.description,
+            models.Event.location,
+        ).where(models.Event.id.in_(list(event_ids)))
+    ).all()
+    vectors = embedder.embed_many(row[1:] for row in rows)
+    return {row.id: vector for row, vector in zip(rows, vectors)}
+
+
+def load(db: Session, user_id: int) -> np.ndarray:
+    """Return a user's normalised profile, or zeros without ticket history."""
+    blob = db.execute(
+        select(models.UserProfile.vector).where(
+            models.UserProfile.user_id == user_id,
+            models.UserProfile.ticket_count > 0,
+        )
+    ).scalar()
+    if blob is None:
+        return np.zeros(embedder.dim, dtype=np.float32)
+    return _normalize(decode(blob))
+
+
+def _load_rows(db: Session, updated_since=None) -> Tuple[np.ndarray, np.ndarray]:
+    stmt = select(models.UserProfile.user_id, models.UserProfile.vector).where(
+        models.UserProfile.ticket_count > 0
+    )
+    if updated_since is not None:
+        stmt = stmt.where(models.UserProfile.updated_at >= updated_since)
+    rows = db.execute(stmt.order_by(models.UserProfile.user_id)).all()
+    user_ids = np.fromiter((user_id for user_id, _ in rows), np.int64, len(rows))
+    matrix = np.frombuffer(b"".join(blob for _, blob in rows), dtype=np.float32)
+    return user_ids, _normalize(matrix.reshape(len(rows), embedder.dim))
+
+
+def load_all(db: Session) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(user_ids, matrix)`` of every non-empty profile, normalised."""
+    return _load_rows(db)
+
+
+def sync_store(db: Session, store: EmbeddingStore) -> int:
+    """Append profiles changed since the last sync to ``store``, normalised.
+
+    Compacts the store when enough rows have piled up. Returns the number
+    of rows appended.
+    """
+    started = datetime.utcnow()
+    synced_at = store.meta.get("synced_at")
+    since = None
+    if synced_at is not None:
+        since = datetime.fromisoformat(synced_at) - timedelta(seconds=STORE_SYNC_OVERLAP)
+    user_ids, matrix = _load_rows(db, since)
+    store.append(user_ids, matrix, meta={"synced_at": started.isoformat()})
+    store.maybe_compact()
+    return len(user_ids)
+
+
+def rebuild(db: Session) -> int:
+    """Recompute every profile from the tickets table; returns the count."""
+    pairs = db.execute(select(models.Ticket.user_id, models.Ticket.event_id)).all()
+    db.execute(delete(models.UserProfile))
+    if not pairs:
+        return 0
+    user_ids, user_rows = np.unique(
+        np.fromiter((user_id for user_id, _ in pairs), np.int64, len(pairs)),
+        return_inverse=True,
+    )
+    event_ids, event_rows = np.unique(
+        np.fromiter((event_id for _, event_id in pairs), np.int64, len(pairs)),
+        return_inverse=True,
+    )
+    vectors = _event_vectors(db.connection(), event_ids.tolist())
+    event_matrix = np.stack([vectors[event_id] for event_id in event_ids.tolist()])
+
+    sums = np.zeros((len(user_ids), embedder.dim), dtype=np.float32)
+    np.add.at(sums, user_rows, event_matrix[event_rows])
+    counts = np.bincount(user_rows)
+    means = sums / counts[:, None]
+    db.execute(
+        insert(models.UserProfile),
+        [
+            {"user_id": int(user_id), "ticket_count": int(count), "vector": encode(mean)}
+            for user_id, count, mean in zip(user_ids, counts, means)
+        ],
+    )
+    return len(user_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _tickets_flushed(session, flush_context):
+    counts = Counter(
+        (obj.user_id, obj.event_id)
+        for obj in session.new
+        if isinstance(obj, models.Ticket)
+    )
+    if not counts:
+        return
+    conn = session.connection()
+    vectors = _event_vectors(conn, {event_id for _, event_id in counts})
+    # Sorted so concurrent flushes lock profile rows in the same order.
+    for (user_id, event_id), count in sorted(counts.items()):
+        if event_id in vectors:
+            add_tickets(conn, user_id, vectors[event_id], count)
+
+
+if __name__ == "__main__":
+    db = database.SessionLocal()
+    try:
+        rebuilt = rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt {rebuilt} user profiles")
@@ -0,0 +1,77 @@
+"""SQL statements shared by the sync and async endpoint implementations."""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.orm import contains_eager
+
+from . import models, pagination, schemas, serialization
+
+# Columns of the response schemas, selected as plain rows by the list endpoints.
+EVENT_COLUMNS = serialization.columns(models.Event, schemas.Event)
+TICKET_COLUMNS = serialization.columns(models.Ticket, schemas.Ticket)
+
+
+def event_feed(
+    cursor: Optional[str],
+    limit: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    location: Optional[str] = None,
+) -> Select:
+    """Select one feed page (plus one look-ahead row) ordered by ``(date, id)``.
+
+    Rows hold ``EVENT_COLUMNS``. Raises ``ValueError`` for a malformed cursor.
+    """
+    stmt = select(*EVENT_COLUMNS)
+    if start is not None:
+        stmt = stmt.where(models.Event.date >= start)
+    if end is not None:
+        stmt = stmt.where(models.Event.date < end)
+    if location is not None:
+        stmt = stmt.where(models.Event.location == location)
+    if cursor is not None:
+        after_date, after_id = pagination.decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(models.Event.date, models.Event.id) > tuple_(after_date, after_id)
+        )
+    return stmt.order_by(models.Event.date, models.Event.id).limit(limit + 1)
+
+
+def event_page(events: list, limit: int) -> dict:
+    """Trim the look-ahead row from ``event_feed`` rows into a page of dicts."""
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = pagination.encode_cursor(events[-1].date, events[-1].id)
+    return {"items": serialization.records(events), "next_cursor": next_cursor}
+
+
+def user_tickets(user_id: int, cursor: Optional[str], limit: int) -> Select:
+    """Select one page of a user's tickets, ordered by event date.
+
+    Each ticket's event is loaded by the same joined query. Raises
+    ``ValueError`` for a malformed cursor.
+    """
+    stmt = (
+        select(models.Ticket)
+        .join(models.Ticket.event)
+        .options(contains_eager(models.Ticket.event))
+        .where(models.Ticket.user_id == user_id)
+    )
+    if cursor is not None:
+        after_date, after_id = pagination.decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(models.Event.date, models.Ticket.id) > tuple_(after_date, after_id)
+        )
+    return stmt.order_by(models.Event.date, models.Ticket.id).limit(limit + 1)
+
+
+def ticket_page(tickets: list, limit: int) -> dict:
+    """Trim the look-ahead row from ``user_tickets`` results into a page."""
+    next_cursor = None
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        next_cursor = pagination.encode_cursor(tickets[-1].event.date, tickets[-1].id)
+    return {"items": tickets, "next_cursor": next_cursor}
@@ -0,0 +1,199 @@
+"""Event recommendations served from an in-process ANN index.
+
+The index is built once on the first request. After that a stale index
+keeps serving while a background thread builds its replacement; events
+added in the meantime are replayed onto the new index before the swap.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import database, matching, models
+from .ann import IVFIndex
+from .embeddings import embedder
+
+logger = logging.getLogger(__name__)
+
+# The index is rebuilt from the database when older than this, which also
+# picks up events created by other processes and drops past events.
+REBUILD_INTERVAL = float(os.getenv("RECOMMENDATIONS_REBUILD_SECONDS", "600"))
+N_PROBE = int(os.getenv("RECOMMENDATIONS_N_PROBE", "16"))
+
+_index: Optional[IVFIndex] = None
+_built_at = 0.0
+# Held for the whole of a build, so only one runs at a time.
+_build_lock = threading.Lock()
+# Guards the swap and ``_pending``: additions made while a build runs.
+_lock = threading.Lock()
+_pending: Optional[list] = None
+
+
+def build_index(db: Session, batch_size: int = 10_000) -> IVFIndex:
+    """Embed every upcoming event and train a fresh IVF index on them."""
+    now = datetime.utcnow()
+    ids, dates, docs = [], [], []
+    rows = (
+        db.query(
+            models.Event.id,
+            models.Event.date,
+            models.Event.title,
+            models.Event.description,
+            models.Event.location,
+        )
+        .filter(models.Event.date >= now)
+        .yield_per(batch_size)
+    )
+    for event_id, date, title, description, location in rows:
+        ids.append(event_id)
+        dates.append(date)
+        docs.append((title, description, location))
+    index = IVFIndex(embedder.dim, n_probe=N_PROBE)
+    index.build(ids, embedder.embed_many(docs), dates)
+    return index
+
+
+def _rebuild(db: Session):
+    """Build a fresh index and swap it in; the caller holds ``_build_lock``."""
+    global _index, _built_at, _pending
+    with _lock:
+        _pending = []
+    try:
+        index = build_index(db)
+    except BaseException:
+        with _lock:
+            _pending = None
+        raise
+    with _lock:
+        for added in _pending:
+            index.add_many(*added)
+        _index, _built_at, _pending = index, time.monotonic(), None
+
+
+def _rebuild_in_background():
+    global _built_at
+    db = database.SessionLocal()
+    try:
+        _rebuild(db)
+    except Exception:
+        logger.exception("Rebuilding the recommendation index failed")
+        # Keep serving the old index and try again after another interval.
+        _built_at = time.monotonic()
+    finally:
+        db.close()
+        _build_lock.release()
+
+
+def _stale() -> bool:
+    return time.monotonic() - _built_at > REBUILD_INTERVAL
+
+
+def get_index(db: Session) -> IVFIndex:
+    """Return the shared index, building it on first use.
+
+    A stale index is still returned; its replacement is built by a
+    background thread.
+    """
+    if _index is None:
+        with _build_lock:
+            if _index is None:
+                _rebuild(db)
+    elif _stale() and _build_lock.acquire(blocking=False):
+        if _stale():
+            threading.Thread(
+                target=_rebuild_in_background, name="recommendations-rebuild", daemon=True
+            ).start()
+        else:
+            _build_lock.release()
+    return _index
+
+
+def add_events(ids: Sequence[int], vectors, dates: Sequence[datetime]):
+    """Insert embedded events into the index, if it has been built."""
+    with _lock:
+        index = _index
+        if _pending is not None:
+            _pending.append((ids, vectors, dates))
+    if index is not None:
+        index.add_many(ids, vectors, dates)
+
+
+def add_event(event: models.Event):
+    """Insert a newly created event into the index if it has been built."""
+    if _index is not None or _pending is not None:
+        add_events([event.id], matching.generate_event_embedding(event)[None, :], [event.date])
+
+
+def add_imported(db: Session, event_ids: Sequence[int], batch_size: int = 1000):
+    """Embed and insert events created by a bulk import, a batch at a time."""
+    if _index is None and _pending is None:
+        return  # the first build will read them from the database
+    for start in range(0, len(event_ids), batch_size):
+        rows = (
+            db.query(
+                models.Event.id,
+                models.Event.date,
+                models.Event.title,
+                models.Event.description,
+                models.Event.location,
+            )
+            .filter(models.Event.id.in_(event_ids[start: start + batch_size]))
+            .all()
+        )
+        if rows:
+            add_events(
+                [row.id for row in rows],
+                embedder.embed_many((row.title, row.description, row.location) for row in rows),
+                [row.date for row in rows],
+            )
+
+
+def reset():
+    """Forget the shared index so the next request rebuilds it."""
+    global _index
+    with _build_lock:
+        _index = None
+
+
+def recommend(db: Session, user, limit: int) -> List[Tuple[models.Event, float]]:
+    """Return up to ``limit`` upcoming ``(event, score)`` pairs for ``user``.
+
+    Events the user already holds tickets for are skipped. Users without
+    ticket history get the soonest upcoming events with a score of 0.
+    """
+    now = datetime.utcnow()
+    owned = {
+        event_id
+        for (event_id,) in db.query(models.Ticket.event_id).filter(
+            models.Ticket.user_id == user.id
+        )
+    }
+    profile = matching.generate_user_embedding(user, db)
+    if not profile.any():
+        events = (
+            db.query(models.Event)
+            .filter(models.Event.date >= now)
+            .order_by(models.Event.date, models.Event.id)
+            .limit(limit)
+            .all()
+        )
+        return [(event, 0.0) for event in events]
+
+    ids, scores = get_index(db).search(profile, limit + len(owned), after=now)
+    ranked = [
+        (int(event_id), float(score))
+        for event_id, score in zip(ids, scores)
+        if int(event_id) not in owned
+    ][:limit]
+    events = {
+        event.id: event
+        for event in db.query(models.Event).filter(
+            models.Event.id.in_([event_id for event_id, _ in ranked])
+        )
+    }
+    return [(events[event_id], score) for event_id, score in ranked if event_id in events]
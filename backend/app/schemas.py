@@ -1,7 +1,9 @@
 """Pydantic schemas used for request and response models."""
 
 from datetime import datetime
-from pydantic import BaseModel, EmailStr
+from typing import List, Optional
+
+from pydantic import BaseModel, EmailStr, Field
 
 
 class UserCreate(BaseModel):
@@ -41,6 +43,7 @@ class EventCreate(BaseModel):
     description: str
     date: datetime
     location: str
+    capacity: Optional[int] = Field(None, ge=1)
 
 
 class Event(BaseModel):
@@ -51,11 +54,35 @@ class Event(BaseModel):
     date: datetime
     location: str
     organizer_id: int
+    capacity: Optional[int] = None
+    sold: int = 0
 
     class Config:
         orm_mode = True
 
 
+class EventPage(BaseModel):
+    """Page of events plus the cursor for fetching the next page."""
+    items: List[Event]
+    next_cursor: Optional[str] = None
+
+
+class RecommendedEvent(Event):
+    """Event recommended to a user with its similarity score."""
+    score: float
+
+
+class EventSearchResult(Event):
+    """Event matching a search query with its relevance score."""
+    score: float
+
+
+class EventSearchPage(BaseModel):
+    """Page of search results plus the cursor for the next page."""
+    items: List[EventSearchResult]
+    next_cursor: Optional[str] = None
+
+
 class EventWithSales(Event):
     """Event details including ticket sales."""
     ticket_sales: int
@@ -71,6 +98,41 @@ class Ticket(BaseModel):
         orm_mode = True
 
 
+class TicketWithEvent(Ticket):
+    """Ticket together with the event it is for."""
+    event: Event
+
+
+class TicketPage(BaseModel):
+    """Page of a user's tickets plus the cursor for fetching the next page."""
+    items: List[TicketWithEvent]
+    next_cursor: Optional[str] = None
+
+
+class TicketBatchCreate(BaseModel):
+    """Order for several tickets to the same event."""
+    quantity: int = Field(..., ge=1, le=50)
+
+
+class SalesPoint(BaseModel):
+    """Tickets sold during one bucket of a sales series."""
+    start: datetime
+    tickets: int
+
+
+class SalesStats(BaseModel):
+    """Organizer ticket sales per time bucket, oldest bucket first."""
+    bucket: str
+    total: int
+    points: List[SalesPoint]
+
+
+class BulkImportResult(BaseModel):
+    """Outcome of a bulk event import."""
+    created: int
+    ids: List[int]
+
+
 class SignupCreate(BaseModel):
     """Simple signup form submission."""
     first_name: str
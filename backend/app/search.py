@@ -0,0 +1,158 @@
+"""Full-text search over event titles, descriptions and locations.
+
+SQLite uses an FTS5 table kept in sync with ``events`` by triggers and
+ranked with BM25; PostgreSQL uses a generated ``tsvector`` column with a
+GIN index ranked with ``ts_rank_cd``. Both are maintained by the database
+on every insert, including Core bulk inserts. Other backends fall back to
+an unranked ``LIKE`` scan.
+"""
+
+import os
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import DDL, Select, event, func, literal, literal_column, or_, select
+from sqlalchemy.sql import column, table
+
+from . import models
+
+# Relative weight of matches in the title, description and location.
+SQLITE_WEIGHTS = (10.0, 1.0, 5.0)
+
+# Only the newest this-many matches of a query are ranked. Ranking scores
+# every candidate, so without a cap a term found in most events costs a
+# full scan; with it the cost is bounded and recent events win ties.
+MAX_RANKED = int(os.getenv("SEARCH_MAX_RANKED", "10000"))
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5("
+    "title, description, location, content='events', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN "
+    "INSERT INTO events_fts(rowid, title, description, location) "
+    "VALUES (new.id, new.title, new.description, new.location); END",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN "
+    "INSERT INTO events_fts(events_fts, rowid, title, description, location) "
+    "VALUES ('delete', old.id, old.title, old.description, old.location); END",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_update "
+    "AFTER UPDATE OF title, description, location ON events BEGIN "
+    "INSERT INTO events_fts(events_fts, rowid, title, description, location) "
+    "VALUES ('delete', old.id, old.title, old.description, old.location); "
+    "INSERT INTO events_fts(rowid, title, description, location) "
+    "VALUES (new.id, new.title, new.description, new.location); END",
+)
+
+POSTGRES_DDL = (
+    "ALTER TABLE events ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_events_search_vector "
+    "ON events USING gin (search_vector)",
+)
+
+for _statement in SQLITE_DDL:
+    event.listen(
+        models.Event.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+    )
+for _statement in POSTGRES_DDL:
+    event.listen(
+        models.Event.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql")
+    )
+# The FTS table is not part of the metadata, so drop it with ``events``.
+event.listen(
+    models.Event.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS events_fts").execute_if(dialect="sqlite"),
+)
+
+
+def terms(text: str) -> List[str]:
+    """Split a user query into lower-cased search terms."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _fts5_query(words: List[str]) -> str:
+    # Quoting keeps user input out of the FTS5 query syntax; the last term
+    # is a prefix so results keep up with the user typing.
+    quoted = [f'"{word}"' for word in words]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _newest_cutoff(candidates: Select, row_id):
+    """Smallest id among the newest ``MAX_RANKED`` ``candidates`` (0 if fewer).
+
+    ``candidates`` must apply every filter of the outer query, or the cap
+    is spent on rows the outer query then discards.
+    """
+    newest = candidates.correlate(None).order_by(row_id.desc()).offset(MAX_RANKED - 1).limit(1)
+    return func.coalesce(newest.scalar_subquery(), 0)
+
+
+def search_statement(
+    dialect: str,
+    text: str,
+    limit: int,
+    offset: int = 0,
+    location: Optional[str] = None,
+) -> Optional[Select]:
+    """Select up to ``limit + 1`` ``(Event, score)`` rows, best first.
+
+    Returns ``None`` when ``text`` contains no searchable terms.
+    """
+    words = terms(text)
+    if not words:
+        return None
+    event_table = models.Event
+    if dialect == "sqlite":
+        fts = table("events_fts", column("rowid"))
+        matches = literal_column("events_fts").op("MATCH")(_fts5_query(words))
+        rank = func.bm25(literal_column("events_fts"), *SQLITE_WEIGHTS)
+        candidates = select(fts.c.rowid).where(matches)
+        if location is not None:
+            candidates = candidates.join(event_table, event_table.id == fts.c.rowid).where(
+                event_table.location == location
+            )
+        stmt = (
+            select(event_table, (-rank).label("score"))
+            .join(fts, fts.c.rowid == event_table.id)
+            .where(matches, fts.c.rowid >= _newest_cutoff(candidates, fts.c.rowid))
+            .order_by(rank, event_table.id)
+        )
+    elif dialect == "postgresql":
+        query = func.to_tsquery("simple", " & ".join(words[:-1] + [words[-1] + ":*"]))
+        matches = literal_column("events.search_vector").op("@@")(query)
+        score = func.ts_rank_cd(literal_column("events.search_vector"), query)
+        candidates = select(event_table.id).where(matches)
+        if location is not None:
+            candidates = candidates.where(event_table.location == location)
+        stmt = (
+            select(event_table, score.label("score"))
+            .where(matches, event_table.id >= _newest_cutoff(candidates, event_table.id))
+            .order_by(score.desc(), event_table.id)
+        )
+    else:
+        stmt = like_statement(words)
+    if location is not None:
+        stmt = stmt.where(event_table.location == location)
+    return stmt.limit(limit + 1).offset(offset)
+
+
+def like_statement(words: List[str]) -> Select:
+    """Unindexed ``LIKE`` scan matching every term, for comparison and fallback."""
+    fields = (models.Event.title, models.Event.description, models.Event.location)
+    stmt = select(models.Event, literal(0.0).label("score"))
+    for word in words:
+        stmt = stmt.where(or_(*(field.ilike(f"%{word}%") for field in fields)))
+    return stmt.order_by(models.Event.date, models.Event.id)
+
+
+def search_page(rows: list, limit: int, offset: int) -> Tuple[list, Optional[int]]:
+    """Trim the look-ahead row; return the page and the next offset, if any."""
+    if len(rows) > limit:
+        return rows[:limit], offset + limit
+    return rows, None
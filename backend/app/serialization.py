@@ -0,0 +1,40 @@
+"""Fast JSON encoding of list responses.
+
+Returning ORM objects or dicts through a ``response_model`` validates
+every row against its Pydantic schema before encoding it, which is most of
+the cost of a large list. List endpoints instead select just the schema's
+columns as plain rows and encode them here with orjson. The rows come
+straight from our own tables, so they already have the schema's types; the
+``response_model`` still documents the response but no longer runs, since
+the endpoint returns a ``Response``.
+"""
+
+from typing import Sequence
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+
+def columns(model, schema: type[BaseModel]) -> tuple:
+    """Return the columns of ``model`` behind ``schema``'s fields, in order."""
+    return tuple(getattr(model, name) for name in schema.model_fields)
+
+
+def records(rows: Sequence) -> list[dict]:
+    """Turn selected rows into ``{column label: value}`` dicts."""
+    if not rows:
+        return []
+    # Zipping with the shared labels is several times faster than Row._asdict.
+    keys = rows[0]._fields
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def dumps(value) -> bytes:
+    """Encode dicts, lists and column values as JSON."""
+    return orjson.dumps(value)
+
+
+def respond(value) -> Response:
+    """Return ``value`` encoded with ``dumps`` as a JSON response."""
+    return Response(dumps(value), media_type="application/json")
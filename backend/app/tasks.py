@@ -1,20 +1,121 @@
 """Background job definitions using RQ."""
 
 import os
-from redis import Redis
-from rq import Queue
+import threading
+from typing import List
+
+from . import database, matching, metrics, models
 
 # Configure Redis connection
 redis_url = os.getenv("REDIS_URL", "redis://redis:6379")
-redis_conn = Redis.from_url(redis_url)
-queue = Queue(connection=redis_conn)
+
+# Matching runs on its own queue, which workers drain after ``default``.
+MATCH_QUEUE = os.getenv("MATCH_QUEUE", "matching")
+
+# Most event ids covered by one matching job
+MATCH_JOB_SIZE = int(os.getenv("MATCH_JOB_SIZE", "1000"))
+
+# Number of users stored per event by the matching job
+MATCH_TOP_K = int(os.getenv("MATCH_TOP_K", "100"))
+
+
+# Events scored together per matrix multiplication in a batched job
+MATCH_EVENT_BATCH = int(os.getenv("MATCH_EVENT_BATCH", "256"))
+
+
+_redis_conn = None
+_redis_lock = threading.Lock()
+
+
+def get_redis():
+    """Return the shared Redis client, creating it on first use.
+
+    Nothing connects (or even imports ``redis``/``rq``) at import time, so
+    the web app starts without touching Redis.
+    """
+    global _redis_conn
+    with _redis_lock:
+        if _redis_conn is None:
+            from redis import Redis
+
+            _redis_conn = Redis.from_url(redis_url)
+        return _redis_conn
+
+
+def get_queue(name: str = "default"):
+    """Return the RQ queue ``name`` on the shared connection."""
+    from rq import Queue
+
+    return Queue(name, connection=get_redis())
+
+
+def close_redis():
+    """Close the shared Redis client, if created."""
+    global _redis_conn
+    with _redis_lock:
+        if _redis_conn is not None:
+            _redis_conn.close()
+            _redis_conn = None
 
 
 def match_event_to_users(event_id: int):
-    """Placeholder task that would match an event to interested users."""
-    print(f"Processing matching for event {event_id}")
+    """Score an event against every user and store the top matches.
+
+    Replaces any matches previously stored for the event and returns the
+    number of rows written.
+    """
+    return match_events_to_users([event_id])
+
+
+def match_events_to_users(event_ids: List[int]):
+    """Batched form of ``match_event_to_users`` for many events at once.
+
+    User embeddings are loaded once for the whole job and events are scored
+    ``MATCH_EVENT_BATCH`` at a time. Returns the number of rows written.
+    """
+    db = database.SessionLocal()
+    try:
+        user_ids, user_matrix = matching.load_user_embeddings(db)
+        written = 0
+        for start in range(0, len(event_ids), MATCH_EVENT_BATCH):
+            batch = event_ids[start: start + MATCH_EVENT_BATCH]
+            events = (
+                db.query(models.Event)
+                .filter(models.Event.id.in_(batch))
+                .order_by(models.Event.id)
+                .all()
+            )
+            if not events:
+                continue
+            found = [event.id for event in events]
+            event_matrix = matching.generate_event_embeddings(events)
+            matching.store_event_embeddings(found, event_matrix)
+
+            rows, scores = matching.top_k_users(event_matrix, user_matrix, MATCH_TOP_K)
+            matches = matching.match_rows(found, user_ids, rows, scores)
+            db.query(models.Match).filter(models.Match.event_id.in_(found)).delete(
+                synchronize_session=False
+            )
+            if matches:
+                db.execute(models.Match.__table__.insert(), matches)
+            db.commit()
+            written += len(matches)
+        # RQ ends the forked work-horse with os._exit(), so anything still
+        # buffered for the batch upsert would never reach the index.
+        matching.get_writer().flush()
+        return written
+    finally:
+        db.close()
+
+
+def enqueue_match_job(job_id: str, event_ids: List[int]):
+    """Enqueue one matching job under ``job_id`` unless it already exists.
 
+    The outbox relay passes the same id when it retries a handoff, so a
+    job that reached Redis before a crash is not enqueued twice.
+    """
+    from rq.job import Job
 
-def enqueue_match_event(event_id: int):
-    """Helper to enqueue a matching job."""
-    queue.enqueue(match_event_to_users, event_id)
+    with metrics.external("redis"):
+        if not Job.exists(job_id, connection=get_redis()):
+            get_queue(MATCH_QUEUE).enqueue(match_events_to_users, event_ids, job_id=job_id)
@@ -0,0 +1,65 @@
+"""Atomic seat reservation for ticket purchases."""
+
+from typing import List, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Longest ``Idempotency-Key`` header accepted by the purchase endpoints.
+MAX_KEY_LENGTH = 255
+
+
+def reserve_seats(db: Session, event_id: int, quantity: int = 1) -> bool:
+    """Claim ``quantity`` seats on an event in the current transaction.
+
+    Runs a single conditional ``UPDATE ... SET sold = sold + n WHERE
+    sold + n <= capacity``, so concurrent buyers can never push ``sold``
+    past ``capacity``: the row lock serialises them and the losers match
+    zero rows. Returns ``False`` when the event is missing or full.
+    Events without a capacity are unlimited.
+    """
+    result = db.execute(
+        update(models.Event)
+        .where(
+            models.Event.id == event_id,
+            or_(
+                models.Event.capacity.is_(None),
+                models.Event.sold + quantity <= models.Event.capacity,
+            ),
+        )
+        .values(sold=models.Event.sold + quantity)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def find_by_idempotency_key(
+    db: Session, user_id: int, key: str
+) -> Optional[models.Ticket]:
+    """Return the ticket a user already bought with ``key``, if any."""
+    return (
+        db.query(models.Ticket)
+        .filter(models.Ticket.user_id == user_id, models.Ticket.idempotency_key == key)
+        .first()
+    )
+
+
+def find_order(db: Session, user_id: int, key: str) -> Optional[models.TicketOrder]:
+    """Return the batch order a user already placed with ``key``, if any."""
+    return (
+        db.query(models.TicketOrder)
+        .filter(models.TicketOrder.user_id == user_id, models.TicketOrder.idempotency_key == key)
+        .first()
+    )
+
+
+def order_tickets(db: Session, order: models.TicketOrder) -> List[models.Ticket]:
+    """Return the tickets bought by a batch order, in purchase order."""
+    return (
+        db.query(models.Ticket)
+        .filter(models.Ticket.order_id == order.id)
+        .order_by(models.Ticket.id)
+        .all()
+    )
@@ -0,0 +1,305 @@
+"""In-process vector index and buffered bulk writer for embeddings."""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_vector(item) -> Tuple[str, Sequence[float], Dict[str, Any]]:
+    """Normalise a Pinecone-style ``(id, values[, metadata])`` tuple or dict."""
+    if isinstance(item, Mapping):
+        return item["id"], item["values"], dict(item.get("metadata") or {})
+    if len(item) == 3:
+        return item[0], item[1], dict(item[2] or {})
+    return item[0], item[1], {}
+
+
+class LocalVectorIndex:
+    """NumPy-backed stand-in for a Pinecone index.
+
+    Exposes the subset of the Pinecone ``Index`` interface the app uses
+    (``upsert``, ``query``, ``fetch``, ``delete``) so matching keeps working,
+    and can be benchmarked, without an API key. Vectors live in a growable
+    float32 matrix and queries are scored with a single dot product, so
+    stored vectors should be L2 normalised for cosine similarity.
+    Metadata filters support equality, ``$eq``, ``$ne`` and ``$in``.
+    """
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        self.dim = dim
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._metadata: Dict[str, np.ndarray] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _grow(self, needed: int):
+        capacity = len(self._vectors)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[: len(self._ids)] = self._vectors[: len(self._ids)]
+        self._vectors = vectors
+        for key, column in self._metadata.items():
+            grown = np.empty(capacity, dtype=object)
+            grown[: len(column)] = column
+            self._metadata[key] = grown
+
+    def upsert(self, vectors: Iterable, namespace: str = "") -> dict:
+        """Insert or overwrite vectors given as ``(id, values[, metadata])``."""
+        parsed = [_parse_vector(item) for item in vectors]
+        if not parsed:
+            return {"upserted_count": 0}
+        with self._lock:
+            rows = []
+            for vector_id, _, _ in parsed:
+                row = self._rows.get(vector_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._ids.append(vector_id)
+                    self._rows[vector_id] = row
+                rows.append(row)
+            self._grow(len(self._ids))
+            self._vectors[rows] = np.asarray(
+                [values for _, values, _ in parsed], dtype=np.float32
+            )
+            for row, (_, _, metadata) in zip(rows, parsed):
+                for key, value in metadata.items():
+                    column = self._metadata.get(key)
+                    if column is None:
+                        column = np.empty(len(self._vectors), dtype=object)
+                        self._metadata[key] = column
+                    column[row] = value
+        return {"upserted_count": len(parsed)}
+
+    def _mask(
+        self, filter: Optional[Mapping[str, Any]], size: int
+    ) -> Optional[np.ndarray]:
+        if not filter:
+            return None
+        mask = np.ones(size, dtype=bool)
+        for key, condition in filter.items():
+            column = self._metadata.get(key)
+            if column is None:
+                return np.zeros(size, dtype=bool)
+            column = column[:size]
+            if not isinstance(condition, Mapping):
+                condition = {"$eq": condition}
+            for op, value in condition.items():
+                if op == "$eq":
+                    mask &= column == value
+                elif op == "$ne":
+                    mask &= column != value
+                elif op == "$in":
+                    allowed = set(value)
+                    mask &= np.fromiter((v in allowed for v in column), bool, size)
+                else:
+                    raise ValueError(f"Unsupported filter operator {op}")
+        return mask
+
+    def query(
+        self,
+        *,
+        top_k: int,
+        vector: Optional[Sequence[float]] = None,
+        id: Optional[str] = None,
+        filter: Optional[Mapping[str, Any]] = None,
+        include_values: bool = False,
+        include_metadata: bool = False,
+        namespace: str = "",
+    ) -> dict:
+        """Return the ``top_k`` stored vectors with the highest dot product."""
+        with self._lock:
+            size = len(self._ids)
+            if vector is None:
+                vector = self._vectors[self._rows[id]]
+            scores = self._vectors[:size] @ np.asarray(vector, dtype=np.float32)
+            mask = self._mask(filter, size)
+            if mask is not None:
+                scores = np.where(mask, scores, -np.inf)
+                top_k = min(top_k, int(mask.sum()))
+            top_k = min(top_k, size)
+            if top_k <= 0:
+                return {"matches": [], "namespace": namespace}
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+            best = best[np.argsort(-scores[best])]
+            matches = [
+                self._match(row, float(scores[row]), include_values, include_metadata)
+                for row in best
+            ]
+        return {"matches": matches, "namespace": namespace}
+
+    def _match(
+        self, row: int, score: float, include_values: bool, include_metadata: bool
+    ) -> dict:
+        match = {"id": self._ids[row], "score": score}
+        if include_values:
+            match["values"] = self._vectors[row].tolist()
+        if include_metadata:
+            match["metadata"] = {
+                key: column[row]
+                for key, column in self._metadata.items()
+                if column[row] is not None
+            }
+        return match
+
+    def fetch(self, ids: Sequence[str], namespace: str = "") -> dict:
+        """Return stored vectors and metadata for the given ids."""
+        with self._lock:
+            return {
+                "vectors": {
+                    vector_id: self._match(self._rows[vector_id], 0.0, True, True)
+                    for vector_id in ids
+                    if vector_id in self._rows
+                },
+                "namespace": namespace,
+            }
+
+    def delete(self, ids: Sequence[str], namespace: str = "") -> dict:
+        """Remove vectors by id, moving the last row into each freed slot."""
+        with self._lock:
+            for vector_id in ids:
+                row = self._rows.pop(vector_id, None)
+                if row is None:
+                    continue
+                last = len(self._ids) - 1
+                if row != last:
+                    moved = self._ids[last]
+                    self._ids[row] = moved
+                    self._rows[moved] = row
+                    self._vectors[row] = self._vectors[last]
+                    for column in self._metadata.values():
+                        column[row] = column[last]
+                self._ids.pop()
+                for column in self._metadata.values():
+                    column[last] = None
+        return {}
+
+    def export(
+        self, filter: Optional[Mapping[str, Any]] = None
+    ) -> Tuple[List[str], np.ndarray]:
+        """Return ids and a copy of the vector matrix, optionally filtered."""
+        with self._lock:
+            size = len(self._ids)
+            mask = self._mask(filter, size)
+            if mask is None:
+                return list(self._ids), self._vectors[:size].copy()
+            rows = np.flatnonzero(mask)
+            return [self._ids[row] for row in rows], self._vectors[rows]
+
+
+class BulkUpserter:
+    """Buffer vectors and upsert them to an index in bounded chunks.
+
+    A flush happens as soon as ``batch_size`` vectors are buffered, or
+    ``max_delay`` seconds after the first vector entered an empty buffer,
+    whichever comes first. Each chunk is retried with exponential backoff
+    and jitter; after ``max_retries`` failed retries the error is raised
+    (or logged when the flush was triggered by the timer).
+    """
+
+    def __init__(
+        self,
+        index,
+        batch_size: int = 100,
+        max_delay: float = 1.0,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        sleep=time.sleep,
+    ):
+        self.index = index
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._sleep = sleep
+        self._native_arrays = isinstance(index, LocalVectorIndex)
+        self._buffer: List[tuple] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def add(self, vector_id: str, values, metadata: Optional[dict] = None):
+        """Buffer a single vector."""
+        self.add_many([vector_id], [values], [metadata] if metadata else None)
+
+    def add_many(
+        self, ids: Sequence[str], values, metadata: Optional[Sequence[dict]] = None
+    ):
+        """Buffer a batch of vectors, one row of ``values`` per id."""
+        metadata = metadata or [None] * len(ids)
+        ready = []
+        with self._lock:
+            start_timer = not self._buffer
+            for vector_id, row, meta in zip(ids, values, metadata):
+                self._buffer.append((vector_id, row, meta) if meta else (vector_id, row))
+            while len(self._buffer) >= self.batch_size:
+                ready.append(self._buffer[: self.batch_size])
+                del self._buffer[: self.batch_size]
+            if not self._buffer:
+                self._cancel_timer()
+            elif start_timer and self.max_delay is not None:
+                self._timer = threading.Timer(self.max_delay, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        for chunk in ready:
+            self._send(chunk)
+
+    def flush(self):
+        """Upsert everything currently buffered."""
+        with self._lock:
+            pending, self._buffer = self._buffer, []
+            self._cancel_timer()
+        for start in range(0, len(pending), self.batch_size):
+            self._send(pending[start: start + self.batch_size])
+
+    def close(self):
+        """Flush remaining vectors; the writer can still be reused afterwards."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Timed embedding flush failed")
+
+    def _send(self, chunk: List[tuple]):
+        if not self._native_arrays:
+            chunk = [(item[0], np.asarray(item[1]).tolist(), *item[2:]) for item in chunk]
+        service = "vector_index" if self._native_arrays else "pinecone"
+        for attempt in range(self.max_retries + 1):
+            try:
+                with metrics.external(service):
+                    self.index.upsert(vectors=chunk)
+                return
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff * (2 ** attempt) * (1 + random.random())
+                logger.warning(
+                    "Upsert of %d vectors failed, retrying in %.2fs", len(chunk), delay
+                )
+                self._sleep(delay)
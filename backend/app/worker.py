@@ -1,15 +1,82 @@
-"""Entry point for running the RQ background worker."""
+"""Entry point for running the RQ background workers.
 
+Queues are drained in ``listen`` order, so batched matching jobs only run
+when no ``default`` job is waiting. With ``WORKER_PROCESSES`` above one a
+supervised ``WorkerPool`` forks that many workers, restarting any that
+die; SIGINT/SIGTERM let running jobs finish before the pool exits. The
+job modules, embedder and vector index client are loaded once before
+forking so every worker shares them copy-on-write.
+"""
+
+import gc
+import logging
 import os
-from redis import Redis
+import time
+
 from rq import Worker, Queue
+from rq.worker_pool import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+listen = ["default", os.getenv("MATCH_QUEUE", "matching")]
+
+# Number of worker processes; 1 runs a single worker without a pool
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "1"))
+
+
+class JobTimingMixin:
+    """Log each job's wall time and keep it in ``job.meta["duration_ms"]``."""
+
+    def perform_job(self, job, queue) -> bool:
+        started = time.perf_counter()
+        try:
+            return super().perform_job(job, queue)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            job.meta["duration_ms"] = round(duration_ms, 3)
+            job.save_meta()
+            logger.info(
+                "job %s %s on %s finished as %s in %.1f ms",
+                job.id,
+                job.func_name,
+                queue.name,
+                job.get_status(refresh=False),
+                duration_ms,
+            )
+
+
+class TimedWorker(JobTimingMixin, Worker):
+    """Forking RQ worker that reports per-job timings."""
+
+
+def preload():
+    """Import and warm everything jobs use, then freeze it for forking.
+
+    ``gc.freeze`` moves the loaded objects out of the collector's reach so
+    collections in the children do not touch (and copy) the shared pages.
+    """
+    from . import matching, tasks  # noqa: F401
+
+    matching.embedder.embed("warm up", "", "")
+    matching.get_writer()
+    matching.get_user_store()
+    gc.freeze()
+
+
+def main(processes: int = WORKER_PROCESSES):
+    """Run ``processes`` workers on the ``listen`` queues until stopped."""
+    from .tasks import get_redis
 
-redis_url = os.getenv("REDIS_URL", "redis://redis:6379")
-listen = ["default"]
-conn = Redis.from_url(redis_url)
+    logging.basicConfig(level=logging.INFO)
+    preload()
+    conn = get_redis()
+    if processes > 1:
+        pool = WorkerPool(listen, connection=conn, num_workers=processes, worker_class=TimedWorker)
+        pool.start()
+    else:
+        queues = [Queue(name, connection=conn) for name in listen]
+        TimedWorker(queues, connection=conn).work()
 
 
 if __name__ == "__main__":
-    queue = Queue(connection=conn)
-    worker = Worker([queue], connection=conn)
-    worker.work()
+    main()
@@ -0,0 +1,5 @@
+"""Standalone performance benchmarks for the backend.
+
+Run a benchmark from the ``backend`` directory, e.g.
+``python -m benchmarks.organizer_dashboard``.
+"""
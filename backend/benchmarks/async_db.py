@@ -0,0 +1,116 @@
+"""Load-test the sync and async database paths at equal concurrency.
+
+Each mode runs in its own interpreter (the mode is fixed by
+``DATABASE_URL`` at import time) against the same seeded SQLite file and
+drives ``GET /events`` and ``GET /events/{id}`` through an in-process
+ASGI client with ``--concurrency`` simultaneous clients.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def seed(events: int):
+    from datetime import datetime, timedelta
+
+    from app import database, models
+    from . import common
+
+    common.reset_schema()
+    db = database.SessionLocal()
+    try:
+        user = models.User(email="bench@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        organizer = models.Organizer(user_id=user.id)
+        db.add(organizer)
+        db.flush()
+        start = datetime(2030, 1, 1)
+        db.execute(
+            models.Event.__table__.insert(),
+            [
+                {
+                    "title": f"Event {i}",
+                    "description": "benchmark",
+                    "date": start + timedelta(minutes=i),
+                    "location": "Berlin",
+                    "organizer_id": organizer.id,
+                }
+                for i in range(events)
+            ],
+        )
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+async def drive(app, headers, concurrency: int, requests: int, events: int):
+    import httpx
+
+    from . import common
+
+    samples = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(n: int):
+            for i in range(requests):
+                path = "/events" if i % 2 else f"/events/{(n * requests + i) % events + 1}"
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                samples.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {"requests": len(samples), "rps": len(samples) / elapsed, **common.percentiles(samples)}
+
+
+def run_mode(args):
+    from . import common
+
+    headers = common.auth_headers(seed(args.events))
+    from app import database
+    from app.main import app
+
+    result = asyncio.run(drive(app, headers, args.concurrency, args.requests, args.events))
+    print(json.dumps({"async": database.ASYNC_MODE, **result}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=40, help="requests per client")
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--mode", choices=["sync", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    results = []
+    for mode, url in (("sync", f"sqlite:///{path}"), ("async", f"sqlite+aiosqlite:///{path}")):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.async_db", "--mode", mode,
+             "--concurrency", str(args.concurrency), "--requests", str(args.requests),
+             "--events", str(args.events)],
+            env={**os.environ, "DATABASE_URL": url},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    print(json.dumps({"concurrency": args.concurrency, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
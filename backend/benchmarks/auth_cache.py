@@ -0,0 +1,74 @@
+"""Measure request throughput on ``/me`` and ``/events`` with and without
+the verified-token principal cache."""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from . import common
+
+
+def seed(events: int) -> int:
+    from app import database, models
+
+    common.reset_schema()
+    db = database.SessionLocal()
+    try:
+        user = models.User(email="bench@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        organizer = models.Organizer(user_id=user.id)
+        db.add(organizer)
+        db.flush()
+        db.execute(
+            models.Event.__table__.insert(),
+            [
+                {
+                    "title": f"Event {i}",
+                    "description": "benchmark",
+                    "date": datetime(2030, 1, 1) + timedelta(hours=i),
+                    "location": "Berlin",
+                    "organizer_id": organizer.id,
+                }
+                for i in range(events)
+            ],
+        )
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=1000)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    from app import principals
+    from app.main import app
+
+    headers = common.auth_headers(seed(args.events))
+    client = TestClient(app)
+    default_ttl = principals.cache.ttl
+    results = []
+    for path in ("/me", "/events"):
+        for ttl in (0, default_ttl):
+            principals.cache.ttl = ttl
+            principals.cache.clear()
+            client.get(path, headers=headers)
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                client.get(path, headers=headers)
+            elapsed = time.perf_counter() - started
+            results.append(
+                {"path": path, "cache": bool(ttl), "qps": args.requests / elapsed}
+            )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Shared helpers for the benchmark scripts."""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+# Benchmarks always run against a throwaway database unless told otherwise.
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+
+def reset_schema():
+    """Drop and recreate every table on the benchmark database."""
+    from app import database, models
+
+    models.Base.metadata.drop_all(bind=database.engine)
+    models.Base.metadata.create_all(bind=database.engine)
+
+
+def auth_headers(user_id: int) -> dict:
+    """Return bearer headers for ``user_id``."""
+    from app import auth
+
+    token = auth.create_access_token({"sub": str(user_id)})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed on the application engine."""
+    from sqlalchemy import event
+
+    from app import database
+
+    counter = {"queries": 0}
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        counter["queries"] += 1
+
+    event.listen(database.engine, "before_cursor_execute", _before)
+    try:
+        yield counter
+    finally:
+        event.remove(database.engine, "before_cursor_execute", _before)
+
+
+def percentiles(samples):
+    """Summarise latency samples (seconds) as milliseconds."""
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+    }
+
+
+def time_calls(fn, repeat: int):
+    """Call ``fn`` ``repeat`` times and return per-call durations."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
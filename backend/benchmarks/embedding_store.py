@@ -0,0 +1,122 @@
+"""Loading user embeddings from the memory-mapped store versus the database.
+
+Fills a float32 and an int8 ``EmbeddingStore`` with ``--users`` random
+profiles and reports, for each: the size on disk, how long a worker takes
+to open and map a compacted store, how long it takes with ``--tail`` of
+the rows appended since the last compaction, how long compaction takes
+and the blocked top-K scoring time of one event batch. For comparison,
+``--db-users`` profiles are loaded with one query by ``profiles.load_all``.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from . import common
+
+
+def random_unit(rng, rows: int, dim: int) -> np.ndarray:
+    matrix = rng.standard_normal((rows, dim), dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix
+
+
+def bench_store(directory, dtype, ids, users, events, args) -> dict:
+    from app import matching
+    from app.embedding_store import EmbeddingStore
+
+    path = os.path.join(directory, dtype)
+    dim = users.shape[1]
+    store = EmbeddingStore(path, dim, dtype)
+    store.append(ids, users)
+    store.compact()
+    size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+    def open_compacted():
+        ids, matrix = EmbeddingStore(path, dim, dtype).snapshot()
+        assert len(ids) == len(users)
+
+    cold = common.time_calls(open_compacted, args.repeat)
+
+    tail = int(len(ids) * args.tail)
+    rng = np.random.default_rng(1)
+    store.append(rng.choice(ids, tail, replace=False), random_unit(rng, tail, dim))
+    with_tail = common.time_calls(lambda: store.snapshot(), args.repeat)
+    started = time.perf_counter()
+    store.compact()
+    compact_ms = (time.perf_counter() - started) * 1000
+
+    _, matrix = store.snapshot()
+    scoring = common.time_calls(lambda: matching.top_k_users(events, matrix, args.top_k), 3)
+    return {
+        "dtype": dtype,
+        "users": len(ids),
+        "disk_mb": size / 2**20,
+        "open_compacted": common.percentiles(cold),
+        "open_with_tail": {"tail_rows": tail, **common.percentiles(with_tail)},
+        "compact_ms": compact_ms,
+        "top_k": common.percentiles(scoring),
+    }
+
+
+def bench_database(n_users: int, dim: int) -> dict:
+    from sqlalchemy import insert
+
+    from app import database, models, profiles
+
+    common.reset_schema()
+    rng = np.random.default_rng(2)
+    db = database.SessionLocal()
+    try:
+        for start in range(0, n_users, 10_000):
+            rows = min(10_000, n_users - start)
+            db.execute(insert(models.User), [
+                {"email": f"user{start + i}@example.com", "password_hash": "x"} for i in range(rows)
+            ])
+            db.execute(insert(models.UserProfile), [
+                {"user_id": start + i + 1, "ticket_count": 1, "vector": profiles.encode(vector)}
+                for i, vector in enumerate(random_unit(rng, rows, dim))
+            ])
+        db.commit()
+        samples = common.time_calls(lambda: profiles.load_all(db), 3)
+    finally:
+        db.close()
+    return {"source": "database", "users": n_users, **common.percentiles(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--db-users", type=int, default=100_000)
+    parser.add_argument("--tail", type=float, default=0.01, help="share of rows appended after compaction")
+    parser.add_argument("--events", type=int, default=16)
+    parser.add_argument("--top-k", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from app.embeddings import EMBEDDING_DIM
+
+    rng = np.random.default_rng(0)
+    ids = np.arange(1, args.users + 1, dtype=np.int64)
+    users = random_unit(rng, args.users, EMBEDDING_DIM)
+    events = random_unit(rng, args.events, EMBEDDING_DIM)
+    directory = tempfile.mkdtemp()
+    try:
+        results = [
+            bench_store(directory, dtype, ids, users, events, args)
+            for dtype in ("float32", "int8")
+        ]
+    finally:
+        shutil.rmtree(directory)
+    if args.db_users:
+        results.append(bench_database(args.db_users, EMBEDDING_DIM))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
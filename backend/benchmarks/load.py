@@ -0,0 +1,282 @@
+"""Seeded end-to-end load test of the main API endpoints.
+
+Seeds the database named by ``DATABASE_URL`` (a throwaway SQLite file by
+default; any Postgres URL works too) with ``--users`` users, of which
+``--organizers`` are organizers, ``--events`` events and ``--tickets``
+tickets, all from a fixed random seed. Then, one scenario at a time,
+``--concurrency`` clients drive the real app through an in-process ASGI
+client:
+
+* ``events_feed``: ``GET /events``, following cursors and location filters
+* ``event_detail``: ``GET /events/{id}``
+* ``my_tickets``: ``GET /me/tickets``
+* ``organizer_events``: ``GET /organizer/events``
+* ``organizer_stats``: ``GET /organizer/stats``
+* ``purchase``: ``POST /events/{id}/tickets``
+* ``login``: ``POST /auth/login`` (bcrypt cost from ``BCRYPT_ROUNDS``)
+
+The report is JSON with throughput, latency percentiles and SQL
+statements per request for each scenario, plus the git commit and
+volumes, so runs can be diffed: pass ``--output`` to save one and
+``--compare`` to print the change against an earlier report.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from . import common
+
+PASSWORD = "benchmark-password"
+CITIES = ["Berlin", "Paris", "Lisbon", "Madrid", "Vienna", "Prague"]
+
+
+def seed(args) -> dict:
+    """Fill the schema and return the ids the scenarios draw from."""
+    from sqlalchemy import func, insert, update
+
+    from app import auth, database, models, profiles, sales  # noqa: F401  (profile hooks)
+
+    common.reset_schema()
+    rng = random.Random(args.seed)
+    password_hash = auth.pwd_context.hash(PASSWORD)
+    db = database.SessionLocal()
+    try:
+        db.execute(
+            insert(models.User),
+            [
+                {"email": f"user{i}@example.com", "password_hash": password_hash}
+                for i in range(args.users)
+            ],
+        )
+        user_ids = [user_id for (user_id,) in db.query(models.User.id).order_by(models.User.id)]
+        db.execute(
+            insert(models.Organizer),
+            [{"user_id": user_id} for user_id in user_ids[: args.organizers]],
+        )
+        organizer_ids = [
+            organizer_id for (organizer_id,) in db.query(models.Organizer.id).order_by(models.Organizer.id)
+        ]
+        start = datetime(2030, 1, 1)
+        for offset in range(0, args.events, 10_000):
+            db.execute(
+                insert(models.Event),
+                [
+                    {
+                        "title": f"Event {i}",
+                        "description": "load test",
+                        "date": start + timedelta(minutes=i),
+                        "location": CITIES[i % len(CITIES)],
+                        "organizer_id": rng.choice(organizer_ids),
+                    }
+                    for i in range(offset, min(args.events, offset + 10_000))
+                ],
+            )
+        event_ids = [event_id for (event_id,) in db.query(models.Event.id)]
+        for offset in range(0, args.tickets, 10_000):
+            db.execute(
+                insert(models.Ticket),
+                [
+                    {"event_id": rng.choice(event_ids), "user_id": rng.choice(user_ids)}
+                    for _ in range(offset, min(args.tickets, offset + 10_000))
+                ],
+            )
+        sold = (
+            db.query(func.count(models.Ticket.id))
+            .filter(models.Ticket.event_id == models.Event.id)
+            .scalar_subquery()
+        )
+        db.execute(update(models.Event).values(sold=sold))
+        profiles.rebuild(db)
+        # Core inserts skip the flush hook that feeds the hourly sales rollup.
+        sales.rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+    organizer_users = user_ids[: args.organizers]
+    return {
+        "users": user_ids,
+        "organizer_users": organizer_users,
+        "buyers": user_ids[args.organizers:] or user_ids,
+        "events": event_ids,
+    }
+
+
+def scenarios(ids: dict, rng: random.Random):
+    """Map scenario names to coroutines issuing one request each."""
+    headers = {user_id: common.auth_headers(user_id) for user_id in ids["users"][:1000]}
+    buyers = [user_id for user_id in ids["buyers"] if user_id in headers] or list(headers)
+    organizers = [user_id for user_id in ids["organizer_users"] if user_id in headers]
+
+    async def events_feed(client):
+        params = {"limit": 20}
+        if rng.random() < 0.3:
+            params["location"] = rng.choice(CITIES)
+        response = await client.get("/events", params=params, headers=headers[rng.choice(buyers)])
+        cursor = response.json().get("next_cursor")
+        if cursor and rng.random() < 0.5:
+            params["cursor"] = cursor
+            response = await client.get("/events", params=params, headers=headers[rng.choice(buyers)])
+        return response
+
+    async def event_detail(client):
+        return await client.get(
+            f"/events/{rng.choice(ids['events'])}", headers=headers[rng.choice(buyers)]
+        )
+
+    async def my_tickets(client):
+        return await client.get("/me/tickets", headers=headers[rng.choice(buyers)])
+
+    async def organizer_events(client):
+        return await client.get("/organizer/events", headers=headers[rng.choice(organizers)])
+
+    async def organizer_stats(client):
+        return await client.get("/organizer/stats", headers=headers[rng.choice(organizers)])
+
+    async def purchase(client):
+        return await client.post(
+            f"/events/{rng.choice(ids['events'])}/tickets", headers=headers[rng.choice(buyers)]
+        )
+
+    async def login(client):
+        user_id = rng.choice(ids["users"])
+        return await client.post(
+            "/auth/login",
+            data={"username": f"user{user_id - ids['users'][0]}@example.com", "password": PASSWORD},
+        )
+
+    return {
+        "events_feed": events_feed,
+        "event_detail": event_detail,
+        "my_tickets": my_tickets,
+        "organizer_events": organizer_events,
+        "organizer_stats": organizer_stats,
+        "purchase": purchase,
+        "login": login,
+    }
+
+
+async def run_scenario(app, request, concurrency: int, requests: int) -> dict:
+    """Issue ``requests`` calls from each of ``concurrency`` clients."""
+    import httpx
+
+    from app import metrics
+
+    metrics.reset()
+    samples, statuses = [], Counter()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = await request(client)
+                samples.append(time.perf_counter() - started)
+                statuses[str(response.status_code)] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    queries, handled = metrics.REQUEST_DB_QUERIES.totals()
+    return {
+        "requests": len(samples),
+        "statuses": dict(sorted(statuses.items())),
+        "rps": len(samples) / elapsed,
+        "db_queries_per_request": queries / handled if handled else 0.0,
+        **common.percentiles(samples),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(report: dict, baseline: dict):
+    """Print the change of each scenario's throughput and latency to stderr."""
+    print(f"{'scenario':<18}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}", file=sys.stderr)
+    for name, result in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        cells = [
+            f"{(result[key] / before[key] - 1) * 100:+.1f}%" if before[key] else "n/a"
+            for key in ("rps", "p50_ms", "p95_ms", "p99_ms")
+        ]
+        print(f"{name:<18}" + "".join(f"{cell:>10}" for cell in cells), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--organizers", type=int, default=100)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--tickets", type=int, default=50_000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--login-requests", type=int, default=5, help="logins per client")
+    parser.add_argument("--scenarios", help="comma-separated subset to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-cache", action="store_true", help="disable the event response cache")
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--compare", help="report to compare against")
+    args = parser.parse_args()
+    args.organizers = max(1, min(args.organizers, args.users))
+
+    started = time.perf_counter()
+    ids = seed(args)
+    seed_seconds = time.perf_counter() - started
+
+    import fakeredis
+
+    from app import database, event_cache
+    from app.main import app
+
+    # Keep runs self-contained: the cache talks to an in-process Redis.
+    event_cache.client = fakeredis.FakeRedis()
+    if args.no_cache:
+        event_cache.CACHE_TTL = 0
+
+    selected = scenarios(ids, random.Random(args.seed))
+    if args.scenarios:
+        selected = {name: selected[name] for name in args.scenarios.split(",")}
+    report = {
+        "commit": git_commit(),
+        "database": database.engine.dialect.name,
+        "async": database.ASYNC_MODE,
+        "volumes": {key: getattr(args, key) for key in ("users", "organizers", "events", "tickets")},
+        "concurrency": args.concurrency,
+        "event_cache": not args.no_cache,
+        "seed_seconds": seed_seconds,
+        "scenarios": {},
+    }
+    for name, request in selected.items():
+        requests = args.login_requests if name == "login" else args.requests
+        report["scenarios"][name] = asyncio.run(
+            run_scenario(app, request, args.concurrency, requests)
+        )
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    if args.compare:
+        compare(report, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == "__main__":
+    main()
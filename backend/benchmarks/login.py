@@ -0,0 +1,117 @@
+"""Login throughput under concurrent load, with bcrypt inline versus on the
+dedicated hashing process pool.
+
+While ``--concurrency`` clients log in repeatedly, one client polls
+``GET /events`` to show how much the hashing work slows unrelated
+endpoints. Each configuration runs in its own interpreter because the
+pool settings are read at import time.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+async def drive(app, args, headers):
+    import httpx
+
+    from . import common
+
+    logins, feed = [], []
+    rejected = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+
+        async def login(n: int):
+            nonlocal rejected
+            for _ in range(args.logins):
+                started = time.perf_counter()
+                response = await client.post(
+                    "/auth/login",
+                    data={"username": f"user{n % args.users}@example.com", "password": "pw"},
+                )
+                if response.status_code == 429:
+                    rejected += 1
+                    await asyncio.sleep(0.05)
+                    continue
+                response.raise_for_status()
+                logins.append(time.perf_counter() - started)
+
+        async def poll_feed():
+            while not stop.is_set():
+                started = time.perf_counter()
+                (await client.get("/events", headers=headers)).raise_for_status()
+                feed.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        poller = asyncio.create_task(poll_feed())
+        started = time.perf_counter()
+        await asyncio.gather(*(login(n) for n in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await poller
+    return {
+        "logins_per_second": len(logins) / elapsed,
+        "rejected_429": rejected,
+        "login": common.percentiles(logins),
+        "events_during_load": common.percentiles(feed),
+    }
+
+
+def run_config(args):
+    from . import common
+
+    common.reset_schema()
+    from app import auth, database, models
+    from app.main import app
+
+    password_hash = auth.get_password_hash("pw")
+    db = database.SessionLocal()
+    db.add_all(
+        models.User(email=f"user{i}@example.com", password_hash=password_hash)
+        for i in range(args.users)
+    )
+    db.commit()
+    db.close()
+    headers = common.auth_headers(1)
+    result = asyncio.run(drive(app, args, headers))
+    auth.shutdown_hashing()
+    print(json.dumps({"hash_workers": auth.HASH_WORKERS, **result}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=5, help="logins per client")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost factor")
+    parser.add_argument("--workers", default=f"0,{os.cpu_count() or 1}")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_config(args)
+        return
+
+    results = []
+    for workers in args.workers.split(","):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.login", "--child",
+             "--concurrency", str(args.concurrency), "--logins", str(args.logins),
+             "--users", str(args.users)],
+            env={**os.environ, "HASH_WORKERS": workers, "BCRYPT_ROUNDS": str(args.rounds)},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
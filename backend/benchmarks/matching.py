@@ -0,0 +1,79 @@
+"""Benchmark the blocked top-K matcher behind ``tasks.match_event_to_users``.
+
+Scores one event (and a batch of events) against synthetic, normalised
+user embeddings and reports how long the scoring step of a matching job
+takes at each user count.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from . import common  # noqa: F401  (sets up sys.path and DATABASE_URL)
+
+
+def random_unit(rng, rows: int, dim: int) -> np.ndarray:
+    matrix = rng.standard_normal((rows, dim), dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", default="100000,1000000")
+    parser.add_argument(
+        "--events", type=int, default=16, help="batch size for the batched run"
+    )
+    parser.add_argument("--top-k", type=int, default=100)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from app import matching
+    from app.embeddings import EMBEDDING_DIM
+
+    chunk_size = args.chunk_size or matching.MATCH_CHUNK_SIZE
+    rng = np.random.default_rng(0)
+    results = []
+    for n_users in (int(n) for n in args.users.split(",")):
+        users = random_unit(rng, n_users, EMBEDDING_DIM)
+        for n_events in (1, args.events):
+            events = random_unit(rng, n_events, EMBEDDING_DIM)
+            samples = common.time_calls(
+                lambda: matching.top_k_users(events, users, args.top_k, chunk_size),
+                args.repeat,
+            )
+            results.append(
+                {
+                    "users": n_users,
+                    "events": n_events,
+                    "top_k": args.top_k,
+                    "chunk_size": chunk_size,
+                    **common.percentiles(samples),
+                    "users_per_second": n_users * n_events / min(samples),
+                }
+            )
+
+    # Persisting the result is a single bulk insert of events * top_k rows.
+    common.reset_schema()
+    from app import database, models
+
+    rows = [
+        {"event_id": 1, "user_id": i, "score": 0.5}
+        for i in range(args.top_k)
+    ]
+    db = database.SessionLocal()
+    started = time.perf_counter()
+    db.execute(models.Match.__table__.insert(), rows)
+    db.commit()
+    db.close()
+    results.append(
+        {"bulk_insert_rows": len(rows), "ms": (time.perf_counter() - started) * 1000}
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark ``GET /organizer/events`` as the organizer's event count grows.
+
+The dashboard is served by one grouped query, so the number of SQL
+statements per request must not depend on how many events exist.
+"""
+
+import argparse
+import json
+from datetime import datetime, timedelta
+
+from . import common
+
+
+def seed(event_count: int, tickets_per_event: int):
+    from app import database, models
+
+    common.reset_schema()
+    db = database.SessionLocal()
+    try:
+        owner = models.User(email="organizer@example.com", password_hash="x")
+        buyer = models.User(email="buyer@example.com", password_hash="x")
+        db.add_all([owner, buyer])
+        db.flush()
+        organizer = models.Organizer(user_id=owner.id)
+        db.add(organizer)
+        db.flush()
+        start = datetime(2030, 1, 1)
+        events = [
+            {
+                "title": f"Event {i}",
+                "description": "benchmark",
+                "date": start + timedelta(hours=i),
+                "location": "Berlin",
+                "organizer_id": organizer.id,
+            }
+            for i in range(event_count)
+        ]
+        db.execute(models.Event.__table__.insert(), events)
+        event_ids = [row[0] for row in db.query(models.Event.id)]
+        db.execute(
+            models.Ticket.__table__.insert(),
+            [
+                {"event_id": event_id, "user_id": buyer.id}
+                for event_id in event_ids
+                for _ in range(tickets_per_event)
+            ],
+        )
+        db.commit()
+        return owner.id
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,100,1000,2000")
+    parser.add_argument("--tickets-per-event", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        headers = common.auth_headers(seed(size, args.tickets_per_event))
+        with common.count_queries() as counter:
+            client.get("/organizer/events", headers=headers)
+        samples = common.time_calls(
+            lambda: client.get("/organizer/events", headers=headers), args.repeat
+        )
+        results.append(
+            {"events": size, "queries": counter["queries"], **common.percentiles(samples)}
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
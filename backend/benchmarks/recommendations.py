@@ -0,0 +1,89 @@
+"""Recall versus latency of the IVF recommendation index against brute force.
+
+Builds ``app.ann.IVFIndex`` over synthetic clustered event embeddings and,
+for each ``n_probe``, reports recall@k relative to exact search together
+with per-query latency of both.
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from . import common  # noqa: F401  (sets up sys.path)
+
+
+def clustered_unit(rng, rows: int, dim: int, clusters: int) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    matrix = centers[rng.integers(0, clusters, rows)]
+    matrix += 0.5 * rng.standard_normal((rows, dim), dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--n-probe", default="1,2,4,8,16,32")
+    args = parser.parse_args()
+
+    from app.ann import IVFIndex
+    from app.embeddings import EMBEDDING_DIM
+
+    rng = np.random.default_rng(0)
+    vectors = clustered_unit(rng, args.events, EMBEDDING_DIM, clusters=500)
+    now = datetime(2030, 1, 1)
+    dates = np.array(now, dtype="datetime64[us]") + rng.integers(
+        -30, 365, args.events
+    ).astype("timedelta64[D]")
+    queries = clustered_unit(rng, args.queries, EMBEDDING_DIM, clusters=500)
+
+    index = IVFIndex(EMBEDDING_DIM)
+    started = time.perf_counter()
+    index.build(np.arange(args.events), vectors, dates)
+    build_seconds = time.perf_counter() - started
+
+    upcoming = dates >= np.datetime64(now, "us")
+    exact, exact_samples = [], []
+    for query in queries:
+        started = time.perf_counter()
+        scores = np.where(upcoming, vectors @ query, -np.inf)
+        best = np.argpartition(-scores, args.k - 1)[: args.k]
+        exact_samples.append(time.perf_counter() - started)
+        exact.append(set(best.tolist()))
+
+    results = {
+        "events": args.events,
+        "n_lists": index.n_lists,
+        "build_seconds": build_seconds,
+        "brute_force": common.percentiles(exact_samples),
+        "ivf": [],
+    }
+    for n_probe in (int(n) for n in args.n_probe.split(",")):
+        samples, hits = [], 0
+        for query, truth in zip(queries, exact):
+            started = time.perf_counter()
+            ids, _ = index.search(query, args.k, after=now, n_probe=n_probe)
+            samples.append(time.perf_counter() - started)
+            hits += len(truth & set(ids.tolist()))
+        results["ivf"].append(
+            {
+                "n_probe": n_probe,
+                "recall": hits / (args.k * len(queries)),
+                **common.percentiles(samples),
+            }
+        )
+
+    started = time.perf_counter()
+    for i in range(1000):
+        index.add(args.events + i, queries[i % len(queries)], now + timedelta(days=1))
+    results["incremental_add_us"] = (time.perf_counter() - started) / 1000 * 1e6
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
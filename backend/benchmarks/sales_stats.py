@@ -0,0 +1,102 @@
+"""Benchmark ``GET /organizer/stats`` as the number of tickets grows.
+
+For each size, ``--events`` events get that many tickets spread over
+``--days`` days. The endpoint reads the hourly rollup, so its latency
+should stay flat; for comparison the same daily series is computed live
+by grouping the tickets table.
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+
+from . import common
+
+
+def seed(ticket_count: int, event_count: int, days: int) -> int:
+    from app import database, models, sales
+
+    common.reset_schema()
+    rng = random.Random(0)
+    db = database.SessionLocal()
+    try:
+        owner = models.User(email="organizer@example.com", password_hash="x")
+        buyer = models.User(email="buyer@example.com", password_hash="x")
+        db.add_all([owner, buyer])
+        db.flush()
+        organizer = models.Organizer(user_id=owner.id)
+        db.add(organizer)
+        db.flush()
+        db.execute(models.Event.__table__.insert(), [
+            {"title": f"Event {i}", "description": "benchmark", "date": datetime(2030, 1, 1),
+             "location": "Berlin", "organizer_id": organizer.id}
+            for i in range(event_count)
+        ])
+        event_ids = [row[0] for row in db.query(models.Event.id)]
+        start = datetime(2029, 1, 1)
+        for offset in range(0, ticket_count, 10_000):
+            db.execute(models.Ticket.__table__.insert(), [
+                {"event_id": rng.choice(event_ids), "user_id": buyer.id,
+                 "created_at": start + timedelta(seconds=rng.randrange(days * 86400))}
+                for _ in range(min(10_000, ticket_count - offset))
+            ])
+        sales.rebuild(db)
+        db.commit()
+        return owner.id
+    finally:
+        db.close()
+
+
+def live_series(organizer_user_id: int):
+    from sqlalchemy import func, select
+
+    from app import database, models
+
+    day = func.date(models.Ticket.created_at)
+    stmt = (
+        select(day, func.count())
+        .join(models.Event, models.Event.id == models.Ticket.event_id)
+        .join(models.Organizer, models.Organizer.id == models.Event.organizer_id)
+        .where(models.Organizer.user_id == organizer_user_id)
+        .group_by(day)
+        .order_by(day)
+    )
+    with database.SessionLocal() as db:
+        return db.execute(stmt).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        owner_id = seed(size, args.events, args.days)
+        headers = common.auth_headers(owner_id)
+        points = client.get("/organizer/stats", headers=headers).json()["points"]
+        assert len(points) == len(live_series(owner_id))
+        rollup = common.time_calls(
+            lambda: client.get("/organizer/stats", headers=headers), args.repeat
+        )
+        live = common.time_calls(lambda: live_series(owner_id), args.repeat)
+        results.append({
+            "tickets": size,
+            "buckets": len(points),
+            "rollup": common.percentiles(rollup),
+            "live_group_by": common.percentiles(live),
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Full-text event search against ``LIKE`` scans.
+
+Seeds ``--events`` synthetic events (titles and descriptions drawn from a
+Zipf-distributed vocabulary, so common and rare terms both occur) and
+times ``app.search`` ranked queries against the unindexed ``LIKE``
+statement for the same terms, one page of ``--limit`` rows each, for
+common, mid-frequency and rare terms. ``LIKE`` stops at the first page of
+date-ordered matches, so it only degrades as terms get rarer, while
+ranking has to score every match.
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from . import common
+
+
+def seed(events: int, vocabulary: int, chunk: int = 50_000):
+    from app import database, models, search  # noqa: F401  (registers the FTS DDL)
+
+    common.reset_schema()
+    rng = np.random.default_rng(0)
+    # Delimited so a LIKE '%t5z%' cannot match t15z.
+    words = [f"t{i}z" for i in range(vocabulary)]
+    cities = ["Berlin", "Paris", "Lisbon", "Madrid", "Vienna", "Prague"]
+    db = database.SessionLocal()
+    try:
+        user = models.User(email="bench@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        organizer = models.Organizer(user_id=user.id)
+        db.add(organizer)
+        db.flush()
+        start = datetime(2030, 1, 1)
+        for offset in range(0, events, chunk):
+            size = min(chunk, events - offset)
+            picks = np.minimum(rng.zipf(1.3, (size, 12)), vocabulary) - 1
+            db.execute(
+                models.Event.__table__.insert(),
+                [
+                    {
+                        "title": " ".join(words[w] for w in row[:3]),
+                        "description": " ".join(words[w] for w in row[3:]),
+                        "date": start + timedelta(minutes=offset + i),
+                        "location": cities[(offset + i) % len(cities)],
+                        "organizer_id": organizer.id,
+                    }
+                    for i, row in enumerate(picks.tolist())
+                ],
+            )
+        db.commit()
+    finally:
+        db.close()
+    return words
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    words = seed(args.events, args.vocabulary)
+    seed_seconds = time.perf_counter() - started
+
+    from app import database, search
+
+    dialect = database.engine.dialect.name
+    rng = np.random.default_rng(1)
+    bands = {"common": (1, 10), "mid": (50, 200), "rare": (2000, 5000)}
+
+    results = {"events": args.events, "dialect": dialect, "seed_seconds": seed_seconds}
+    db = database.SessionLocal()
+    try:
+        for band, (low, high) in bands.items():
+            terms = [words[i] for i in rng.integers(low, high, args.queries)]
+            results[band] = {}
+            for name, build in (
+                ("fts", lambda q: search.search_statement(dialect, q, args.limit)),
+                ("like", lambda q: search.like_statement([q]).limit(args.limit + 1)),
+            ):
+                samples, hits = [], 0
+                for term in terms:
+                    stmt = build(term)
+                    began = time.perf_counter()
+                    hits += len(db.execute(stmt).all())
+                    samples.append(time.perf_counter() - began)
+                results[band][name] = {"rows": hits, **common.percentiles(samples)}
+    finally:
+        db.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Encoding large list responses: schema validation versus the row fast path.
+
+Seeds ``--rows`` events for one organizer and as many tickets for one
+event, then times building the JSON body of the organizer dashboard and
+of the ticket list two ways: the previous path (ORM objects or dicts
+validated through the Pydantic response schema) and the fast path (plain
+column rows encoded with orjson). Both bodies are checked to decode to the
+same value. The full endpoints are timed as well for context.
+"""
+
+import argparse
+import json
+from datetime import datetime, timedelta
+
+from . import common
+
+
+def seed(rows: int):
+    from app import database, models
+
+    common.reset_schema()
+    db = database.SessionLocal()
+    try:
+        owner = models.User(email="organizer@example.com", password_hash="x")
+        buyer = models.User(email="buyer@example.com", password_hash="x")
+        db.add_all([owner, buyer])
+        db.flush()
+        organizer = models.Organizer(user_id=owner.id)
+        db.add(organizer)
+        db.flush()
+        start = datetime(2030, 1, 1)
+        db.execute(models.Event.__table__.insert(), [
+            {"title": f"Event {i}", "description": "benchmark", "date": start + timedelta(hours=i),
+             "location": "Berlin", "organizer_id": organizer.id, "capacity": 100}
+            for i in range(rows)
+        ])
+        event_id = db.query(models.Event.id).first()[0]
+        db.execute(models.Ticket.__table__.insert(), [
+            {"event_id": event_id, "user_id": buyer.id} for _ in range(rows)
+        ])
+        db.commit()
+        return owner.id, organizer.id, event_id
+    finally:
+        db.close()
+
+
+def dashboard_paths(organizer_id: int):
+    from pydantic import TypeAdapter
+    from sqlalchemy import func, select
+
+    from app import models, queries, schemas, serialization
+
+    adapter = TypeAdapter(list[schemas.EventWithSales])
+
+    def validated(db):
+        rows = (
+            db.query(models.Event, func.count(models.Ticket.id))
+            .outerjoin(models.Ticket, models.Ticket.event_id == models.Event.id)
+            .filter(models.Event.organizer_id == organizer_id)
+            .group_by(models.Event.id)
+            .all()
+        )
+        items = [
+            {**schemas.Event.model_validate(event, from_attributes=True).model_dump(), "ticket_sales": sales}
+            for event, sales in rows
+        ]
+        return adapter.dump_json(adapter.validate_python(items))
+
+    def fast(db):
+        rows = db.execute(
+            select(*queries.EVENT_COLUMNS, func.count(models.Ticket.id).label("ticket_sales"))
+            .outerjoin(models.Ticket, models.Ticket.event_id == models.Event.id)
+            .where(models.Event.organizer_id == organizer_id)
+            .group_by(models.Event.id)
+        ).all()
+        return serialization.dumps(serialization.records(rows))
+
+    return validated, fast
+
+
+def ticket_paths(event_id: int):
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+
+    from app import models, queries, schemas, serialization
+
+    adapter = TypeAdapter(list[schemas.Ticket])
+
+    def validated(db):
+        rows = db.query(models.Ticket).filter(models.Ticket.event_id == event_id).all()
+        return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    def fast(db):
+        rows = db.execute(
+            select(*queries.TICKET_COLUMNS)
+            .where(models.Ticket.event_id == event_id)
+            .order_by(models.Ticket.id)
+        ).all()
+        return serialization.dumps(serialization.records(rows))
+
+    return validated, fast
+
+
+def bench(paths, repeat: int) -> dict:
+    from app import database
+
+    result = {}
+    with database.SessionLocal() as db:
+        bodies = [json.loads(path(db)) for path in paths]
+        assert bodies[0] == bodies[1]
+        for name, path in zip(("validated", "fast"), paths):
+            # A fresh session per call so the ORM path pays for loading objects.
+            def call():
+                with database.SessionLocal() as session:
+                    path(session)
+
+            result[name] = common.percentiles(common.time_calls(call, repeat))
+    result["speedup"] = result["validated"]["p50_ms"] / result["fast"]["p50_ms"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    owner_id, organizer_id, event_id = seed(args.rows)
+    client = TestClient(app)
+    headers = common.auth_headers(owner_id)
+    endpoints = {
+        "organizer_events": "/organizer/events",
+        "event_tickets": f"/organizer/events/{event_id}/tickets",
+    }
+    results = {
+        "rows": args.rows,
+        "organizer_events": bench(dashboard_paths(organizer_id), args.repeat),
+        "event_tickets": bench(ticket_paths(event_id), args.repeat),
+    }
+    for name, url in endpoints.items():
+        samples = common.time_calls(lambda: client.get(url, headers=headers), args.repeat)
+        results[name]["endpoint"] = common.percentiles(samples)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
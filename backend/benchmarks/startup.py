@@ -0,0 +1,142 @@
+"""Cold-start time of the API process.
+
+Each run starts a fresh interpreter that imports ``app.main``, runs the
+lifespan startup, serves a first ``GET /metrics`` (a readiness probe) and
+a first authenticated ``GET /events`` (the first real request, which
+opens the database and Redis connections), then shuts down. The report
+is JSON with percentiles of each phase plus the modules with the largest
+self import time from ``python -X importtime``.
+
+The schema is created once up front, as ``alembic upgrade head`` would
+before a replica starts. ``REDIS_URL`` defaults to a local server; when
+none is running the first request pays a refused connection and treats
+the cache as a miss.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+async def serve_first_requests(app, headers: dict) -> dict:
+    import httpx
+
+    timings = {}
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        timings["startup"] = time.perf_counter() - started
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            started = time.perf_counter()
+            (await client.get("/metrics")).raise_for_status()
+            timings["first_response"] = time.perf_counter() - started
+            started = time.perf_counter()
+            (await client.get("/events", headers=headers)).raise_for_status()
+            timings["first_event_list"] = time.perf_counter() - started
+        started = time.perf_counter()
+    timings["shutdown"] = time.perf_counter() - started
+    return timings
+
+
+def run_child(args):
+    import httpx  # noqa: F401  (client cost is not startup cost)
+
+    started = time.perf_counter()
+    from app.main import app
+
+    timings = {"import": time.perf_counter() - started}
+    timings.update(asyncio.run(serve_first_requests(app, json.loads(args.headers))))
+    timings["ready"] = timings["import"] + timings["startup"] + timings["first_response"]
+    print(json.dumps(timings))
+
+
+def import_profile(env: dict, top: int) -> list:
+    """Return the ``top`` modules by self import time of ``app.main``."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append(
+            {
+                "module": name.strip(),
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            }
+        )
+    return sorted(modules, key=lambda module: module["self_ms"], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--headers", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    from . import common
+    from .load import git_commit
+
+    common.reset_schema()
+    from app import database, models
+
+    db = database.SessionLocal()
+    user = models.User(email="startup@example.com", password_hash="unused")
+    db.add(user)
+    db.commit()
+    headers = common.auth_headers(user.id)
+    db.close()
+
+    env = {**os.environ, "REDIS_URL": os.getenv("REDIS_URL", "redis://localhost:6379")}
+    phases = {}
+    processes = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--child", "--headers", json.dumps(headers)],
+            cwd=BACKEND,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        processes.append(time.perf_counter() - started)
+        for phase, seconds in json.loads(output.strip().splitlines()[-1]).items():
+            phases.setdefault(phase, []).append(seconds)
+
+    report = {
+        "commit": git_commit(),
+        "runs": args.runs,
+        **{f"{phase}_ms": common.percentiles(samples) for phase, samples in phases.items()},
+        "process_ms": common.percentiles(processes),
+        "slowest_imports": import_profile(env, args.top),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import fakeredis
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/test.db")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from fastapi.testclient import TestClient
+
+from app import auth, database, event_cache, models, principals, recommendations, tasks
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def clean_db():
+    """Give every test an empty schema."""
+    models.Base.metadata.drop_all(bind=database.engine)
+    models.Base.metadata.create_all(bind=database.engine)
+    recommendations.reset()
+    principals.cache.clear()
+    principals._generations.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    """Back the event cache with an in-memory Redis."""
+    server = fakeredis.FakeRedis()
+    monkeypatch.setattr(event_cache, "client", server)
+    monkeypatch.setattr(event_cache, "_skip_until", 0.0)
+    return server
+
+
+@pytest.fixture(autouse=True)
+def enqueued(monkeypatch):
+    """Capture the event ids of matching jobs instead of sending them to Redis."""
+    jobs = []
+    monkeypatch.setattr(tasks, "enqueue_match_job", lambda job_id, ids: jobs.append(list(ids)))
+    return jobs
+
+
+@pytest.fixture
+def db():
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _headers(user):
+    token = auth.create_access_token({"sub": str(user.id)})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def make_user(db):
+    """Create a user and return it with ready-to-use auth headers."""
+    def _make(email=None):
+        user = models.User(
+            email=email or f"user{db.query(models.User).count()}@example.com",
+            password_hash="x",
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user, _headers(user)
+    return _make
+
+
+@pytest.fixture
+def make_organizer(db, make_user):
+    """Create an organizer and return it with the owning user's headers."""
+    def _make():
+        user, headers = make_user()
+        organizer = models.Organizer(user_id=user.id)
+        db.add(organizer)
+        db.commit()
+        db.refresh(organizer)
+        return organizer, headers
+    return _make
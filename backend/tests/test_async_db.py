@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import async_routes, database, models
+
+
+@pytest.fixture
+def async_client():
+    url = database.engine.url
+    if url.get_backend_name() != "sqlite":
+        pytest.skip("async path is exercised against SQLite here")
+    engine = create_async_engine(url.set(drivername="sqlite+aiosqlite"))
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_async_db():
+        async with sessions() as db:
+            yield db
+
+    app = FastAPI()
+    app.get("/events")(lambda: "sync handler")
+    async_routes.install(app)
+    app.dependency_overrides[database.get_async_db] = get_async_db
+    with TestClient(app) as client:
+        yield client
+
+
+def test_async_routes_replace_sync_handlers(async_client, db, make_organizer):
+    organizer, headers = make_organizer()
+    db.add_all(
+        [
+            models.Event(title=f"Event {i}", description="d", date=datetime(2030, 1, i + 1),
+                         location="Berlin", organizer_id=organizer.id)
+            for i in range(3)
+        ]
+    )
+    db.commit()
+
+    page = async_client.get("/events", params={"limit": 2}, headers=headers).json()
+    assert [e["title"] for e in page["items"]] == ["Event 0", "Event 1"]
+    page = async_client.get(
+        "/events", params={"cursor": page["next_cursor"]}, headers=headers
+    ).json()
+    assert [e["title"] for e in page["items"]] == ["Event 2"]
+
+    event_id = page["items"][0]["id"]
+    assert async_client.get(f"/events/{event_id}", headers=headers).json()["id"] == event_id
+    assert async_client.get("/events/999", headers=headers).status_code == 404
+    assert async_client.get("/me", headers=headers).json()["id"] == organizer.user_id
+    assert async_client.get("/me/tickets", headers=headers).json() == {"items": [], "next_cursor": None}
@@ -0,0 +1,149 @@
+from sqlalchemy import event
+
+from app import database, models, principals
+from app.cache import TTLCache
+
+
+def _count_queries(fn):
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", _record)
+    try:
+        fn()
+    finally:
+        event.remove(database.engine, "before_cursor_execute", _record)
+    return len(statements)
+
+
+def test_cached_principal_skips_database(client, make_user):
+    user, headers = make_user()
+    assert _count_queries(lambda: client.get("/me", headers=headers)) == 1
+    assert _count_queries(lambda: client.get("/me", headers=headers)) == 0
+    assert client.get("/me", headers=headers).json() == {"id": user.id, "email": user.email}
+    # Reading generations must not leave a per-user entry behind.
+    assert user.id not in principals._generations
+
+
+def test_organizer_change_invalidates_cached_principal(client, db, make_user):
+    user, headers = make_user()
+    assert client.get("/organizer/events", headers=headers).status_code == 403
+
+    organizer = models.Organizer(user_id=user.id)
+    db.add(organizer)
+    db.commit()
+    assert client.get("/organizer/events", headers=headers).status_code == 200
+
+    db.delete(organizer)
+    db.commit()
+    assert client.get("/organizer/events", headers=headers).status_code == 403
+
+
+def test_invalid_token_is_rejected(client):
+    response = client.get("/me", headers={"Authorization": "Bearer nope"})
+    assert response.status_code == 401
+    assert len(principals.cache) == 0
+
+
+def test_ttl_cache_expires_and_evicts():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+    cache.set("c", 3, ttl=1)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    now[0] = 5
+    assert cache.get("c") is None
+    now[0] = 11
+    assert cache.get("b") is None
+
+
+def test_signup_and_login_hash_on_the_process_pool(client):
+    response = client.post(
+        "/auth/signup", json={"email": "new@example.com", "password": "s3cret"}
+    )
+    assert response.status_code == 200
+    login = client.post(
+        "/auth/login", data={"username": "new@example.com", "password": "s3cret"}
+    )
+    assert login.status_code == 200
+    assert login.json()["user"]["email"] == "new@example.com"
+    bad = client.post(
+        "/auth/login", data={"username": "new@example.com", "password": "wrong"}
+    )
+    assert bad.status_code == 401
+
+
+def test_login_upgrades_outdated_hash(client, db, monkeypatch):
+    from passlib.context import CryptContext
+
+    from app import auth
+
+    weak = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4)
+    user = models.User(email="old@example.com", password_hash=weak.hash("pw"))
+    db.add(user)
+    db.commit()
+
+    monkeypatch.setattr(auth, "HASH_WORKERS", 0)
+    monkeypatch.setattr(
+        auth,
+        "pwd_context",
+        CryptContext(schemes=["bcrypt"], deprecated="auto",
+                     bcrypt__default_rounds=5, bcrypt__min_rounds=5),
+    )
+    response = client.post("/auth/login", data={"username": "old@example.com", "password": "pw"})
+    assert response.status_code == 200
+    db.refresh(user)
+    assert user.password_hash.startswith("$2b$05$")
+
+
+def test_hashing_backpressure_returns_429(client, monkeypatch):
+    import threading
+
+    from app import auth
+
+    monkeypatch.setattr(auth, "_slots", threading.BoundedSemaphore(1))
+    auth._slots.acquire()
+    response = client.post(
+        "/auth/signup", json={"email": "busy@example.com", "password": "pw"}
+    )
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_waiting_for_bcrypt_holds_no_worker_thread(monkeypatch):
+    import asyncio
+    from concurrent.futures import Future
+
+    import anyio.to_thread
+    import httpx
+
+    from app import auth
+    from app.main import app
+
+    pending, submitted = Future(), []
+
+    class StalledPool:
+        def submit(self, fn, *args):
+            submitted.append(fn)
+            return pending
+
+    monkeypatch.setattr(auth, "HASH_WORKERS", 1)
+    monkeypatch.setattr(auth, "_get_pool", lambda: StalledPool())
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            signup = asyncio.create_task(client.post(
+                "/auth/signup", json={"email": "wait@example.com", "password": "pw"}
+            ))
+            while not submitted:
+                await asyncio.sleep(0.01)
+            borrowed = anyio.to_thread.current_default_thread_limiter().borrowed_tokens
+            pending.set_result(auth.get_password_hash("pw"))
+            return borrowed, (await signup).status_code
+
+    assert asyncio.run(scenario()) == (0, 200)
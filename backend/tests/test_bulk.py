@@ -0,0 +1,99 @@
+from datetime import datetime
+
+from app import models, outbox
+
+
+def test_batch_ticket_purchase_is_all_or_nothing(client, db, make_organizer, make_user):
+    organizer, _ = make_organizer()
+    event = models.Event(title="Gig", description="d", date=datetime(2030, 1, 1),
+                         location="Berlin", organizer_id=organizer.id, capacity=5)
+    db.add(event)
+    db.commit()
+    _, headers = make_user()
+    keyed = {**headers, "Idempotency-Key": "group-1"}
+    url = f"/events/{event.id}/tickets:batch"
+
+    tickets = client.post(url, json={"quantity": 3}, headers=keyed).json()
+    assert len({t["id"] for t in tickets}) == 3
+    assert client.post(url, json={"quantity": 3}, headers=keyed).json() == tickets
+    assert client.post(url, json={"quantity": 3}, headers=headers).status_code == 409
+    assert client.post(url, json={"quantity": 51}, headers=headers).status_code == 422
+    db.refresh(event)
+    assert event.sold == 3
+
+
+def test_batch_keys_do_not_collide_with_single_purchase_keys(client, db, make_organizer, make_user):
+    organizer, _ = make_organizer()
+    event = models.Event(title="Gig", description="d", date=datetime(2030, 1, 1),
+                         location="Berlin", organizer_id=organizer.id, capacity=10)
+    db.add(event)
+    db.commit()
+    _, headers = make_user()
+    single = client.post(f"/events/{event.id}/tickets", headers={**headers, "Idempotency-Key": "order#0"})
+    assert single.status_code == 200
+
+    url = f"/events/{event.id}/tickets:batch"
+    keyed = {**headers, "Idempotency-Key": "order"}
+    tickets = client.post(url, json={"quantity": 2}, headers=keyed).json()
+    assert len(tickets) == 2 and single.json()["id"] not in {t["id"] for t in tickets}
+    assert client.post(url, json={"quantity": 2}, headers=keyed).json() == tickets
+    db.refresh(event)
+    assert event.sold == 3
+
+    long_key = {**headers, "Idempotency-Key": "k" * 255}
+    assert client.post(url, json={"quantity": 1}, headers=long_key).status_code == 200
+    too_long = {**headers, "Idempotency-Key": "k" * 256}
+    assert client.post(url, json={"quantity": 1}, headers=too_long).status_code == 422
+
+
+def test_bulk_import_ndjson_and_csv(client, db, make_organizer, enqueued):
+    organizer, headers = make_organizer()
+    ndjson = "\n".join(
+        f'{{"title": "Event {i}", "description": "d", '
+        f'"date": "2030-01-0{i + 1}T20:00:00", "location": "Berlin"}}'
+        for i in range(3)
+    )
+    response = client.post(
+        "/events:bulk",
+        content=ndjson,
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.json()["created"] == 3
+
+    csv_body = (
+        "title,description,date,location,capacity\n"
+        'Gig,"Two\nlines",2030-02-01T20:00:00,Paris,100\n'
+        "Talk,short,2030-02-02T18:00:00,Paris,\n"
+    )
+    response = client.post(
+        "/events:bulk", content=csv_body, headers={**headers, "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200, response.text
+    ids = response.json()["ids"]
+    gig = db.get(models.Event, ids[0])
+    assert gig.description == "Two\nlines" and gig.capacity == 100
+    assert db.query(models.Event).count() == 5
+    assert outbox.relay_once() == 5
+    assert len(enqueued) == 1 and enqueued[0][3:] == ids
+
+
+def test_bulk_import_rolls_back_on_invalid_row(client, db, make_organizer, enqueued):
+    _, headers = make_organizer()
+    body = (
+        '{"title": "Ok", "description": "d", "date": "2030-01-01T00:00:00", "location": "X"}\n'
+        '{"title": "Missing date", "description": "d", "location": "X"}\n'
+    )
+    response = client.post(
+        "/events:bulk", content=body, headers={**headers, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"]["line"] == 2
+    assert db.query(models.Event).count() == 0
+    assert db.query(models.MatchOutbox).count() == 0
+
+    response = client.post(
+        "/events:bulk", content="{not json", headers={**headers, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 422
+    assert client.post("/events:bulk", content="x", headers=headers).status_code == 415
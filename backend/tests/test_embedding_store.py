@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app import matching, models, profiles
+from app.embedding_store import EmbeddingStore, QuantizedRows
+
+
+def _unit_rows(rng, rows, dim):
+    matrix = rng.standard_normal((rows, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def test_appends_supersede_rows_and_compaction_maps_them(tmp_path):
+    rng = np.random.default_rng(0)
+    store = EmbeddingStore(str(tmp_path / "users"), dim=4)
+    first, second = _unit_rows(rng, 3, 4), _unit_rows(rng, 2, 4)
+    store.append([3, 1, 2], first)
+    store.append([1, 5], second)
+
+    ids, matrix = store.snapshot()
+    latest = dict(zip(ids.tolist(), matrix))
+    assert sorted(latest) == [1, 2, 3, 5]
+    assert np.array_equal(latest[1], second[0]) and np.array_equal(latest[3], first[0])
+
+    store.compact()
+    assert store.tail_rows() == 0
+    ids, matrix = EmbeddingStore(str(tmp_path / "users"), dim=4).snapshot()
+    assert ids.tolist() == [1, 2, 3, 5]
+    assert isinstance(matrix, np.memmap) and np.array_equal(matrix[0], second[0])
+    assert sorted(p.name for p in (tmp_path / "users").glob("ids.*")) == ["ids.1"]
+
+    with pytest.raises(ValueError):
+        EmbeddingStore(str(tmp_path / "users"), dim=8)
+
+
+def test_int8_store_scores_like_float32(tmp_path):
+    rng = np.random.default_rng(1)
+    users, events = _unit_rows(rng, 500, 32), _unit_rows(rng, 4, 32)
+    store = EmbeddingStore(str(tmp_path / "users"), dim=32, dtype="int8")
+    store.append(np.arange(500), users)
+    store.compact()
+    ids, matrix = store.snapshot()
+    assert isinstance(matrix, QuantizedRows) and matrix.codes.dtype == np.int8
+    assert np.abs(matrix[:] - users).max() < 0.01
+
+    exact_rows, _ = matching.top_k_users(events, users, 10)
+    rows, _ = matching.top_k_users(events, matrix, 10, chunk_size=64)
+    overlap = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(exact_rows, rows)])
+    assert overlap >= 0.9
+
+
+def test_matching_syncs_changed_profiles_into_the_store(
+    tmp_path, monkeypatch, client, db, make_organizer, make_user
+):
+    monkeypatch.setattr(matching, "USER_EMBEDDING_STORE", str(tmp_path / "users"))
+    monkeypatch.setattr(matching, "_user_store", None)
+    organizer, _ = make_organizer()
+    events = [
+        models.Event(title=title, description=title, date=datetime(2030, 1, 1),
+                     location="Berlin", organizer_id=organizer.id)
+        for title in ("Jazz night", "Football derby")
+    ]
+    db.add_all(events)
+    db.commit()
+    buyers = [make_user() for _ in range(2)]
+    for (_, headers), event in zip(buyers, events):
+        client.post(f"/events/{event.id}/tickets", headers=headers)
+
+    user_ids, matrix = matching.load_user_embeddings(db)
+    assert sorted(user_ids.tolist()) == sorted(user.id for user, _ in buyers)
+
+    client.post(f"/events/{events[1].id}/tickets", headers=buyers[0][1])
+    monkeypatch.setattr(profiles, "STORE_SYNC_OVERLAP", 0)
+    user_ids, matrix = matching.load_user_embeddings(db)
+    expected_ids, expected = profiles.load_all(db)
+    order = np.argsort(user_ids)
+    assert user_ids[order].tolist() == expected_ids.tolist()
+    assert np.allclose(np.asarray(matrix)[order], expected, atol=1e-6)
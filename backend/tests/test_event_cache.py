@@ -0,0 +1,181 @@
+import time
+from datetime import datetime
+
+from redis import RedisError, TimeoutError
+from sqlalchemy import event
+
+from app import database, event_cache, models
+
+
+def _count_event_queries(fn):
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", _record)
+    try:
+        result = fn()
+    finally:
+        event.remove(database.engine, "before_cursor_execute", _record)
+    return result, sum("FROM events" in s for s in statements)
+
+
+def _payload(title="Gig"):
+    return {"title": title, "description": "d", "date": "2030-01-01T20:00:00",
+            "location": "Berlin", "capacity": 10}
+
+
+def test_event_reads_are_cached_and_support_etags(client, make_organizer, make_user):
+    _, organizer_headers = make_organizer()
+    _, headers = make_user()
+    event_id = client.post("/events", json=_payload(), headers=organizer_headers).json()["id"]
+
+    first, queries = _count_event_queries(lambda: client.get(f"/events/{event_id}", headers=headers))
+    assert queries == 1
+    second, queries = _count_event_queries(lambda: client.get(f"/events/{event_id}", headers=headers))
+    assert queries == 0
+    assert second.json() == first.json() and second.json()["title"] == "Gig"
+
+    etag = second.headers["etag"]
+    response = client.get(f"/events/{event_id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304 and response.content == b""
+
+    page = client.get("/events", headers=headers)
+    response = client.get("/events", headers={**headers, "If-None-Match": page.headers["etag"]})
+    assert response.status_code == 304
+
+
+def test_writes_invalidate_cached_events(client, make_organizer, make_user):
+    _, organizer_headers = make_organizer()
+    _, headers = make_user()
+    event_id = client.post("/events", json=_payload("First"), headers=organizer_headers).json()["id"]
+
+    assert client.get(f"/events/{event_id}", headers=headers).json()["sold"] == 0
+    page = client.get("/events", headers=headers)
+    assert len(page.json()["items"]) == 1
+
+    client.post("/events", json=_payload("Second"), headers=organizer_headers)
+    response = client.get("/events", headers={**headers, "If-None-Match": page.headers["etag"]})
+    assert response.status_code == 200 and len(response.json()["items"]) == 2
+
+    client.post(f"/events/{event_id}/tickets", headers=headers)
+    assert client.get(f"/events/{event_id}", headers=headers).json()["sold"] == 1
+
+
+def test_redis_errors_fall_back_to_the_database(client, db, make_organizer, make_user, monkeypatch):
+    organizer, _ = make_organizer()
+    _, headers = make_user()
+    db.add(models.Event(title="Gig", description="d", date=datetime(2030, 1, 1),
+                        location="Berlin", organizer_id=organizer.id))
+    db.commit()
+
+    class Down:
+        def __getattr__(self, name):
+            def fail(*args, **kwargs):
+                raise RedisError("connection refused")
+            return fail
+
+    monkeypatch.setattr(event_cache, "client", Down())
+    assert len(client.get("/events", headers=headers).json()["items"]) == 1
+
+
+def test_hung_redis_costs_one_timeout_per_cooldown(client, db, make_organizer, make_user, monkeypatch):
+    organizer, _ = make_organizer()
+    _, headers = make_user()
+    db.add(models.Event(title="Gig", description="d", date=datetime(2030, 1, 1),
+                        location="Berlin", organizer_id=organizer.id))
+    db.commit()
+
+    calls = []
+
+    class Hung:
+        def __getattr__(self, name):
+            def stall(*args, **kwargs):
+                calls.append(name)
+                time.sleep(event_cache.CACHE_TIMEOUT)
+                raise TimeoutError("Timeout reading from socket")
+            return stall
+
+    monkeypatch.setattr(event_cache, "client", Hung())
+    for _ in range(3):
+        assert len(client.get("/events", headers=headers).json()["items"]) == 1
+    assert calls == ["get"]
+
+    monkeypatch.setattr(event_cache, "_skip_until", time.monotonic() - 1)
+    client.get("/events", headers=headers)
+    assert calls == ["get", "get"]
+
+
+def test_cache_client_uses_short_timeouts(monkeypatch):
+    monkeypatch.setattr(event_cache, "client", None)
+    options = event_cache.get_client().connection_pool.connection_kwargs
+    assert options["socket_timeout"] == event_cache.CACHE_TIMEOUT
+    assert options["socket_connect_timeout"] == event_cache.CACHE_TIMEOUT
+
+
+def test_my_tickets_are_joined_paginated_and_cached_until_a_purchase(
+    client, db, make_organizer, make_user
+):
+    organizer, _ = make_organizer()
+    events = [
+        models.Event(title=f"Gig {day}", description="d", date=datetime(2030, 1, day),
+                     location="Berlin", organizer_id=organizer.id)
+        for day in (3, 1, 2)
+    ]
+    db.add_all(events)
+    db.commit()
+    _, headers = make_user()
+    _, other = make_user()
+    for gig in events:
+        client.post(f"/events/{gig.id}/tickets", headers=headers)
+    client.post(f"/events/{events[0].id}/tickets", headers=other)
+
+    def _ticket_queries(params):
+        statements = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(database.engine, "before_cursor_execute", _record)
+        try:
+            response = client.get("/me/tickets", params=params, headers=headers)
+        finally:
+            event.remove(database.engine, "before_cursor_execute", _record)
+        assert all("FROM events" not in s or "JOIN" in s for s in statements)
+        return response, sum("FROM tickets" in s for s in statements)
+
+    # One joined query, however many tickets are on the page; then the cache.
+    first, queries = _ticket_queries({"limit": 2})
+    assert queries == 1
+    cached, queries = _ticket_queries({"limit": 2})
+    assert queries == 0 and cached.content == first.content
+    page = first.json()
+    assert [t["event"]["title"] for t in page["items"]] == ["Gig 1", "Gig 2"]
+    rest = client.get("/me/tickets", params={"cursor": page["next_cursor"]}, headers=headers).json()
+    assert [t["event"]["title"] for t in rest["items"]] == ["Gig 3"]
+    assert rest["next_cursor"] is None
+    assert client.get("/me/tickets", params={"cursor": "junk"}, headers=headers).status_code == 400
+
+    before = client.get("/me/tickets", params={"limit": 5}, headers=headers).json()
+    assert len(before["items"]) == 3
+    client.post(f"/events/{events[1].id}/tickets", headers=headers)
+    after = client.get("/me/tickets", params={"limit": 5}, headers=headers).json()
+    assert [t["event"]["title"] for t in after["items"]] == ["Gig 1", "Gig 1", "Gig 2", "Gig 3"]
+
+
+def test_purchase_after_the_version_key_expired_still_invalidates(
+    client, db, redis, make_organizer, make_user
+):
+    organizer, _ = make_organizer()
+    gig = models.Event(title="Gig", description="d", date=datetime(2030, 1, 1),
+                       location="Berlin", organizer_id=organizer.id)
+    db.add(gig)
+    db.commit()
+    user, headers = make_user()
+    client.post(f"/events/{gig.id}/tickets", headers=headers)
+    assert len(client.get("/me/tickets", headers=headers).json()["items"]) == 1
+    # The version key expires while the page cached under it is still live.
+    redis.delete(f"tickets:{user.id}:version")
+    client.post(f"/events/{gig.id}/tickets", headers=headers)
+    assert len(client.get("/me/tickets", headers=headers).json()["items"]) == 2
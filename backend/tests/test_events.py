@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app import models, search
+
+
+def _seed_events(db, organizer, count, location="Berlin", start=None):
+    start = start or datetime(2030, 1, 1)
+    events = [
+        models.Event(
+            title=f"Event {i}",
+            description="desc",
+            # Pairs of events share a date so the id tie-breaker is exercised.
+            date=start + timedelta(days=i // 2),
+            location=location,
+            organizer_id=organizer.id,
+        )
+        for i in range(count)
+    ]
+    db.add_all(events)
+    db.commit()
+    return events
+
+
+def test_events_feed_walks_all_pages_in_order(client, db, make_organizer):
+    organizer, headers = make_organizer()
+    _seed_events(db, organizer, 7)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/events", params=params, headers=headers).json()
+        assert len(page["items"]) <= 3
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    expected = [
+        e.id
+        for e in db.query(models.Event).order_by(models.Event.date, models.Event.id)
+    ]
+    assert seen == expected
+
+
+def test_events_feed_filters(client, db, make_organizer):
+    organizer, headers = make_organizer()
+    _seed_events(db, organizer, 6, location="Berlin")
+    _seed_events(db, organizer, 4, location="Paris")
+
+    page = client.get(
+        "/events",
+        params={
+            "location": "Berlin",
+            "start": "2030-01-02T00:00:00",
+            "end": "2030-01-03T00:00:00",
+        },
+        headers=headers,
+    ).json()
+
+    assert [e["location"] for e in page["items"]] == ["Berlin", "Berlin"]
+    assert all(e["date"].startswith("2030-01-02") for e in page["items"])
+    assert page["next_cursor"] is None
+
+
+def test_events_feed_rejects_bad_input(client, make_user):
+    _, headers = make_user()
+    assert client.get("/events", params={"cursor": "nope"}, headers=headers).status_code == 400
+    assert client.get("/events", params={"limit": 1000}, headers=headers).status_code == 422
+
+
+def test_event_search_ranks_and_paginates(client, db, make_organizer):
+    organizer, headers = make_organizer()
+    db.add_all([
+        models.Event(title="Jazz night", description="Live trio", date=datetime(2030, 1, 1),
+                     location="Berlin", organizer_id=organizer.id),
+        models.Event(title="Open mic", description="Some jazz standards", date=datetime(2030, 1, 2),
+                     location="Paris", organizer_id=organizer.id),
+        models.Event(title="Football derby", description="Local rivals", date=datetime(2030, 1, 3),
+                     location="Berlin", organizer_id=organizer.id),
+    ])
+    db.commit()
+
+    def search(**params):
+        response = client.get("/events/search", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    titles = [item["title"] for item in search(q="jazz")["items"]]
+    assert titles == ["Jazz night", "Open mic"]
+    assert [item["title"] for item in search(q="jaz")["items"]] == titles
+    assert [item["title"] for item in search(q="jazz", location="Paris")["items"]] == ["Open mic"]
+    assert search(q="jazz football")["items"] == []
+    assert search(q='" AND (*')["items"] == []
+
+    first = search(q="jazz", limit=1)
+    second = search(q="jazz", limit=1, cursor=first["next_cursor"])
+    assert [first["items"][0]["title"], second["items"][0]["title"]] == titles
+    assert second["next_cursor"] is None
+    response = client.get("/events/search", params={"q": "jazz", "cursor": "bad"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_event_search_cap_applies_within_the_location(client, db, make_organizer, monkeypatch):
+    monkeypatch.setattr(search, "MAX_RANKED", 3)
+    organizer, headers = make_organizer()
+    db.add_all([
+        models.Event(title=f"Jazz {i}", description="d", date=datetime(2030, 1, 1),
+                     location=location, organizer_id=organizer.id)
+        for i, location in enumerate(["Paris"] + ["Berlin"] * 5)
+    ])
+    db.commit()
+    response = client.get("/events/search", params={"q": "jazz", "location": "Paris"}, headers=headers)
+    assert [item["title"] for item in response.json()["items"]] == ["Jazz 0"]
+
+
+def test_event_search_index_follows_bulk_inserts_and_deletes(client, db, make_organizer):
+    organizer, headers = make_organizer()
+    db.execute(
+        insert(models.Event),
+        [{"title": f"Concert {i}", "description": "d", "date": datetime(2030, 1, 1),
+          "location": "Berlin", "organizer_id": organizer.id} for i in range(3)],
+    )
+    db.commit()
+    assert len(client.get("/events/search", params={"q": "concert"}, headers=headers).json()["items"]) == 3
+
+    db.query(models.Event).filter(models.Event.title == "Concert 0").delete()
+    db.commit()
+    assert len(client.get("/events/search", params={"q": "concert"}, headers=headers).json()["items"]) == 2
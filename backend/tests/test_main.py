@@ -1,9 +1,40 @@
+import os
+import subprocess
 import sys
 from pathlib import Path
 
+import numpy as np
+from fastapi.testclient import TestClient
+
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+from app import auth, matching, pinecone_client
+from app.embeddings import EMBEDDING_DIM
 from app.main import app
 
 def test_app_exists():
     assert app
+
+
+def test_importing_the_app_touches_no_external_service(tmp_path):
+    script = (
+        "import sys, app.main\n"
+        "assert not {'redis', 'rq', 'pinecone'} & set(sys.modules), sys.modules.keys()\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).resolve().parents[1],
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path}/fresh.db"},
+        check=True,
+    )
+    # The schema is left to Alembic, so the database is never even opened.
+    assert not (tmp_path / "fresh.db").exists()
+
+
+def test_shutdown_flushes_embeddings_and_stops_hashing(monkeypatch):
+    stopped = []
+    monkeypatch.setattr(auth, "shutdown_hashing", lambda: stopped.append(True))
+    with TestClient(app):
+        matching.store_event_embedding(1, np.ones(EMBEDDING_DIM, dtype=np.float32))
+    assert "event-1" in pinecone_client.get_index().fetch(["event-1"])["vectors"]
+    assert stopped == [True]
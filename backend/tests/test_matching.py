@@ -0,0 +1,229 @@
+import sys
+import threading
+from datetime import datetime
+
+import numpy as np
+import pytest
+from rq import Queue
+
+from app import matching, models, outbox, pinecone_client, profiles, tasks
+from app.embeddings import HashingEmbedder
+
+# The real function; the autouse ``enqueued`` fixture replaces it.
+enqueue_match_job = tasks.enqueue_match_job
+
+
+def test_embeddings_are_normalised_float32_and_deterministic():
+    embedder = HashingEmbedder()
+    vector = embedder.embed("Jazz night", "Live jazz trio", "Berlin")
+    assert vector.dtype == np.float32
+    assert vector.shape == (embedder.dim,)
+    assert np.isclose(np.linalg.norm(vector), 1.0)
+    fresh = HashingEmbedder().embed("Jazz night", "Live jazz trio", "Berlin")
+    assert np.array_equal(vector, fresh)
+
+
+def test_similar_events_score_higher():
+    embedder = HashingEmbedder()
+    jazz, blues, football = embedder.embed_many(
+        [
+            ("Jazz night", "Live jazz trio and drinks", "Berlin"),
+            ("Jazz and blues", "Live jazz and blues band", "Berlin"),
+            ("Football match", "Local derby, bring a scarf", "Madrid"),
+        ]
+    )
+    assert jazz @ blues > jazz @ football
+
+
+def test_full_embedding_cache_is_safe_across_threads():
+    embedder = HashingEmbedder(cache_size=2)
+    docs = [(f"Event {i}", "desc", "Berlin") for i in range(4)]
+    expected = HashingEmbedder().embed_many(docs)
+    errors = []
+
+    def worker(offset):
+        try:
+            for step in range(2000):
+                i = (offset + step) % len(docs)
+                assert np.array_equal(embedder.embed(*docs[i]), expected[i])
+        except Exception as exc:  # e.g. KeyError from a racing eviction
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(16)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == [] and embedder.cache_info()["size"] == 2
+
+
+def test_batch_matches_single_and_uses_cache(monkeypatch):
+    embedder = HashingEmbedder()
+    docs = [(f"Event {i}", "desc", "Berlin") for i in range(50)]
+    batch = embedder.embed_many(docs)
+    assert np.allclose(batch[7], HashingEmbedder().embed(*docs[7]))
+
+    calls = []
+    original = embedder._vectorize
+    monkeypatch.setattr(
+        embedder, "_vectorize", lambda d: calls.append(len(d)) or original(d)
+    )
+    again = embedder.embed_many(docs + [("New", "desc", "Paris")])
+    assert calls == [1]
+    assert np.array_equal(again[:50], batch)
+
+
+def test_user_embedding_follows_ticket_history(db, make_organizer, make_user):
+    organizer, _ = make_organizer()
+    user, _ = make_user()
+    assert not matching.generate_user_embedding(user).any()
+
+    event = models.Event(
+        title="Jazz night",
+        description="Live jazz",
+        date=datetime(2030, 1, 1),
+        location="Berlin",
+        organizer_id=organizer.id,
+    )
+    db.add(event)
+    db.flush()
+    db.add(models.Ticket(event_id=event.id, user_id=user.id))
+    db.commit()
+
+    assert np.allclose(
+        matching.generate_user_embedding(user), matching.generate_event_embedding(event)
+    )
+
+
+def test_top_k_users_matches_brute_force_across_chunks():
+    rng = np.random.default_rng(0)
+    users = rng.standard_normal((1000, 16)).astype(np.float32)
+    events = rng.standard_normal((3, 16)).astype(np.float32)
+
+    rows, scores = matching.top_k_users(events, users, k=10, chunk_size=64)
+
+    expected = np.argsort(-(events @ users.T), axis=1)[:, :10]
+    assert np.array_equal(rows, expected)
+    assert np.all(np.diff(scores, axis=1) <= 0)
+    assert matching.top_k_users(events, users[:4], k=10, chunk_size=3)[0].shape == (3, 4)
+
+
+def test_match_event_to_users_persists_top_matches(db, make_organizer, make_user, monkeypatch):
+    organizer, _ = make_organizer()
+    jazz_fan, _ = make_user()
+    football_fan, _ = make_user()
+    make_user()  # no ticket history, never matched
+    past = [
+        models.Event(title=title, description=title, date=datetime(2029, 1, 1),
+                     location="Berlin", organizer_id=organizer.id)
+        for title in ("Jazz night", "Football derby")
+    ]
+    db.add_all(past)
+    db.flush()
+    db.add_all([
+        models.Ticket(event_id=past[0].id, user_id=jazz_fan.id),
+        models.Ticket(event_id=past[1].id, user_id=football_fan.id),
+    ])
+    new_event = models.Event(title="Jazz night", description="More jazz",
+                             date=datetime(2030, 1, 1), location="Berlin",
+                             organizer_id=organizer.id)
+    db.add(new_event)
+    db.commit()
+
+    monkeypatch.setattr(tasks, "MATCH_TOP_K", 1)
+    assert tasks.match_event_to_users(new_event.id) == 1
+    assert tasks.match_event_to_users(new_event.id) == 1
+
+    matches = db.query(models.Match).filter(models.Match.event_id == new_event.id).all()
+    assert [m.user_id for m in matches] == [jazz_fan.id]
+    # The job's event vector is upserted before it returns, not on a timer.
+    vector_id = f"event-{new_event.id}"
+    stored = pinecone_client.get_index().fetch([vector_id])["vectors"][vector_id]
+    assert np.allclose(stored["values"], matching.generate_event_embedding(new_event))
+
+
+def test_created_events_reach_the_queue_through_the_outbox(
+    client, db, make_organizer, monkeypatch
+):
+    _, headers = make_organizer()
+    for i in range(3):
+        body = {"title": f"Gig {i}", "description": "d", "date": "2030-01-01T20:00:00",
+                "location": "Berlin"}
+        assert client.post("/events", json=body, headers=headers).status_code == 200
+    event_ids = [event_id for (event_id,) in db.query(models.Event.id).order_by(models.Event.id)]
+    assert [row.event_id for row in db.query(models.MatchOutbox)] == event_ids
+
+    handed_off = []
+
+    def flaky_enqueue(job_id, ids):
+        handed_off.append((job_id, ids))
+        if len(handed_off) == 1:
+            raise ConnectionError("redis down")
+
+    monkeypatch.setattr(tasks, "enqueue_match_job", flaky_enqueue)
+    with pytest.raises(ConnectionError):
+        outbox.relay_once(batch_size=2)
+    assert outbox.relay_once(batch_size=2) == 3
+    # The failed batch is retried under the same job id before new rows.
+    assert handed_off[0] == handed_off[1] == (handed_off[0][0], event_ids[:2])
+    assert handed_off[2][1] == event_ids[2:]
+    assert db.query(models.MatchOutbox).count() == 0
+
+
+def test_match_jobs_go_to_the_matching_queue_once(monkeypatch, redis):
+    monkeypatch.setattr(tasks, "get_redis", lambda: redis)
+    enqueue_match_job("match-outbox-1", [1, 2])
+    enqueue_match_job("match-outbox-1", [1, 2])
+    jobs = Queue(tasks.MATCH_QUEUE, connection=redis).get_jobs()
+    assert len(jobs) == 1 and jobs[0].args == ([1, 2],)
+    assert Queue(connection=redis).count == 0
+
+
+def test_relayed_batches_never_reuse_a_job_id(client, db, make_organizer, monkeypatch, redis):
+    monkeypatch.setattr(tasks, "get_redis", lambda: redis)
+    monkeypatch.setattr(tasks, "enqueue_match_job", enqueue_match_job)
+    _, headers = make_organizer()
+    for i in range(2):
+        body = {"title": f"Gig {i}", "description": "d", "date": "2030-01-01T20:00:00",
+                "location": "Berlin"}
+        client.post("/events", json=body, headers=headers)
+        # Each handed-off row is deleted, so SQLite hands its id out again.
+        assert outbox.relay_once() == 1
+    jobs = Queue(tasks.MATCH_QUEUE, connection=redis).get_jobs()
+    event_ids = [event_id for (event_id,) in db.query(models.Event.id).order_by(models.Event.id)]
+    assert sorted(job.args[0][0] for job in jobs) == event_ids
+
+
+def test_purchases_update_profiles_incrementally(client, db, make_organizer, make_user):
+    organizer, _ = make_organizer()
+    buyer, headers = make_user()
+    jazz, football = [
+        models.Event(title=title, description=title, date=datetime(2030, 1, 1),
+                     location="Berlin", organizer_id=organizer.id)
+        for title in ("Jazz night", "Football derby")
+    ]
+    db.add_all([jazz, football])
+    db.commit()
+
+    client.post(f"/events/{jazz.id}/tickets", headers=headers)
+    client.post(f"/events/{football.id}/tickets:batch", json={"quantity": 2}, headers=headers)
+
+    profile = db.get(models.UserProfile, buyer.id)
+    assert profile.ticket_count == 3
+    expected = (matching.generate_event_embedding(jazz)
+                + 2 * matching.generate_event_embedding(football)) / 3
+    assert np.allclose(profiles.decode(profile.vector), expected, atol=1e-6)
+
+    user_ids, matrix = matching.load_user_embeddings(db)
+    assert user_ids.tolist() == [buyer.id]
+    assert np.allclose(matrix[0], expected / np.linalg.norm(expected), atol=1e-6)
+
+    assert profiles.rebuild(db) == 1
+    db.commit()
+    db.expire_all()
+    assert np.allclose(profiles.decode(db.get(models.UserProfile, buyer.id).vector), expected, atol=1e-6)
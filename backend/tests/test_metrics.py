@@ -0,0 +1,63 @@
+import threading
+import time
+
+from app import metrics
+
+
+def _sample(text, name):
+    for line in text.splitlines():
+        if line.split(" ")[0] == name:
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_metrics_endpoint_reports_route_db_and_redis_time(client, make_user):
+    _, headers = make_user()
+    metrics.reset()
+    client.get("/events", headers=headers)
+    client.get("/events", headers=headers)
+    client.get("/no-such-page")
+
+    text = client.get("/metrics").text
+    labels = 'method="GET",route="/events"'
+    assert _sample(text, f'http_request_duration_seconds_count{{{labels},status="200"}}') == 2
+    assert _sample(text, f'http_request_db_queries_count{{{labels}}}') == 2
+    assert _sample(text, f'http_request_db_queries_sum{{{labels}}}') >= 2
+    assert _sample(text, f'http_request_external_seconds_count{{{labels},service="redis"}}') == 2
+    assert 'route="unmatched",status="404"' in text
+    assert "/no-such-page" not in text
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("demo_seconds", "Demo.", ("kind",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, "a")
+    assert histogram.render()[2:] == [
+        'demo_seconds_bucket{kind="a",le="0.1"} 1',
+        'demo_seconds_bucket{kind="a",le="1"} 2',
+        'demo_seconds_bucket{kind="a",le="+Inf"} 3',
+        'demo_seconds_sum{kind="a"} 5.55',
+        'demo_seconds_count{kind="a"} 3',
+    ]
+
+
+def _busy_for(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampling_profiler_dumps_folded_stacks(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "PROFILE_DIR", str(tmp_path))
+    profiler = metrics.SamplingProfiler(interval=0.001)
+    started = profiler.begin()
+    worker = threading.Thread(target=_busy_for, args=(0.1,))
+    worker.start()
+    worker.join()
+    stacks = profiler.end(started)
+
+    assert any(stack.split(";")[-1].startswith("_busy_for") for stack in stacks)
+    path = metrics._dump_profile("GET", "/events/{event_id}", 0.1, stacks)
+    assert path.endswith("-GET-events_event_id-100ms.folded")
+    stack, count = open(path).readline().rsplit(" ", 1)
+    assert int(count) >= 1 and ";" in stack
@@ -0,0 +1,166 @@
+import json
+import tracemalloc
+from datetime import datetime, timedelta
+
+from pydantic import TypeAdapter
+from sqlalchemy import event, insert
+
+from app import database, exports, models, sales, schemas
+
+
+def test_organizer_dashboard_counts_sales_in_one_query(client, db, make_organizer, make_user):
+    organizer, headers = make_organizer()
+    buyer, _ = make_user()
+    events = [
+        models.Event(
+            title=f"Event {i}",
+            description="desc",
+            date=datetime(2030, 1, 1),
+            location="Berlin",
+            organizer_id=organizer.id,
+        )
+        for i in range(3)
+    ]
+    db.add_all(events)
+    db.flush()
+    db.add_all(
+        [models.Ticket(event_id=events[0].id, user_id=buyer.id) for _ in range(2)]
+        + [models.Ticket(event_id=events[2].id, user_id=buyer.id)]
+    )
+    db.commit()
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", _record)
+    try:
+        response = client.get("/organizer/events", headers=headers)
+    finally:
+        event.remove(database.engine, "before_cursor_execute", _record)
+
+    sales = {e["id"]: e["ticket_sales"] for e in response.json()}
+    assert sales == {events[0].id: 2, events[1].id: 0, events[2].id: 1}
+    # user lookup + organizer lookup + one aggregate query
+    assert sum("FROM events" in s for s in statements) == 1
+
+
+def _event_with_tickets(db, organizer, buyer, count):
+    event = models.Event(title="Gig", description="d", date=datetime(2030, 1, 1),
+                         location="Berlin", organizer_id=organizer.id)
+    db.add(event)
+    db.flush()
+    db.execute(
+        insert(models.Ticket),
+        [{"event_id": event.id, "user_id": buyer.id} for _ in range(count)],
+    )
+    db.commit()
+    return event
+
+
+def test_ticket_export_streams_ndjson_and_csv(client, db, make_organizer, make_user):
+    organizer, headers = make_organizer()
+    buyer, _ = make_user()
+    event = _event_with_tickets(db, organizer, buyer, 3)
+    url = f"/organizer/events/{event.id}/tickets"
+
+    response = client.get(url, params={"format": "ndjson"}, headers=headers)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == client.get(url, headers=headers).json()
+
+    response = client.get(url, params={"format": "csv"}, headers=headers)
+    lines = response.text.splitlines()
+    assert lines[0] == "id,event_id,user_id" and len(lines) == 4
+    assert client.get(url, params={"format": "xml"}, headers=headers).status_code == 422
+
+
+def test_ticket_export_memory_is_bounded(db, make_organizer, make_user):
+    organizer, _ = make_organizer()
+    buyer, _ = make_user()
+    event = _event_with_tickets(db, organizer, buyer, 50_000)
+
+    tracemalloc.start()
+    try:
+        size = sum(len(chunk) for chunk in exports.iter_tickets(event.id, "ndjson", batch_size=500))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # The export is a few MB; a streamed export only ever holds one batch.
+    assert size > 2_000_000
+    assert peak < 1_000_000
+
+
+def test_sales_stats_read_the_hourly_rollup(client, db, make_organizer, make_user):
+    organizer, headers = make_organizer()
+    other, _ = make_organizer()
+    _, buyer_headers = make_user()
+    gig, talk, foreign = [
+        models.Event(title=title, description="d", date=datetime(2030, 1, 1),
+                     location="Berlin", organizer_id=owner.id)
+        for title, owner in (("Gig", organizer), ("Talk", organizer), ("Other", other))
+    ]
+    db.add_all([gig, talk, foreign])
+    db.commit()
+    client.post(f"/events/{gig.id}/tickets", headers=buyer_headers)
+    client.post(f"/events/{gig.id}/tickets:batch", json={"quantity": 3}, headers=buyer_headers)
+    client.post(f"/events/{talk.id}/tickets", headers=buyer_headers)
+    client.post(f"/events/{foreign.id}/tickets", headers=buyer_headers)
+    # A sale from two days ago, bypassing the listener, then rebuilt.
+    db.execute(insert(models.Ticket), [{
+        "event_id": talk.id, "user_id": organizer.user_id,
+        "created_at": datetime.utcnow() - timedelta(days=2),
+    }])
+    db.commit()
+    rollup = {(r.event_id, r.tickets) for r in db.query(models.EventSalesHourly)}
+    assert rollup == {(gig.id, 4), (talk.id, 1), (foreign.id, 1)}
+    assert sales.rebuild(db) == 4
+    db.commit()
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", _record)
+    try:
+        daily = client.get("/organizer/stats", headers=headers).json()
+    finally:
+        event.remove(database.engine, "before_cursor_execute", _record)
+    assert not any("FROM tickets" in s for s in statements)
+    assert daily["bucket"] == "day" and daily["total"] == 6
+    assert [p["tickets"] for p in daily["points"]] == [1, 5]
+    assert daily["points"][1]["start"].endswith("T00:00:00")
+
+    hourly = client.get(
+        "/organizer/stats",
+        params={"bucket": "hour", "event_id": gig.id,
+                "start": (datetime.utcnow() - timedelta(hours=1)).isoformat()},
+        headers=headers,
+    ).json()
+    assert hourly["total"] == 4 and len(hourly["points"]) == 1
+    assert client.get("/organizer/stats", params={"bucket": "week"}, headers=headers).status_code == 422
+
+
+def test_list_fast_path_matches_schema_encoding(client, db, make_organizer, make_user):
+    organizer, headers = make_organizer()
+    buyer, _ = make_user()
+    event = models.Event(title="Café \"Nacht\"", description="ü\n", date=datetime(2030, 1, 1, 20, 0, 0, 123456),
+                         location="Köln", organizer_id=organizer.id, capacity=10, sold=2)
+    db.add(event)
+    db.flush()
+    db.add_all([models.Ticket(event_id=event.id, user_id=buyer.id) for _ in range(2)])
+    db.commit()
+
+    dashboard = client.get("/organizer/events", headers=headers)
+    assert dashboard.headers["content-type"] == "application/json"
+    expected = schemas.EventWithSales.model_validate(
+        {**schemas.Event.model_validate(event, from_attributes=True).model_dump(), "ticket_sales": 2}
+    )
+    assert dashboard.content == b"[" + expected.model_dump_json().encode() + b"]"
+
+    tickets = client.get(f"/organizer/events/{event.id}/tickets", headers=headers)
+    rows = db.query(models.Ticket).order_by(models.Ticket.id).all()
+    adapter = TypeAdapter(list[schemas.Ticket])
+    assert tickets.content == adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
@@ -0,0 +1,124 @@
+import json
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app import models, recommendations
+from app.ann import IVFIndex
+
+
+def test_ivf_index_recall_filtering_and_incremental_add():
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((20, 16))
+    vectors = (centers[rng.integers(0, 20, 4000)] + 0.1 * rng.standard_normal((4000, 16)))
+    vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+    now = datetime(2030, 1, 1)
+    dates = [now + timedelta(days=1)] * 3000 + [now - timedelta(days=1)] * 1000
+
+    index = IVFIndex(16, n_probe=8)
+    index.build(np.arange(4000), vectors, dates)
+    assert index.n_lists > 1
+
+    query = vectors[0]
+    ids, scores = index.search(query, 10, after=now)
+    upcoming = np.arange(3000)
+    exact = upcoming[np.argsort(-(vectors[:3000] @ query))[:10]]
+    assert len(set(ids.tolist()) & set(exact.tolist())) >= 9
+    assert ids.max() < 3000 and np.all(np.diff(scores) <= 0)
+
+    index.add(99999, query, now + timedelta(days=2))
+    assert 99999 in index.search(query, 3, after=now)[0]
+    index.add(99999, query, now - timedelta(days=2))
+    assert 99999 not in index.search(query, 3, after=now)[0]
+    assert len(index) == 4001
+
+
+def _event(db, organizer, title, days):
+    event = models.Event(
+        title=title,
+        description=title,
+        date=datetime.utcnow() + timedelta(days=days),
+        location="Berlin",
+        organizer_id=organizer.id,
+    )
+    db.add(event)
+    db.commit()
+    return event
+
+
+def test_recommendations_endpoint(client, db, make_organizer, make_user):
+    organizer, organizer_headers = make_organizer()
+    user, headers = make_user()
+    attended = _event(db, organizer, "Jazz night", -30)
+    _event(db, organizer, "Old jazz night", -1)
+    football = _event(db, organizer, "Football derby", 5)
+    jazz = _event(db, organizer, "Jazz trio night", 10)
+
+    cold = client.get("/recommendations", headers=headers).json()
+    assert [e["id"] for e in cold] == [football.id, jazz.id]
+
+    db.add(models.Ticket(event_id=attended.id, user_id=user.id))
+    db.commit()
+    jazz.capacity, jazz.sold = 100, 7
+    db.commit()
+    ranked = client.get("/recommendations", params={"limit": 1}, headers=headers).json()
+    assert [e["id"] for e in ranked] == [jazz.id]
+    assert (ranked[0]["capacity"], ranked[0]["sold"]) == (100, 7)
+
+    created = client.post(
+        "/events",
+        json={
+            "title": "Jazz night",
+            "description": "Jazz night",
+            "date": (datetime.utcnow() + timedelta(days=3)).isoformat(),
+            "location": "Berlin",
+        },
+        headers=organizer_headers,
+    ).json()
+    ranked = client.get("/recommendations", params={"limit": 1}, headers=headers).json()
+    assert [e["id"] for e in ranked] == [created["id"]]
+
+
+def test_stale_index_keeps_serving_while_rebuilt_in_the_background(
+    client, db, make_organizer, monkeypatch
+):
+    organizer, headers = make_organizer()
+    _event(db, organizer, "Jazz night", 5)
+    old = recommendations.get_index(db)
+    assert len(old) == 1
+
+    started, release = threading.Event(), threading.Event()
+    build_index = recommendations.build_index
+
+    def slow_build(session):
+        started.set()
+        release.wait(5)
+        return build_index(session)
+
+    monkeypatch.setattr(recommendations, "build_index", slow_build)
+    monkeypatch.setattr(recommendations, "REBUILD_INTERVAL", 0)
+    assert recommendations.get_index(db) is old
+    assert started.wait(5)
+    # Requests keep the old index; events added meanwhile reach both.
+    assert recommendations.get_index(db) is old
+    created = _event(db, organizer, "Jazz trio", 3)
+    recommendations.add_event(created)
+    release.set()
+    with recommendations._build_lock:  # held until the background build is done
+        pass
+    monkeypatch.setattr(recommendations, "REBUILD_INTERVAL", 600)
+    fresh = recommendations.get_index(db)
+    assert fresh is not old and created.id in fresh.search(fresh.centroids[0], 5)[0]
+
+    ndjson = "\n".join(json.dumps({
+        "title": f"Gig {i}", "description": "d", "location": "Berlin",
+        "date": (datetime.utcnow() + timedelta(days=2)).isoformat(),
+    }) for i in range(3))
+    ids = client.post(
+        "/events:bulk", content=ndjson,
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    ).json()["ids"]
+    # Bulk imports are added to the live index instead of forcing a rebuild.
+    assert recommendations.get_index(db) is fresh and len(fresh) == 5
+    assert set(ids) <= set(fresh.search(fresh.centroids[0], 10)[0].tolist())
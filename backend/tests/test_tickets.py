@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+
+from app import models
+from app.main import app
+
+
+def _event(db, organizer, capacity=None):
+    event = models.Event(
+        title="Gig",
+        description="desc",
+        date=datetime(2030, 1, 1),
+        location="Berlin",
+        organizer_id=organizer.id,
+        capacity=capacity,
+    )
+    db.add(event)
+    db.commit()
+    return event
+
+
+def test_purchase_respects_capacity(client, db, make_organizer, make_user):
+    organizer, _ = make_organizer()
+    event = _event(db, organizer, capacity=1)
+    _, first = make_user()
+    _, second = make_user()
+
+    assert client.post(f"/events/{event.id}/tickets", headers=first).status_code == 200
+    response = client.post(f"/events/{event.id}/tickets", headers=second)
+    assert response.status_code == 409
+    assert client.post("/events/999/tickets", headers=second).status_code == 404
+    db.refresh(event)
+    assert event.sold == 1
+
+
+def test_idempotency_key_replays_original_ticket(client, db, make_organizer, make_user):
+    organizer, _ = make_organizer()
+    event = _event(db, organizer, capacity=5)
+    other = _event(db, organizer)
+    _, headers = make_user()
+    keyed = {**headers, "Idempotency-Key": "order-1"}
+
+    first = client.post(f"/events/{event.id}/tickets", headers=keyed).json()
+    again = client.post(f"/events/{event.id}/tickets", headers=keyed).json()
+    assert first == again
+    assert client.post(f"/events/{other.id}/tickets", headers=keyed).status_code == 409
+    db.refresh(event)
+    assert event.sold == 1
+    assert db.query(models.Ticket).count() == 1
+
+
+def test_concurrent_buyers_never_oversell(db, make_organizer, make_user):
+    organizer, _ = make_organizer()
+    capacity = 25
+    event = _event(db, organizer, capacity=capacity)
+    buyers = [make_user()[1] for _ in range(200)]
+
+    async def hammer():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                *(
+                    client.post(
+                        f"/events/{event.id}/tickets",
+                        # Every buyer retries once with the same key.
+                        headers={**headers, "Idempotency-Key": f"k{n}"},
+                    )
+                    for n, headers in enumerate(buyers + buyers)
+                )
+            )
+
+    responses = asyncio.run(hammer())
+    codes = [r.status_code for r in responses]
+    assert set(codes) <= {200, 409}
+
+    db.refresh(event)
+    tickets = db.query(models.Ticket).filter(models.Ticket.event_id == event.id).count()
+    assert event.sold == tickets == capacity
+    assert len({r.json()["id"] for r in responses if r.status_code == 200}) == capacity
@@ -0,0 +1,83 @@
+import time
+
+import numpy as np
+import pytest
+
+from app.vector_index import BulkUpserter, LocalVectorIndex
+
+
+def _unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_local_index_upsert_query_and_filter():
+    index = LocalVectorIndex(dim=2, capacity=1)
+    index.upsert(
+        vectors=[
+            ("event-1", _unit(1, 0), {"kind": "event"}),
+            ("event-2", _unit(1, 1), {"kind": "event"}),
+            ("user-1", _unit(1, 0.1), {"kind": "user"}),
+        ]
+    )
+    result = index.query(vector=_unit(1, 0), top_k=2)
+    assert [m["id"] for m in result["matches"]] == ["event-1", "user-1"]
+
+    result = index.query(vector=_unit(1, 0), top_k=5, filter={"kind": "event"})
+    assert [m["id"] for m in result["matches"]] == ["event-1", "event-2"]
+
+    index.upsert(vectors=[("event-1", _unit(0, 1), {"kind": "event"})])
+    assert len(index) == 3
+    result = index.query(vector=_unit(0, 1), top_k=1)
+    assert result["matches"][0]["id"] == "event-1"
+
+    index.delete(["event-1"])
+    assert index.fetch(["event-1", "user-1"])["vectors"].keys() == {"user-1"}
+    ids, matrix = index.export({"kind": {"$in": ["event", "user"]}})
+    assert sorted(ids) == ["event-2", "user-1"] and matrix.shape == (2, 2)
+
+
+class _FlakyIndex:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+
+    def upsert(self, vectors):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("boom")
+        self.calls.append(list(vectors))
+
+
+def test_bulk_upserter_flushes_full_chunks_and_on_close():
+    index = _FlakyIndex()
+    with BulkUpserter(index, batch_size=3, max_delay=None) as writer:
+        writer.add_many([f"v{i}" for i in range(7)], np.zeros((7, 2)))
+        assert [len(chunk) for chunk in index.calls] == [3, 3]
+    assert [len(chunk) for chunk in index.calls] == [3, 3, 1]
+    assert index.calls[0][0] == ("v0", [0.0, 0.0])
+
+
+def test_bulk_upserter_flushes_after_delay():
+    index = _FlakyIndex()
+    writer = BulkUpserter(index, batch_size=100, max_delay=0.05)
+    writer.add("v1", [1.0, 0.0])
+    deadline = time.monotonic() + 2
+    while not index.calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert index.calls == [[("v1", [1.0, 0.0])]]
+
+
+def test_bulk_upserter_retries_with_backoff():
+    sleeps = []
+    index = _FlakyIndex(failures=2)
+    writer = BulkUpserter(index, max_delay=None, backoff=0.1, sleep=sleeps.append)
+    writer.add("v1", [1.0])
+    writer.flush()
+    assert len(index.calls) == 1
+    assert len(sleeps) == 2 and sleeps[1] > sleeps[0] / 2
+
+    index.failures = 10
+    writer.add("v2", [1.0])
+    with pytest.raises(ConnectionError):
+        writer.flush()
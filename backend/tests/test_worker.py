@@ -0,0 +1,19 @@
+from rq import Queue, SimpleWorker
+
+from app import tasks, worker
+
+
+class _InlineTimedWorker(worker.JobTimingMixin, SimpleWorker):
+    """Runs jobs in-process so they share the fakeredis server."""
+
+
+def test_workers_record_job_timings(redis):
+    queue = Queue(tasks.MATCH_QUEUE, connection=redis)
+    job = queue.enqueue(tasks.match_events_to_users, [])
+
+    _InlineTimedWorker([queue], connection=redis).work(burst=True)
+
+    job.refresh()
+    assert job.get_status() == "finished"
+    assert job.return_value() == 0
+    assert job.meta["duration_ms"] >= 0
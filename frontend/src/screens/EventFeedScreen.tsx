@@ -27,7 +27,7 @@ export default function EventFeedScreen({ navigation }: Props) {
   const loadEvents = async () => {
     try {
       const eventsData = await apiService.getEvents();
-      setEvents(eventsData);
+      setEvents(eventsData.items);
     } catch (error) {
       console.error('Error loading events:', error);
       // For now, we'll show placeholder data since the backend might not be running
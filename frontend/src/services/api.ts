@@ -5,6 +5,7 @@ import {
   LoginCredentials,
   SignupCredentials,
   Event,
+  EventPage,
   SimpleSignupData,
 } from "../types";
 
@@ -92,9 +93,10 @@ class ApiService {
     await this.removeToken();
   }
 
-  async getEvents(): Promise<Event[]> {
-    // Retrieve all events
-    return this.makeRequest<Event[]>("/events");
+  async getEvents(cursor?: string): Promise<EventPage> {
+    // Retrieve one page of events; pass next_cursor to get the following page
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    return this.makeRequest<EventPage>(`/events${query}`);
   }
 
   async getEvent(id: string): Promise<Event> {
@@ -36,6 +36,11 @@ export interface Event {
   organizer_id: string;
 }
 
+export interface EventPage {
+  items: Event[];
+  next_cursor: string | null;
+}
+
 export type RootStackParamList = {
   Login: undefined;
   Signup: undefined;